@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Benchmark the typed result model against the nested dicts used before.
+
+Builds the power series of one poll both ways, from the same raw PND
+points, then compares allocated memory, build time and the attribute
+access the history and sensors do on every update. The model parses the
+timestamps while building, the dicts in every consumer, so the totals of
+building and consuming a series are what compare the two.
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add custom_components to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'custom_components'))
+
+from cez_pnd.aggregation import parse_slot_end  # noqa: E402
+from cez_pnd.models import Measurement, SeriesResult  # noqa: E402
+
+# Two days of 15-minute data, what a poll returns per power series
+SLOTS = 2 * 96
+ROUNDS = 200
+ACCESS_NUMBER = 200
+# Consumers of a poll's series: history, daily derivation, window merge, revisions
+CONSUMERS = 4
+
+
+def raw_points():
+    """Return PND chart points for two days of 15-minute data."""
+    start = datetime(2025, 12, 28)
+    points = []
+    for slot in range(SLOTS):
+        end = start + timedelta(minutes=15 * (slot + 1))
+        if end.hour == 0 and end.minute == 0:
+            stamp = (end - timedelta(days=1)).strftime("%d.%m.%Y") + " 24:00"
+        else:
+            stamp = end.strftime("%d.%m.%Y %H:%M")
+        points.append([stamp, str(round(0.2 + slot % 7 / 10, 3)), "naměřená data OK"])
+    return points
+
+
+def build_dicts(points):
+    """Return the series as nested dicts, timestamps left as strings."""
+    measurements = [{"timestamp": point[0], "value": float(point[1])} for point in points]
+    return {
+        "current": measurements[-1]["value"],
+        "latest_timestamp": measurements[-1]["timestamp"],
+        "measurements": measurements,
+        "flagged": [],
+        "total": 0.0,
+        "min": 0.0,
+        "max": 0.0,
+        "name": "",
+        "unit": "kW",
+        "date_from": "28.12.2025",
+        "date_to": "29.12.2025",
+    }
+
+
+def build_models(points):
+    """Return the series as slotted dataclasses with parsed timestamps."""
+    return SeriesResult(
+        measurements=tuple(
+            Measurement(parse_slot_end(point[0]), float(point[1])) for point in points
+        ),
+        unit="kW",
+    )
+
+
+def use_dicts(series):
+    """Do what consumers did with the dicts: parse every timestamp, sum values."""
+    return sum(point["value"] for point in series["measurements"]), [
+        parse_slot_end(point["timestamp"]) for point in series["measurements"]
+    ]
+
+
+def use_models(series):
+    """Do the same with the model, whose timestamps are already parsed."""
+    return sum(point.value for point in series.measurements), [
+        point.end for point in series.measurements
+    ]
+
+
+def allocated(build, points):
+    """Return the bytes still allocated by one built series."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build(points)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del result
+    return size
+
+
+def main():
+    points = raw_points()
+    dicts = build_dicts(points)
+    models = build_models(points)
+    print(f"{SLOTS} slots per series")
+    print("-" * 72)
+
+    dict_size = allocated(build_dicts, points)
+    model_size = allocated(build_models, points)
+    print(
+        f"{'memory':<14} dicts={dict_size / 1024:8.1f} KiB   models={model_size / 1024:8.1f} KiB "
+        f"({dict_size / model_size:.1f}x)"
+    )
+
+    dict_build = min(timeit.repeat(lambda: build_dicts(points), number=1, repeat=ROUNDS))
+    model_build = min(timeit.repeat(lambda: build_models(points), number=1, repeat=ROUNDS))
+    print(f"{'build':<14} dicts={dict_build * 1e6:8.1f} us    models={model_build * 1e6:8.1f} us")
+
+    # The model parses timestamps once in the parser; the dicts made every
+    # consumer parse them again
+    dict_use = min(timeit.repeat(lambda: use_dicts(dicts), number=1, repeat=ACCESS_NUMBER))
+    model_use = min(timeit.repeat(lambda: use_models(models), number=1, repeat=ACCESS_NUMBER))
+    print(
+        f"{'consume':<14} dicts={dict_use * 1e6:8.1f} us    models={model_use * 1e6:8.1f} us "
+        f"({dict_use / model_use:.0f}x)"
+    )
+
+    for consumers in (1, CONSUMERS):
+        dict_total = dict_build + consumers * dict_use
+        model_total = model_build + consumers * model_use
+        print(
+            f"{f'build+{consumers}x use':<14} dicts={dict_total * 1e6:8.1f} us    "
+            f"models={model_total * 1e6:8.1f} us ({dict_total / model_total:.1f}x)"
+        )
+
+    dict_attr = min(timeit.repeat(
+        lambda: [point["value"] for point in dicts["measurements"]], number=1, repeat=ACCESS_NUMBER
+    ))
+    model_attr = min(timeit.repeat(
+        lambda: [point.value for point in models.measurements], number=1, repeat=ACCESS_NUMBER
+    ))
+    print(f"{'field access':<14} dicts={dict_attr * 1e6:8.1f} us    models={model_attr * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Benchmark the on-disk history format.
+
+Writes five years of synthetic 15-minute consumption and production data
+as column files and as the JSON day lists used before, then compares
+file size, write throughput and range-read latency.
+"""
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Add custom_components to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'custom_components'))
+
+from cez_pnd.columnar import MISSING_INT32, SLOTS_PER_DAY, ColumnFile  # noqa: E402
+
+YEARS = 5
+SERIES = ("consumption", "production")
+SCALE = 1000
+FIRST_DAY = date(2021, 1, 1)
+DAYS = 365 * YEARS
+# Range reads: (label, days) ending at the last stored day
+RANGES = (("1 day", 1), ("1 week", 7), ("1 month", 30), ("1 year", 365))
+READ_ROUNDS = 200
+
+
+def synthetic_day(index, name):
+    """Return one day of kW values with a daily and seasonal shape."""
+    season = 1 + 0.5 * math.cos(2 * math.pi * index / 365)
+    values = []
+    for slot in range(SLOTS_PER_DAY):
+        hour = slot / 4
+        if name == "production":
+            sun = math.sin(math.pi * (hour - 6) / 12)
+            values.append(round(max(sun, 0.0) * 3.2 / season, 3))
+        else:
+            values.append(round(0.3 * season + 0.4 * (7 <= hour < 22) + (slot % 7) / 100, 3))
+    return values
+
+
+def build_data():
+    """Return {series: {day: [kW, ...]}} for the whole benchmark period."""
+    return {
+        name: {
+            FIRST_DAY + timedelta(days=index): synthetic_day(index, name)
+            for index in range(DAYS)
+        }
+        for name in SERIES
+    }
+
+
+def write_columns(directory, data):
+    """Write every series as a column file and return the elapsed time."""
+    start = time.perf_counter()
+    for name, days in data.items():
+        column = ColumnFile(os.path.join(directory, f"{name}.values"), scale=SCALE)
+        column.write_days({
+            day: [MISSING_INT32 if value is None else round(value * SCALE) for value in values]
+            for day, values in days.items()
+        })
+        column.close()
+    return time.perf_counter() - start
+
+
+def write_json(path, data):
+    """Write every series as JSON day lists and return the elapsed time."""
+    start = time.perf_counter()
+    payload = {
+        "series": {
+            name: {day.isoformat(): values for day, values in days.items()}
+            for name, days in data.items()
+        }
+    }
+    with open(path, "w") as file:
+        json.dump(payload, file)
+    return time.perf_counter() - start
+
+
+def read_column_range(directory, days):
+    """Return the best latency of summing a trailing range from a column file."""
+    column = ColumnFile(os.path.join(directory, "consumption.values"))
+    end = column.end
+    best = math.inf
+    for _ in range(READ_ROUNDS):
+        started = time.perf_counter()
+        _, view = column.read_range(end - timedelta(days=days), end)
+        sum(view)
+        view.release()
+        best = min(best, time.perf_counter() - started)
+    column.close()
+    return best
+
+
+def read_json_range(path, days):
+    """Return the latency of loading the JSON file and summing the same range."""
+    started = time.perf_counter()
+    with open(path) as file:
+        payload = json.load(file)
+    series = payload["series"]["consumption"]
+    for day in sorted(series)[-days:]:
+        sum(series[day])
+    return time.perf_counter() - started
+
+
+def main():
+    data = build_data()
+    slots = DAYS * SLOTS_PER_DAY * len(SERIES)
+    print(f"{YEARS} years x {len(SERIES)} series = {slots} slots")
+    print("-" * 72)
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "history.json")
+        column_time = write_columns(directory, data)
+        json_time = write_json(json_path, data)
+
+        column_size = sum(
+            os.path.getsize(os.path.join(directory, f"{name}.values")) for name in SERIES
+        )
+        json_size = os.path.getsize(json_path)
+        print(f"{'size':<14} columns={column_size / 1024:9.0f} KiB   json={json_size / 1024:9.0f} KiB")
+        print(
+            f"{'write':<14} columns={slots / column_time / 1e6:7.2f} Mslot/s "
+            f"json={slots / json_time / 1e6:7.2f} Mslot/s"
+        )
+
+        # Appending a single day is the common case after every poll
+        column = ColumnFile(os.path.join(directory, "consumption.values"), scale=SCALE)
+        started = time.perf_counter()
+        column.write_days({column.end: [0] * SLOTS_PER_DAY})
+        column.close()
+        print(f"{'append 1 day':<14} columns={(time.perf_counter() - started) * 1000:7.3f} ms")
+
+        print("-" * 72)
+        json_load = read_json_range(json_path, 1)
+        print(f"JSON reads always load the whole file first: {json_load * 1000:.1f} ms")
+        for label, days in RANGES:
+            latency = read_column_range(directory, days)
+            print(f"{'read ' + label:<14} columns={latency * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Benchmark TLS handshakes, bytes and time per poll of the PND sessions.
+
+Runs a local HTTPS server that mimics the PND data endpoint and replays the
+data requests of polls against it, with the fetch concurrency of the client.
+The baseline is the persistent ``requests.Session()`` the client used before,
+which already keeps connections alive and negotiates gzip; the pooled
+transport only adds a pool sized to the concurrency and an adapter shared
+between the clients of several accounts. Request and response bytes are
+counted on the server, with and without compression.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import gzip
+import json
+import os
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Add custom_components to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'custom_components'))
+
+from cez_pnd.const import FETCH_CONCURRENCY, MAX_CONCURRENT_POLLS  # noqa: E402
+from cez_pnd.transport import TransportConfig, create_adapter, create_session  # noqa: E402
+
+POLLS = 20
+REQUESTS_PER_POLL = 7
+
+# One day of 15-minute data, shaped like a PND chart response
+PAYLOAD = json.dumps({
+    "hasData": True,
+    "unitY": "kW",
+    "series": [{
+        "name": "+A d/84075547",
+        "data": [
+            [f"29.12.2025 {h:02d}:{m:02d}", 0.25 + h / 100, "naměřená data OK"]
+            for h in range(24) for m in (0, 15, 30, 45)
+        ],
+    }],
+    "seriesStats": [{"total": "12,345", "min": "0,1", "max": "2,5",
+                     "dateFrom": "29.12.2025", "dateTo": "29.12.2025"}],
+}).encode()
+PAYLOAD_GZIP = gzip.compress(PAYLOAD)
+
+
+class Stats:
+    """Counters collected by the server."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.connections = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        # Response bodies as they would be without compression
+        self.raw_bytes = 0
+
+    def add(self, name, count):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + count)
+
+
+STATS = Stats()
+
+
+class CountingWriter:
+    """Socket writer counting the response bytes."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def write(self, data):
+        STATS.add("response_bytes", len(data))
+        return self.raw.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Keep-alive handler serving the fake data endpoint."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.wfile = CountingWriter(self.wfile)
+        STATS.add("connections", 1)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        STATS.add("request_bytes", len(self.raw_requestline) + len(self.headers.as_bytes()) + length)
+        STATS.add("raw_bytes", len(PAYLOAD))
+        body = PAYLOAD
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            body = PAYLOAD_GZIP
+        # Server-side processing time of the portal
+        time.sleep(0.005)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_certificate(directory):
+    """Write a self-signed certificate for 127.0.0.1 and return its paths."""
+    from ipaddress import IPv4Address
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(IPv4Address("127.0.0.1"))]), False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as file:
+        file.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as file:
+        file.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return cert_path, key_path
+
+
+def poll(executor, session, url, cert_path):
+    """Issue the data requests of a single poll, FETCH_CONCURRENCY at a time."""
+    def fetch(_):
+        # Per request, as REQUESTS_CA_BUNDLE would override the session's verify
+        session.post(url, json={"format": "chart"}, allow_redirects=False, verify=cert_path).json()
+
+    list(executor.map(fetch, range(REQUESTS_PER_POLL)))
+
+
+def run(label, url, cert_path, sessions):
+    """Run POLLS rounds of one concurrent poll per session and print the cost."""
+    STATS.reset()
+    # Every client fetches on its own executor; the clients poll side by side
+    executors = [ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) for _ in sessions]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(sessions)) as clients:
+        for _ in range(POLLS):
+            list(clients.map(lambda pair: poll(pair[0], pair[1], url, cert_path), zip(executors, sessions)))
+    elapsed = time.perf_counter() - started
+    for executor, session in zip(executors, sessions):
+        executor.shutdown()
+        session.close()
+    polls = POLLS * len(sessions)
+    print(
+        f"{label:<36} {STATS.connections / polls:10.2f} {STATS.request_bytes / polls:9.0f} "
+        f"{STATS.response_bytes / polls:9.0f} {STATS.raw_bytes / polls:9.0f} "
+        f"{elapsed * 1000 / POLLS:7.1f}"
+    )
+
+
+def baseline_session(compression=True):
+    """Return the persistent session the client used before the transport."""
+    session = requests.Session()
+    session.max_redirects = 10
+    if not compression:
+        session.headers["Accept-Encoding"] = "identity"
+    return session
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = write_certificate(directory)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_path, key_path)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"https://127.0.0.1:{server.server_address[1]}/cezpnd2/external/data"
+
+        print(
+            f"{POLLS} polls x {REQUESTS_PER_POLL} requests, "
+            f"{FETCH_CONCURRENCY} concurrent per client, payload {len(PAYLOAD)} B raw"
+        )
+        print(
+            f"{'per poll':<36} {'handshakes':>10} {'request B':>9} {'response B':>9} "
+            f"{'raw B':>9} {'ms':>7}"
+        )
+        print("-" * 86)
+        run("baseline session, uncompressed", url, cert_path, [baseline_session(False)])
+        run("baseline session, one account", url, cert_path, [baseline_session()])
+        run("pooled session, one account", url, cert_path, [create_session()])
+
+        accounts = MAX_CONCURRENT_POLLS
+        run(f"baseline sessions, {accounts} accounts", url, cert_path,
+            [baseline_session() for _ in range(accounts)])
+        shared = TransportConfig(pool_maxsize=accounts * FETCH_CONCURRENCY)
+        adapter = create_adapter(shared)
+        run(f"shared pool, {accounts} accounts", url, cert_path,
+            [create_session(shared, adapter) for _ in range(accounts)])
+
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
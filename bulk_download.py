@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Download long ranges of 15-minute PND data into the integration's history format.
+
+Uses the integration's own client, so login, rate limiting and parsing are
+the same as in Home Assistant. Ranges are split into windows fetched in
+parallel; finished windows are recorded in a checkpoint file, so an
+interrupted download continues where it stopped when run again.
+
+    PND_PASSWORD=... python3 bulk_download.py --username me@example.com \\
+        --start 2024-01-01 --end 2025-01-01 --output pnd_history
+    python3 bulk_download.py --accounts accounts.json --start 2024-01-01
+
+accounts.json is a list of {"username", "password", "device_ids"} objects;
+without device_ids, every device set on the account is downloaded. To seed
+Home Assistant, copy the output files into
+<config>/.storage/cez_pnd/<entry_id>/ while Home Assistant is stopped.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta
+import getpass
+import json
+import os
+import sys
+import threading
+import time
+import types
+
+# Load the integration's modules without running its package __init__,
+# which needs Home Assistant
+PACKAGE = types.ModuleType("cez_pnd")
+PACKAGE.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), 'custom_components', 'cez_pnd')]
+sys.modules.setdefault("cez_pnd", PACKAGE)
+
+from cez_pnd.aggregation import chunk_days  # noqa: E402
+from cez_pnd.api_requests import CezPndApi, CezPndAuthError  # noqa: E402
+from cez_pnd.assemblies import SERIES_TYPES  # noqa: E402
+from cez_pnd.const import (  # noqa: E402
+    FETCH_CONCURRENCY,
+    MAX_CONCURRENT_POLLS,
+    POWER_CHUNK_DAYS,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_PER_SECOND,
+)
+from cez_pnd.series import (  # noqa: E402
+    encode_dirty_days,
+    read_series_file,
+    series_key,
+    write_series_files,
+)
+from cez_pnd.ratelimit import TokenBucket  # noqa: E402
+
+CHECKPOINT_VERSION = 1
+# Windows requested at once per account; a batch is written and
+# checkpointed before the next one starts
+BATCH_WINDOWS = 2 * FETCH_CONCURRENCY
+
+
+class Checkpoint:
+    """Windows finished so far, saved after every batch."""
+
+    def __init__(self, path):
+        """Load the checkpoint at ``path``, if any."""
+        self.path = path
+        self._done = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                saved = json.load(file)
+            if saved.get("version") == CHECKPOINT_VERSION:
+                self._done = set(saved["done"])
+
+    @staticmethod
+    def key(device_id, name, start):
+        """Return the checkpoint key of a window."""
+        return f"{device_id}|{name}|{start.date().isoformat()}"
+
+    def is_done(self, device_id, name, start):
+        """Return True if the window was downloaded and stored."""
+        return self.key(device_id, name, start) in self._done
+
+    def mark_done(self, windows):
+        """Record stored windows and save the checkpoint."""
+        with self._lock:
+            self._done.update(self.key(device_id, name, start) for device_id, name, start, _ in windows)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump({"version": CHECKPOINT_VERSION, "done": sorted(self._done)}, file)
+            os.replace(tmp_path, self.path)
+
+
+class Progress:
+    """Counts shared by all accounts, printed after every batch."""
+
+    def __init__(self):
+        """Start counting."""
+        self.total = 0
+        self.windows = 0
+        self.slots = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def plan(self, windows):
+        """Add the pending windows of an account, known once it logged in."""
+        with self._lock:
+            self.total += windows
+
+    def add(self, username, windows, slots):
+        """Count a finished batch and print the progress line."""
+        with self._lock:
+            self.windows += windows
+            self.slots += slots
+            elapsed = time.monotonic() - self.started
+            rate = self.windows / elapsed if elapsed else 0.0
+            eta = (self.total - self.windows) / rate if rate else 0.0
+            print(
+                f"  {username:<28} {self.windows:>5}/{self.total} windows  "
+                f"{rate:5.2f} req/s  {self.slots / elapsed if elapsed else 0:8.0f} slots/s  "
+                f"ETA {eta / 60:5.1f} min",
+                flush=True,
+            )
+
+
+def plan_windows(device_ids, names, start, end, window_days):
+    """Return the (device ID, series, start, end) windows covering [start, end)."""
+    days = [start + timedelta(days=offset) for offset in range((end - start).days)]
+    return [
+        (
+            device_id,
+            name,
+            datetime.combine(first, dt_time.min),
+            datetime.combine(last, dt_time.min),
+        )
+        for device_id in device_ids
+        for name in names
+        for first, last in chunk_days(days, window_days)
+    ]
+
+
+def store_window(output, device_id, name, start, end, result):
+    """Merge one fetched window into the history files, return the changed slots.
+
+    Only the window's days are read, merged the way the integration merges
+    polled data, and written back.
+    """
+    key = series_key(device_id, name)
+    series = read_series_file(
+        output, key, start.date(), end.date(), memory_days=(end - start).days
+    )
+    changed = series.add_measurements(result.measurements, result.flagged)
+    if series.dirty_days:
+        write_series_files(output, {key: encode_dirty_days(series)})
+    return changed
+
+
+def download_account(account, args, limiter, checkpoint, progress):
+    """Download every pending window of one account, return the failed count."""
+    username = account["username"]
+    api = CezPndApi(username, account["password"], "", limiter=limiter)
+    try:
+        try:
+            device_ids = account.get("device_ids") or api.discover_device_sets()
+        except Exception as err:
+            print(f"❌ {username}: {err}")
+            return None
+        if not device_ids:
+            print(f"❌ {username}: no device sets found")
+            return None
+
+        windows = [
+            window
+            for window in plan_windows(device_ids, args.series, args.start, args.end, args.window_days)
+            if not checkpoint.is_done(*window[:3])
+        ]
+        progress.plan(len(windows))
+        failed = 0
+        for index in range(0, len(windows), BATCH_WINDOWS):
+            batch = windows[index:index + BATCH_WINDOWS]
+            try:
+                results = api.get_power_intervals([
+                    (device_id, SERIES_TYPES[name], start, end)
+                    for device_id, name, start, end in batch
+                ])
+            except CezPndAuthError as err:
+                print(f"❌ {username}: {err}")
+                return failed + len(windows) - index
+            except Exception as err:
+                # Left out of the checkpoint, so the next run retries them
+                print(f"⚠️  {username}: batch from {batch[0][2]:%Y-%m-%d} failed: {err}")
+                failed += len(batch)
+                continue
+            slots = sum(
+                store_window(args.output, *window, result)
+                for window, result in zip(batch, results)
+            )
+            checkpoint.mark_done(batch)
+            progress.add(username, len(batch), slots)
+    finally:
+        api.close()
+    return failed
+
+
+def load_accounts(args):
+    """Return the accounts to download."""
+    if args.accounts:
+        with open(args.accounts, encoding="utf-8") as file:
+            return json.load(file)
+    password = os.environ.get("PND_PASSWORD") or getpass.getpass(f"Password for {args.username}: ")
+    return [{"username": args.username, "password": password, "device_ids": args.device or []}]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    accounts = parser.add_mutually_exclusive_group(required=True)
+    accounts.add_argument("--accounts", help="JSON file with the accounts to download")
+    accounts.add_argument("--username", help="Single account, password from PND_PASSWORD or a prompt")
+    parser.add_argument("--device", action="append", help="Device set ID of --username, repeatable")
+    parser.add_argument("--series", nargs="+", choices=list(SERIES_TYPES), default=list(SERIES_TYPES))
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="First day, YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat, help="Day after the last day, today by default")
+    parser.add_argument("--output", default="pnd_history", help="History directory to write")
+    parser.add_argument("--checkpoint", help="Checkpoint file, <output>.checkpoint.json by default")
+    parser.add_argument("--window-days", type=int, default=POWER_CHUNK_DAYS, help="Days per request")
+    parser.add_argument("--parallel-accounts", type=int, default=MAX_CONCURRENT_POLLS)
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT_PER_SECOND, help="Requests per second, all accounts")
+    args = parser.parse_args()
+
+    # Today is still being measured, polls in Home Assistant pick it up
+    args.end = min(args.end or date.today(), date.today())
+    if args.end <= args.start:
+        parser.error("--end must be after --start")
+
+    accounts = load_accounts(args)
+    checkpoint = Checkpoint(args.checkpoint or f"{args.output.rstrip(os.sep)}.checkpoint.json")
+    limiter = TokenBucket(args.rate, RATE_LIMIT_BURST)
+    progress = Progress()
+    print(f"Downloading {args.start} to {args.end} for {len(accounts)} accounts into {args.output}")
+    print("-" * 72)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.parallel_accounts)) as executor:
+        outcomes = list(executor.map(
+            lambda account: download_account(account, args, limiter, checkpoint, progress),
+            accounts,
+        ))
+
+    elapsed = time.monotonic() - progress.started
+    print("-" * 72)
+    print(
+        f"{progress.windows} windows, {progress.slots} slots in {elapsed:.0f} s "
+        f"({progress.windows / elapsed if elapsed else 0:.2f} req/s, "
+        f"{progress.slots / elapsed if elapsed else 0:.0f} slots/s)"
+    )
+    incomplete = [
+        account["username"] for account, failed in zip(accounts, outcomes) if failed != 0
+    ]
+    if incomplete:
+        print(f"❌ Incomplete: {', '.join(incomplete)}; run again to resume")
+        return 1
+    print("✅ Done")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
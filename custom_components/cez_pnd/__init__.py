@@ -2,22 +2,43 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-
-from .api_requests import CezPndApi
-from .const import DOMAIN
+from homeassistant.const import (
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    EVENT_HOMEASSISTANT_FINAL_WRITE,
+    Platform,
+)
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+
+from .anomaly import AnomalyEngine
+from .const import (
+    CONF_MEMORY_DAYS,
+    DATA_MANAGER,
+    DEFAULT_MEMORY_DAYS,
+    DOMAIN,
+    GAP_REFETCH_INTERVAL,
+    REVISION_CHECK_INTERVAL,
+)
+from .coordinator import (
+    SNAPSHOT_STORAGE_VERSION,
+    CezPndCoordinator,
+    snapshot_storage_key,
+)
+from .forecast import ForecastEngine
+from .history import HistoryStore
+from .manager import async_get_manager
+from .services import async_setup_services, async_unload_services
+from .statistics import HistoryStatistics
+from .tariff import TariffCalendar, TariffEngine
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
-UPDATE_INTERVAL = timedelta(hours=1)
-
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up ČEZ Distribuce PND from a config entry."""
@@ -25,46 +46,123 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     password = entry.data[CONF_PASSWORD]
     device_id = entry.data.get("device_id", "")
 
-    api = CezPndApi(username, password, device_id)
+    # Entries of the same account share one authenticated client, and all
+    # clients share one connection pool owned by the manager
+    manager = async_get_manager(hass)
+    api = manager.acquire_client(entry.entry_id, username, password, device_id)
+
+    # Local 15-minute history, kept up to date by the coordinator, with the
+    # slots of the latest days in memory and the rest on disk
+    history = HistoryStore(
+        hass, entry.entry_id, entry.options.get(CONF_MEMORY_DAYS, DEFAULT_MEMORY_DAYS)
+    )
+    await history.async_load()
+
+    async def _async_flush_history(_event: Event) -> None:
+        await history.async_flush()
 
-    async def async_update_data():
-        """Fetch data from API running in executor."""
+    entry.async_on_unload(
+        hass.bus.async_listen(EVENT_HOMEASSISTANT_FINAL_WRITE, _async_flush_history)
+    )
+
+    # Hourly long-term statistics for the Energy dashboard, from the history
+    statistics = HistoryStatistics(hass, history)
+    entry.async_on_unload(statistics.async_start())
+
+    coordinator = CezPndCoordinator(hass, entry, manager, api, device_id, history)
+
+    # Start from the last saved data and refresh in the background, so setup
+    # doesn't wait for a CAS login and the PND round-trips
+    if await coordinator.async_restore_snapshot():
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
+    else:
         try:
-            # Run synchronous API call in executor
-            return await hass.async_add_executor_job(api.get_data)
-        except Exception as err:
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=DOMAIN,
-        update_method=async_update_data,
-        update_interval=UPDATE_INTERVAL,
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            await manager.async_release_client(entry.entry_id, username)
+            raise
+
+    # Changed history windows and tariffs take effect on reload
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    # Fill gaps PND reported as invalid or left out, without refetching whole days
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            coordinator.async_refetch_gaps,
+            GAP_REFETCH_INTERVAL,
+            name=f"{DOMAIN} gap refetch",
+            cancel_on_shutdown=True,
+        )
+    )
+
+    # Pick up PND's revisions of recently closed days
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            coordinator.async_check_revisions,
+            REVISION_CHECK_INTERVAL,
+            name=f"{DOMAIN} revision check",
+            cancel_on_shutdown=True,
+        )
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    # Dual tariff costs of the consumption, if the options set prices
+    calendar = TariffCalendar.from_options(entry.options)
 
-    hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "api": api,
+        "history": history,
+        # Options the entry was set up with, see _async_update_listener
+        "options": dict(entry.options),
+        "tariff": TariffEngine(history, calendar) if calendar else None,
+        # Peaks and anomalies of the consumption, followed slot by slot
+        "anomaly": AnomalyEngine(hass, history),
+        # Consumption forecasts from a seasonal profile, rolled forward daily
+        "forecast": ForecastEngine(history),
     }
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    async_setup_services(hass)
 
-    # Historical sensors automatically handle 15-minute data via homeassistant-historical-sensor
-    # They will display power measurements from each coordinator update (typically today's data)
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change.
+
+    The reauth and reconfigure flows reload the entry themselves after
+    updating its data, reloading again would log in to CAS twice.
+    """
+    if entry.options != hass.data[DOMAIN][entry.entry_id]["options"]:
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        # Close the API session
-        api = hass.data[DOMAIN][entry.entry_id]["api"]
-        await hass.async_add_executor_job(api.close)
+        # Release the shared client, the manager closes it once no entry uses it
+        await hass.data[DOMAIN][entry.entry_id]["history"].async_flush()
+
+        manager = hass.data[DOMAIN][DATA_MANAGER]
+        await manager.async_release_client(entry.entry_id, entry.data[CONF_USERNAME])
         hass.data[DOMAIN].pop(entry.entry_id)
 
+        if manager.is_idle:
+            manager.close()
+            hass.data[DOMAIN].pop(DATA_MANAGER)
+            async_unload_services(hass)
+
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored snapshot and history of a deleted entry."""
+    await Store(
+        hass, SNAPSHOT_STORAGE_VERSION, snapshot_storage_key(entry.entry_id)
+    ).async_remove()
+    await HistoryStore(hass, entry.entry_id).async_remove()
@@ -0,0 +1,188 @@
+"""Aggregation of 15-minute PND power series into energy per period."""
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+from zoneinfo import ZoneInfo
+
+if TYPE_CHECKING:
+    from .models import FlaggedPoint, Measurement
+
+# PND power series have one average kW value per 15-minute slot
+SLOT = timedelta(minutes=15)
+SLOT_HOURS = SLOT.total_seconds() / 3600
+
+TIMESTAMP_FORMAT = "%d.%m.%Y %H:%M"
+
+# PND timestamps are Czech local time
+PND_TIME_ZONE = ZoneInfo("Europe/Prague")
+
+# Derived daily energy must match PND's daily total within this margin
+DERIVED_TOLERANCE_KWH = 0.01
+DERIVED_TOLERANCE_RATIO = 0.005
+
+RESOLUTION_SLOT = "15min"
+RESOLUTION_HOUR = "hour"
+RESOLUTION_DAY = "day"
+RESOLUTION_MONTH = "month"
+
+_BUCKETS: dict[str, Callable[[datetime], datetime]] = {
+    RESOLUTION_SLOT: lambda start: start.replace(
+        minute=start.minute - start.minute % 15, second=0, microsecond=0
+    ),
+    # Both passes of the hour repeated when clocks go back share its buckets
+    RESOLUTION_HOUR: lambda start: start.replace(minute=0, second=0, microsecond=0, fold=0),
+    RESOLUTION_DAY: lambda start: start.replace(
+        hour=0, minute=0, second=0, microsecond=0, fold=0
+    ),
+    RESOLUTION_MONTH: lambda start: start.replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0, fold=0
+    ),
+}
+
+
+def bucket_start(moment: datetime, resolution: str) -> datetime:
+    """Return the start of the bucket containing ``moment``."""
+    return _BUCKETS[resolution](moment)
+
+
+def bucket_end(start: datetime, resolution: str) -> datetime:
+    """Return the end of the bucket starting at ``start``."""
+    if resolution == RESOLUTION_MONTH:
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    if resolution == RESOLUTION_DAY:
+        return start + timedelta(days=1)
+    if resolution == RESOLUTION_HOUR:
+        return start + timedelta(hours=1)
+    return start + SLOT
+
+
+def parse_slot_end(timestamp: str) -> datetime:
+    """Parse a PND timestamp, which marks the end of its slot.
+
+    The last slot of a day is stamped "24:00" on that day. Timestamps in the
+    usual zero-padded layout are sliced, strptime is several times slower
+    and a poll parses hundreds of them.
+    """
+    if (
+        len(timestamp) == 16
+        and timestamp[2] == timestamp[5] == "."
+        and timestamp[10] == " "
+        and timestamp[13] == ":"
+    ):
+        year, month, day = int(timestamp[6:10]), int(timestamp[3:5]), int(timestamp[:2])
+        hour, minute = int(timestamp[11:13]), int(timestamp[14:])
+        if hour == 24 and minute == 0:
+            return datetime(year, month, day) + timedelta(days=1)
+        return datetime(year, month, day, hour, minute)
+    if timestamp.endswith(" 24:00"):
+        return datetime.strptime(timestamp[:-6], "%d.%m.%Y") + timedelta(days=1)
+    return datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+
+
+def slot_exists(start: datetime) -> bool:
+    """Return False for slots of the hour skipped when clocks go forward."""
+    aware = start.replace(tzinfo=PND_TIME_ZONE)
+    return aware.astimezone(timezone.utc).astimezone(PND_TIME_ZONE).replace(tzinfo=None) == start
+
+
+def in_repeated_hour(moment: datetime) -> bool:
+    """Return True if local ``moment`` is in the hour repeated when clocks go back."""
+    aware = moment.replace(tzinfo=PND_TIME_ZONE, fold=0)
+    # In the skipped hour the first offset is the smaller one instead
+    return aware.utcoffset() > aware.replace(fold=1).utcoffset()
+
+
+def repeated_slot(start: datetime) -> bool:
+    """Return True for slots of the second pass of the hour repeated when clocks go back.
+
+    Those starts carry ``fold=1``; compared with others they equal the
+    first pass, so they are kept apart by the series.
+    """
+    return bool(start.fold) and in_repeated_hour(start)
+
+
+def repeated_hour(day: date) -> datetime | None:
+    """Return the start of the hour repeated on a day clocks go back, else None."""
+    for hour in range(24):
+        start = datetime(day.year, day.month, day.day, hour)
+        if in_repeated_hour(start):
+            return start
+    return None
+
+
+def point_day(end: datetime) -> date:
+    """Return the day a daily PND point ending at ``end`` belongs to.
+
+    Daily points are stamped at the day's end, "24:00" on that day.
+    """
+    return (end - timedelta(microseconds=1)).date()
+
+
+def chunk_days(days: Iterable[date], size: int) -> list[tuple[date, date]]:
+    """Group days into [first, end) runs of consecutive days, at most ``size`` long."""
+    chunks: list[tuple[date, date]] = []
+    for day in sorted(set(days)):
+        if chunks and chunks[-1][1] == day and (day - chunks[-1][0]).days < size:
+            chunks[-1] = (chunks[-1][0], day + timedelta(days=1))
+        else:
+            chunks.append((day, day + timedelta(days=1)))
+    return chunks
+
+
+def slot_start(end: datetime) -> datetime:
+    """Return the start of the slot ending at ``end``.
+
+    The slots of the second pass of the hour repeated when clocks go back
+    start with ``fold=1``, as do the ends parse_series marks as repeated.
+    """
+    if end.fold:
+        utc = end.replace(tzinfo=PND_TIME_ZONE).astimezone(timezone.utc)
+        return (utc - SLOT).astimezone(PND_TIME_ZONE).replace(tzinfo=None)
+    start = end - SLOT
+    if end.minute == 0 and in_repeated_hour(start) and not in_repeated_hour(end):
+        # The last slot of the second pass ends after the repeated hour
+        return start.replace(fold=1)
+    return start
+
+
+def slot_starts(points: Iterable[Measurement | FlaggedPoint]) -> list[datetime]:
+    """Return the start of each point's slot."""
+    return [slot_start(point.end) for point in points]
+
+
+def aggregate_energy(
+    measurements: Iterable[Measurement],
+    resolution: str,
+) -> dict[datetime, float]:
+    """Sum 15-minute kW averages into kWh per hour, day or month.
+
+    Keys are the local start of each bucket, in chronological order.
+    """
+    measurements = list(measurements)
+    bucket = _BUCKETS[resolution]
+    keys = map(bucket, slot_starts(measurements))
+    energies = [point.value * SLOT_HOURS for point in measurements]
+
+    totals: dict[datetime, float] = defaultdict(float)
+    for key, energy in zip(keys, energies):
+        totals[key] += energy
+    return dict(sorted(totals.items()))
+
+
+def daily_energy(measurements: Iterable[Measurement]) -> dict[date, float]:
+    """Return kWh per day derived from 15-minute kW data."""
+    return {
+        start.date(): total
+        for start, total in aggregate_energy(measurements, RESOLUTION_DAY).items()
+    }
+
+
+def totals_match(derived: float, reported: float) -> bool:
+    """Return True if a derived total agrees with the PND total."""
+    tolerance = max(DERIVED_TOLERANCE_KWH, abs(reported) * DERIVED_TOLERANCE_RATIO)
+    return abs(derived - reported) <= tolerance
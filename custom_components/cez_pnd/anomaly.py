@@ -0,0 +1,278 @@
+"""Streaming peak and anomaly detection on the 15-minute power series.
+
+Every new slot updates a few rolling statistics in O(1): an exponentially
+weighted mean and variance, a histogram of the last week for quantiles, and
+a baseline per weekday and slot of day. A slot far above the recent mean
+and the week's quantile is a peak, like a breaker about to trip. A run of
+slots well above the weekday baseline is a sustained anomaly, like a heater
+stuck on. Both fire an event, and the statistics back the anomaly sensors.
+"""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, time
+from functools import partial
+import logging
+import math
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .aggregation import RESOLUTION_SLOT, SLOT
+from .columnar import SLOTS_PER_DAY
+from .const import (
+    ANOMALY_BASELINE_ALPHA,
+    ANOMALY_HALF_LIFE,
+    ANOMALY_MIN_EXCESS_KW,
+    ANOMALY_QUANTILE,
+    ANOMALY_SUSTAINED_SLOTS,
+    ANOMALY_WARMUP,
+    ANOMALY_WINDOW,
+    ANOMALY_Z,
+    EVENT_ANOMALY,
+)
+from .history import HistoryStore
+
+_LOGGER = logging.getLogger(__name__)
+
+KIND_PEAK = "peak"
+KIND_SUSTAINED = "sustained"
+
+# Series watched for anomalies
+ANOMALY_SERIES = "consumption"
+# Quantile of the week shown as its peak power
+PEAK_QUANTILE = 0.99
+
+WINDOW_SLOTS = int(ANOMALY_WINDOW / SLOT)
+EWMA_ALPHA = 1 - 0.5 ** (SLOT / ANOMALY_HALF_LIFE)
+# Slots seen before peaks are reported, and weeks before a baseline is used
+MIN_SLOTS = SLOTS_PER_DAY
+MIN_WEEKS = 3
+# Lower bound of the standard deviation, so flat series don't score huge
+MIN_STD_KW = 0.1
+
+# Quantile histogram: bin 0 holds values up to BIN_MIN kW, bin n values up
+# to BIN_MIN * BIN_GROWTH ** n, which keeps quantiles within 2.5 %
+BIN_MIN = 0.01
+BIN_GROWTH = 1.05
+BIN_COUNT = 240
+
+
+def _bin(value: float) -> int:
+    """Return the histogram bin of a kW value."""
+    if value <= BIN_MIN:
+        return 0
+    return min(BIN_COUNT - 1, math.ceil(math.log(value / BIN_MIN) / math.log(BIN_GROWTH)))
+
+
+def _bin_value(index: int) -> float:
+    """Return the value a bin stands for, the geometric middle of its range."""
+    return 0.0 if index == 0 else BIN_MIN * BIN_GROWTH ** (index - 0.5)
+
+
+class RollingQuantiles:
+    """Approximate quantiles of the last ``size`` values.
+
+    Values are counted in a log-binned histogram and expire through a ring
+    of their bins, so adding is O(1) and a query walks the fixed bins.
+    """
+
+    def __init__(self, size: int) -> None:
+        """Initialize an empty window."""
+        self._ring: deque[int] = deque(maxlen=size)
+        self._counts = [0] * BIN_COUNT
+
+    def __len__(self) -> int:
+        """Return the number of values in the window."""
+        return len(self._ring)
+
+    def add(self, value: float) -> None:
+        """Add a value, expiring the oldest one of a full window."""
+        if len(self._ring) == self._ring.maxlen:
+            self._counts[self._ring[0]] -= 1
+        index = _bin(value)
+        self._ring.append(index)
+        self._counts[index] += 1
+
+    def quantile(self, fraction: float) -> float:
+        """Return the value below which ``fraction`` of the window lies."""
+        if not self._ring:
+            return 0.0
+        rank = fraction * (len(self._ring) - 1)
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen > rank:
+                return _bin_value(index)
+        return _bin_value(BIN_COUNT - 1)
+
+
+class Ewma:
+    """Exponentially weighted mean and variance of a stream."""
+
+    __slots__ = ("alpha", "mean", "variance", "count")
+
+    def __init__(self, alpha: float) -> None:
+        """Initialize with the weight of each new value."""
+        self.alpha = alpha
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Add a value."""
+        if self.count == 0:
+            self.mean = value
+        else:
+            difference = value - self.mean
+            increment = self.alpha * difference
+            self.mean += increment
+            self.variance = (1 - self.alpha) * (self.variance + difference * increment)
+        self.count += 1
+
+    def score(self, value: float) -> float:
+        """Return how many standard deviations ``value`` is above the mean."""
+        return (value - self.mean) / max(math.sqrt(self.variance), MIN_STD_KW)
+
+
+@dataclass(frozen=True, slots=True)
+class Anomaly:
+    """A slot, or the last slot of a run, that stood out."""
+
+    kind: str
+    start: datetime
+    power: float
+    expected: float
+    score: float
+
+
+@dataclass(frozen=True, slots=True)
+class SlotScore:
+    """The latest slot and how it compared to the statistics before it."""
+
+    start: datetime
+    power: float
+    mean: float
+    baseline: float | None
+    score: float
+
+
+class AnomalyDetector:
+    """Rolling statistics of one power series, fed slot by slot in time order.
+
+    Slots at or before the latest one seen, i.e. revisions and backfilled
+    days, don't change the statistics.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.ewma = Ewma(EWMA_ALPHA)
+        self.quantiles = RollingQuantiles(WINDOW_SLOTS)
+        self._baselines = [Ewma(ANOMALY_BASELINE_ALPHA) for _ in range(7 * SLOTS_PER_DAY)]
+        self._run = 0
+        self.latest: SlotScore | None = None
+        self.last_anomaly: Anomaly | None = None
+
+    def add(self, start: datetime, power: float) -> list[Anomaly]:
+        """Score a new slot against the statistics, then add it to them."""
+        latest = self.latest
+        if latest is not None and start <= latest.start:
+            return []
+        if latest is not None and start - latest.start != SLOT:
+            # A run only counts consecutive slots
+            self._run = 0
+
+        slot_of_day = (start - datetime.combine(start.date(), time.min)) // SLOT
+        baseline = self._baselines[start.weekday() * SLOTS_PER_DAY + slot_of_day]
+        anomalies: list[Anomaly] = []
+        score = self.ewma.score(power) if self.ewma.count else 0.0
+        if (
+            self.ewma.count >= MIN_SLOTS
+            and score >= ANOMALY_Z
+            and power - self.ewma.mean >= ANOMALY_MIN_EXCESS_KW
+            and power > self.quantiles.quantile(ANOMALY_QUANTILE)
+        ):
+            anomalies.append(Anomaly(KIND_PEAK, start, power, self.ewma.mean, score))
+
+        expected: float | None = None
+        if baseline.count >= MIN_WEEKS:
+            expected = baseline.mean
+            baseline_score = baseline.score(power)
+            score = max(score, baseline_score)
+            if baseline_score >= ANOMALY_Z and power - expected >= ANOMALY_MIN_EXCESS_KW:
+                self._run += 1
+                if self._run == ANOMALY_SUSTAINED_SLOTS:
+                    anomalies.append(
+                        Anomaly(KIND_SUSTAINED, start, power, expected, baseline_score)
+                    )
+            else:
+                self._run = 0
+
+        self.latest = SlotScore(start, power, self.ewma.mean, expected, score)
+        self.ewma.add(power)
+        self.quantiles.add(power)
+        baseline.add(power)
+        if anomalies:
+            self.last_anomaly = anomalies[-1]
+        return anomalies
+
+
+class AnomalyEngine:
+    """Anomaly detectors of the watched series of an entry's device sets."""
+
+    def __init__(self, hass: HomeAssistant, history: HistoryStore) -> None:
+        """Initialize the engine."""
+        self.hass = hass
+        self.history = history
+        self._detectors: dict[str, AnomalyDetector] = {}
+
+    def detector(self, device_id: str) -> AnomalyDetector:
+        """Return the detector of a device set, starting it on first use.
+
+        A new detector replays the last ANOMALY_WARMUP of stored slots
+        without reporting anything, then follows every new slot.
+        """
+        if device_id not in self._detectors:
+            series = self.history.series(device_id, ANOMALY_SERIES)
+            detector = AnomalyDetector()
+            if series.last_slot is not None:
+                end = series.last_slot + SLOT
+                for start, power in series.iter_series(end - ANOMALY_WARMUP, end, RESOLUTION_SLOT):
+                    detector.add(start, power)
+            detector.last_anomaly = None
+            series.add_observer(partial(self._async_slot_changed, device_id, detector))
+            self._detectors[device_id] = detector
+        return self._detectors[device_id]
+
+    @callback
+    def _async_slot_changed(
+        self,
+        device_id: str,
+        detector: AnomalyDetector,
+        start: datetime,
+        previous: float | None,
+        power: float,
+    ) -> None:
+        """Feed a changed slot to its detector and report what stood out."""
+        for anomaly in detector.add(start, power):
+            _LOGGER.info(
+                "%s anomaly of %s at %s: %.2f kW, expected %.2f kW",
+                anomaly.kind.capitalize(),
+                device_id,
+                anomaly.start,
+                anomaly.power,
+                anomaly.expected,
+            )
+            self.hass.bus.async_fire(
+                EVENT_ANOMALY,
+                {
+                    "device_id": device_id,
+                    "series": ANOMALY_SERIES,
+                    "kind": anomaly.kind,
+                    "start": anomaly.start.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE).isoformat(),
+                    "power": round(anomaly.power, 3),
+                    "expected": round(anomaly.expected, 3),
+                    "score": round(anomaly.score, 2),
+                },
+            )
@@ -1,27 +1,65 @@
 """API client for ČEZ Distribuce PND using requests library."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 import logging
-from datetime import datetime, timedelta
-from typing import Any
-
-import requests
-from bs4 import BeautifulSoup
-
+from datetime import date, datetime, timedelta
+import re
+import threading
+from typing import TYPE_CHECKING, Any
+
+from .aggregation import (
+    RESOLUTION_DAY,
+    RESOLUTION_SLOT,
+    TIMESTAMP_FORMAT,
+    chunk_days,
+    daily_energy,
+    point_day,
+    totals_match,
+)
+from .assemblies import (
+    ENABLED_TYPES,
+    PERIOD_TODAY,
+    PERIOD_WINDOW,
+    PERIOD_YESTERDAY,
+    DailySensor,
+    MeasurementType,
+    parse_totals,
+)
 from .const import (
     API_BASE_URL,
     API_DATA_URL,
-    ID_ASSEMBLY_CONSUMPTION,
-    ID_ASSEMBLY_PRODUCTION,
-    ID_ASSEMBLY_CONSUMPTION_POWER,
-    ID_ASSEMBLY_PRODUCTION_POWER,
+    DAILY_CHUNK_DAYS,
+    DEFAULT_DAILY_DAYS,
+    FETCH_CONCURRENCY,
+    MAX_HISTORY_DAYS,
 )
+from .models import DailyResult, DeviceData, Measurement, SeriesResult
+from .ratelimit import GLOBAL_LIMITER, TokenBucket
+from .transport import DEFAULT_TRANSPORT, TransportConfig, create_session
+
+# requests and bs4 are imported where first used, so loading the integration
+# doesn't pay for them before a client exists
+if TYPE_CHECKING:
+    from requests.adapters import HTTPAdapter
 
 _LOGGER = logging.getLogger(__name__)
 
 # Version identifier for debugging
 API_VERSION = "v1.7.0"
-_LOGGER.info("ČEZ PND API version: %s", API_VERSION)
+
+# Device set IDs embedded in the dashboard page, e.g. "idDeviceSet":"86180"
+# in the page state or data-id-device-set="86180" on the device selector
+_DEVICE_SET_RE = re.compile(
+    r"id[-_]?device[-_]?set[\"']?\s*[:=]\s*[\"']?(\d+)",
+    re.IGNORECASE,
+)
+
+
+class CezPndAuthError(Exception):
+    """Error to indicate the portal rejected the credentials."""
 
 
 class CezPndApi:
@@ -32,23 +70,49 @@ class CezPndApi:
         username: str,
         password: str,
         device_id: str,
+        transport: TransportConfig = DEFAULT_TRANSPORT,
+        adapter: HTTPAdapter | None = None,
+        limiter: TokenBucket = GLOBAL_LIMITER,
     ) -> None:
-        """Initialize the API client."""
+        """Initialize the API client.
+
+        Pass ``adapter`` to share one connection pool between several clients;
+        cookies stay per client because each one keeps its own session.
+        """
         self.username = username
         self.password = password
         self.device_id = device_id
-        # Use requests.Session for reliable cookie handling
-        self.session = requests.Session()
-        self.session.max_redirects = 10
+        # Use requests.Session for reliable cookie handling, on a pool sized
+        # to the concurrent fetches so none of them opens a throwaway connection
+        self.session = create_session(transport, adapter)
+        self._shared_adapter = adapter is not None
+        # Every request takes a token from the process-wide bucket
+        self._limiter = limiter
         self._authenticated = False
+        # Concurrent fetches must not all re-authenticate on an expired session
+        self._auth_lock = threading.Lock()
+        self._auth_generation = 0
+        self._credentials_rejected = False
+        # Device sets discovered on the dashboard after login
+        self.device_sets: list[str] = []
+        # Day on which each device's daily totals last matched the 15-minute data
+        self._derived_daily: dict[str, date] = {}
+        # Points of closed days per (device, daily window sensor), fetched once;
+        # None for days fetched without a valid point, e.g. before the meter
+        # was installed or flagged by PND
+        self._daily_points: dict[tuple[str, str], dict[date, Measurement | None]] = {}
 
     def authenticate(self) -> bool:
         """Authenticate with the PND portal."""
+        import requests
+        from bs4 import BeautifulSoup
+
         try:
             _LOGGER.info("🔐 Starting authentication (API version: %s)", API_VERSION)
 
             # Step 1: Get the OAuth2 authorization URL to be redirected to CAS login
             _LOGGER.debug("Starting OAuth2 flow")
+            self._limiter.acquire()
             response = self.session.get(
                 f"{API_BASE_URL}/oauth2/authorization/mepas-external",
                 allow_redirects=True,
@@ -78,6 +142,7 @@ class CezPndApi:
             }
 
             _LOGGER.debug("Attempting login to CAS")
+            self._limiter.acquire()
             response = self.session.post(
                 service_url,
                 data=login_data,
@@ -91,6 +156,8 @@ class CezPndApi:
             final_url = str(response.url).lower()
             if "cezdistribuce.cz" not in final_url:
                 _LOGGER.error("Unexpected redirect after login: %s", response.url)
+                # Still on the CAS login page, the credentials were not accepted
+                self._credentials_rejected = True
                 return False
 
             _LOGGER.debug("Login successful, redirected to: %s", response.url)
@@ -98,14 +165,21 @@ class CezPndApi:
 
             # Step 3: Access PND portal dashboard to establish session
             _LOGGER.debug("Accessing PND portal dashboard")
+            self._limiter.acquire()
             response = self.session.get(
                 f"{API_BASE_URL}/external/dashboard/view",
                 allow_redirects=True,
             )
 
             _LOGGER.debug("Dashboard response status: %s", response.status_code)
+
+            self.device_sets = self._parse_device_sets(response.text)
+            _LOGGER.debug("Discovered device sets: %s", self.device_sets)
+
             _LOGGER.info("✅ Authentication successful (API version: %s)", API_VERSION)
             self._authenticated = True
+            self._credentials_rejected = False
+            self._auth_generation += 1
             return True
 
         except requests.RequestException as err:
@@ -123,13 +197,90 @@ class CezPndApi:
             )
             return False
 
-    def get_data(self) -> dict[str, Any]:
-        """Fetch data from the PND portal."""
-        # Ensure we're authenticated first
-        if not self._authenticated:
+    @staticmethod
+    def _parse_device_sets(html: str) -> list[str]:
+        """Extract the account's device set IDs from the dashboard page."""
+        return list(dict.fromkeys(_DEVICE_SET_RE.findall(html)))
+
+    def _ensure_authenticated(self) -> None:
+        """Authenticate unless a valid session already exists."""
+        if self._authenticated:
+            return
+        with self._auth_lock:
+            if self._authenticated:
+                return
             _LOGGER.debug("Not authenticated, authenticating...")
             if not self.authenticate():
-                raise Exception("Authentication failed")
+                self._raise_auth_failed("Authentication failed")
+
+    def _raise_auth_failed(self, message: str) -> None:
+        """Raise the error matching the last failed authentication."""
+        if self._credentials_rejected:
+            raise CezPndAuthError(message)
+        raise Exception(message)
+
+    def _reauthenticate(self, generation: int) -> None:
+        """Re-authenticate after the session of ``generation`` expired.
+
+        If another thread already logged in again meanwhile, reuse its session.
+        """
+        with self._auth_lock:
+            if self._auth_generation != generation:
+                return
+            _LOGGER.info("Session expired, re-authenticating")
+            self._authenticated = False
+            if not self.authenticate():
+                self._raise_auth_failed("Re-authentication failed")
+
+    def adopt_session(self, other: CezPndApi) -> None:
+        """Take over the authenticated session of another client.
+
+        Used to hand the session validated by the config flow to the entry
+        setup, so adding an account logs in once instead of twice.
+        """
+        with self._auth_lock:
+            self.session.cookies.update(other.session.cookies)
+            self.device_sets = list(other.device_sets)
+            self._authenticated = other._authenticated
+            self._auth_generation += 1
+
+    def discover_device_sets(self) -> list[str]:
+        """Return the device sets to poll, logging in if needed.
+
+        Falls back to the configured device set if none are found on the
+        dashboard.
+        """
+        self._ensure_authenticated()
+        if self.device_sets:
+            return list(self.device_sets)
+        return [self.device_id] if self.device_id else []
+
+    def get_data(self, device_id: str | None = None) -> DeviceData:
+        """Fetch data from the PND portal.
+
+        ``device_id`` selects the device set to read, defaulting to the one the
+        client was created for, so entries sharing an account share the client.
+        """
+        device_id = device_id or self.device_id
+        return self.get_devices_data([device_id])[device_id]
+
+    def get_devices_data(
+        self,
+        device_ids: list[str],
+        daily_days: int = DEFAULT_DAILY_DAYS,
+        measurement_types: tuple[MeasurementType, ...] = ENABLED_TYPES,
+    ) -> dict[str, DeviceData]:
+        """Fetch data for several device sets in one batch over this session.
+
+        The requests of every device set and measurement type are planned
+        first and then run concurrently on the pooled session, bounded by
+        FETCH_CONCURRENCY, after at most one login.
+
+        ``daily_days`` is the window of daily consumption, ending today. Closed
+        days are fetched once in chunks of DAILY_CHUNK_DAYS and kept, so each
+        poll only requests yesterday and today no matter how long it is.
+        """
+        self._ensure_authenticated()
 
         now = datetime.now()
         date_format = "%d.%m.%Y %H:%M"
@@ -144,280 +295,353 @@ class CezPndApi:
         yesterday_from = yesterday.strftime(date_format)
         yesterday_to = yesterday.replace(hour=23, minute=59, second=59).strftime(date_format)
 
+        # Daily consumption over the configured window (including today)
+        # API expects intervalFrom as start of first day, intervalTo as start of next day after last day
+        # Example: For Dec 23-29, use intervalFrom="23.12.2025 00:00", intervalTo="30.12.2025 00:00"
+        window_start = today - timedelta(days=daily_days - 1)
+        window_end = today + timedelta(days=1)  # Tomorrow (for intervalTo)
+        recent_from = yesterday_from if daily_days > 1 else today_from
+        recent_to = window_end.strftime(date_format)
+
         _LOGGER.debug("Fetching today's data from %s to %s", today_from, today_to)
         _LOGGER.debug("Fetching yesterday's data from %s to %s", yesterday_from, yesterday_to)
 
-        # Fetch today's data
-        consumption_today = self._fetch_data(ID_ASSEMBLY_CONSUMPTION, today_from, today_to)
-        production_today = self._fetch_data(ID_ASSEMBLY_PRODUCTION, today_from, today_to)
+        # (key, type, parser, from, to) of every request of a device set
+        series_types = [
+            measurement for measurement in measurement_types
+            if measurement.resolution == RESOLUTION_SLOT
+        ]
+        daily_sensors = [
+            (measurement, sensor)
+            for measurement in measurement_types
+            if measurement.resolution == RESOLUTION_DAY
+            for sensor in measurement.sensors
+        ]
+        series_requests = [
+            # 15-minute power data (from yesterday's midnight to now)
+            (measurement.key, measurement, measurement.parser, yesterday_from, today_to)
+            for measurement in series_types
+        ] + [
+            # Yesterday and today of the daily window, which can still change
+            (sensor.key, measurement, measurement.parser, recent_from, recent_to)
+            for measurement, sensor in daily_sensors
+            if sensor.period == PERIOD_WINDOW
+        ]
+        periods = {
+            PERIOD_TODAY: (today, today_from, today_to),
+            PERIOD_YESTERDAY: (yesterday, yesterday_from, yesterday_to),
+        }
+        period_sensors = [
+            (measurement, sensor)
+            for measurement, sensor in daily_sensors
+            if sensor.period in periods
+        ]
+        daily_requests = [
+            (sensor.key, measurement, parse_totals, *periods[sensor.period][1:])
+            for measurement, sensor in period_sensors
+        ]
+
+        # The power series cover yesterday and today, so daily energy for both
+        # days can be derived from them. Once the derivation matched PND's own
+        # daily totals today, the daily requests are skipped for the rest of
+        # the day.
+        power_keys = {
+            measurement.series: measurement.key
+            for measurement in series_types if measurement.series
+        }
+        derivable = all(
+            measurement.series in power_keys for measurement, _sensor in period_sensors
+        )
+        derived_devices = {
+            device_id for device_id in device_ids
+            if derivable and self._derived_daily.get(device_id) == today.date()
+        }
+        # Closed days of the daily window not fetched yet, in chunks
+        window_requests = {
+            device_id: [
+                (
+                    (sensor.key, first, end),
+                    measurement,
+                    measurement.parser,
+                    datetime.combine(first, datetime.min.time()).strftime(date_format),
+                    datetime.combine(end, datetime.min.time()).strftime(date_format),
+                )
+                for measurement, sensor in daily_sensors
+                if sensor.period == PERIOD_WINDOW
+                for first, end in self._missing_daily_chunks(
+                    device_id, sensor.key, window_start.date(), yesterday.date()
+                )
+            ]
+            for device_id in device_ids
+        }
 
-        # Fetch yesterday's data
-        consumption_yesterday = self._fetch_data(ID_ASSEMBLY_CONSUMPTION, yesterday_from, yesterday_to)
-        production_yesterday = self._fetch_data(ID_ASSEMBLY_PRODUCTION, yesterday_from, yesterday_to)
+        with ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as executor:
+            futures = {
+                (device_id, key): executor.submit(
+                    self._fetch, measurement, parser, interval_from, interval_to, device_id
+                )
+                for device_id in device_ids
+                for key, measurement, parser, interval_from, interval_to in (
+                    (
+                        series_requests if device_id in derived_devices
+                        else daily_requests + series_requests
+                    )
+                    + window_requests[device_id]
+                )
+            }
+            results = {request: future.result() for request, future in futures.items()}
 
-        # Fetch today's 15-minute power data (from midnight to now)
-        consumption_power = self._fetch_power_data(ID_ASSEMBLY_CONSUMPTION_POWER, today_from, today_to)
-        production_power = self._fetch_power_data(ID_ASSEMBLY_PRODUCTION_POWER, today_from, today_to)
+        last_update = datetime.now()
+        devices: dict[str, DeviceData] = {}
+        for device_id in device_ids:
+            result: dict[str, DailyResult | SeriesResult] = {
+                key: results[(device_id, key)] for key, *_ in series_requests
+            }
+            for measurement, sensor in daily_sensors:
+                if sensor.period == PERIOD_WINDOW:
+                    result[sensor.key] = self._merge_daily_window(
+                        device_id,
+                        sensor.key,
+                        result[sensor.key],
+                        {
+                            key[1:]: results[(device_id, key)]
+                            for key, *_ in window_requests[device_id]
+                            if key[0] == sensor.key
+                        },
+                        window_start,
+                        yesterday,
+                    )
+            derived_energy = {
+                series: daily_energy(result[key].measurements)
+                for series, key in power_keys.items()
+            }
 
-        # Fetch 7-day historical consumption data (including today)
-        # API expects intervalFrom as start of first day, intervalTo as start of next day after last day
-        # Example: For Dec 23-29, use intervalFrom="23.12.2025 00:00", intervalTo="30.12.2025 00:00"
-        week_start = today - timedelta(days=6)  # 6 days ago + today = 7 days
-        week_end = today + timedelta(days=1)  # Tomorrow (for intervalTo)
-        week_from = week_start.strftime(date_format)
-        week_to = week_end.strftime(date_format)
-        consumption_week = self._fetch_power_data(ID_ASSEMBLY_CONSUMPTION, week_from, week_to)
-
-        result = {
-            "consumption_today": consumption_today,
-            "consumption_yesterday": consumption_yesterday,
-            "production_today": production_today,
-            "production_yesterday": production_yesterday,
-            "consumption_power": consumption_power,
-            "production_power": production_power,
-            "consumption_week": consumption_week,
-            "last_update": datetime.now().isoformat(),
-        }
+            def derived_total(measurement: MeasurementType, sensor: DailySensor) -> float:
+                """Return the derived energy of a today or yesterday sensor."""
+                day = periods[sensor.period][0].date()
+                return derived_energy[measurement.series].get(day, 0.0)
+
+            if device_id in derived_devices:
+                for measurement, sensor in period_sensors:
+                    result[sensor.key] = self._derived_daily_data(
+                        derived_total(measurement, sensor),
+                        periods[sensor.period][0],
+                        result[power_keys[measurement.series]].name,
+                    )
+            else:
+                result.update(
+                    (key, results[(device_id, key)]) for key, *_ in daily_requests
+                )
+                if derivable and period_sensors and all(
+                    totals_match(derived_total(measurement, sensor), result[sensor.key].total)
+                    for measurement, sensor in period_sensors
+                ):
+                    self._derived_daily[device_id] = today.date()
+                    _LOGGER.info(
+                        "Daily totals of %s match the 15-minute data, deriving them for today",
+                        device_id,
+                    )
+
+            devices[device_id] = DeviceData(result, last_update=last_update)
+            _LOGGER.info(
+                "Data fetched for %s: %s",
+                device_id,
+                ", ".join(
+                    f"{key}={value.total if isinstance(value, DailyResult) else value.value}"
+                    for key, value in result.items()
+                ),
+            )
 
-        _LOGGER.info(
-            "Data fetched: today cons=%s prod=%s, yesterday cons=%s prod=%s, power cons=%s prod=%s",
-            consumption_today.get("total", "N/A"),
-            production_today.get("total", "N/A"),
-            consumption_yesterday.get("total", "N/A"),
-            production_yesterday.get("total", "N/A"),
-            consumption_power.get("current", "N/A"),
-            production_power.get("current", "N/A"),
+        return devices
+
+    def get_power_intervals(
+        self, intervals: list[tuple[str, MeasurementType, datetime, datetime]]
+    ) -> list[SeriesResult]:
+        """Fetch the series of (device set, measurement type, start, end) intervals.
+
+        Used to backfill days and to refetch only the parts of past days that
+        still have gaps. Results are returned in the order of ``intervals``.
+        """
+        self._ensure_authenticated()
+
+        with ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as executor:
+            futures = [
+                executor.submit(
+                    self._fetch,
+                    measurement,
+                    measurement.parser,
+                    start.strftime(TIMESTAMP_FORMAT),
+                    end.strftime(TIMESTAMP_FORMAT),
+                    device_id,
+                )
+                for device_id, measurement, start, end in intervals
+            ]
+            return [future.result() for future in futures]
+
+    def _missing_daily_chunks(
+        self, device_id: str, key: str, start: date, end: date
+    ) -> list[tuple[date, date]]:
+        """Return chunks of the closed days in [start, end) not fetched yet."""
+        known = self._daily_points.get((device_id, key), {})
+        missing = [
+            start + timedelta(days=offset)
+            for offset in range((end - start).days)
+            if start + timedelta(days=offset) not in known
+        ]
+        return chunk_days(missing, DAILY_CHUNK_DAYS)
+
+    def _merge_daily_window(
+        self,
+        device_id: str,
+        key: str,
+        recent: SeriesResult,
+        chunks: dict[tuple[date, date], SeriesResult],
+        window_start: datetime,
+        yesterday: datetime,
+    ) -> SeriesResult:
+        """Combine the closed days kept so far with the newly fetched days.
+
+        ``chunks`` maps the [first, end) days of each new chunk to its result;
+        every day of a chunk counts as fetched, with or without a valid point.
+        Returns the whole window in the shape of ``parse_series``.
+        """
+        known = self._daily_points.setdefault((device_id, key), {})
+        for first, end in chunks:
+            for offset in range((end - first).days):
+                known.setdefault(first + timedelta(days=offset), None)
+        for data in (*chunks.values(), recent):
+            for point in data.measurements:
+                day = point_day(point.end)
+                if day < yesterday.date():
+                    known[day] = point
+
+        # Keep the cache bounded, whatever windows the entries ask for
+        oldest = yesterday.date() - timedelta(days=MAX_HISTORY_DAYS)
+        for day in [day for day in known if day < oldest]:
+            del known[day]
+
+        measurements = [
+            point
+            for day, point in sorted(known.items())
+            if point is not None and day >= window_start.date()
+        ]
+        measurements.extend(
+            point for point in recent.measurements
+            if point_day(point.end) >= yesterday.date()
+        )
+        values = [point.value for point in measurements]
+        return replace(
+            recent,
+            measurements=tuple(measurements),
+            flagged=tuple(point for data in (*chunks.values(), recent) for point in data.flagged),
+            total=sum(values),
+            min=min(values, default=0.0),
+            max=max(values, default=0.0),
+            date_from=window_start.date(),
         )
 
-        return result
+    @staticmethod
+    def _derived_daily_data(total: float, day: datetime, name: str) -> DailyResult:
+        """Return daily data computed locally, like ``parse_totals`` returns it."""
+        return DailyResult(
+            value=total,
+            total=total,
+            min=total,
+            max=total,
+            name=name,
+            unit="kWh",
+            date_from=day.date(),
+            date_to=day.date(),
+        )
 
-    def _fetch_data(
-        self,
-        id_assembly: int,
-        interval_from: str,
-        interval_to: str,
-    ) -> dict[str, Any]:
-        """Fetch data for a specific assembly ID."""
-        payload = {
-            "format": "chart",
-            "idAssembly": id_assembly,
-            "idDeviceSet": self.device_id,
-            "intervalFrom": interval_from,
-            "intervalTo": interval_to,
-            "compareFrom": "",
-            "opmId": None,
-            "electrometerId": None,
-        }
+    def _post_data(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Post a data request, re-authenticating once if the session expired."""
+        generation = self._auth_generation
+        self._limiter.acquire()
+        response = self.session.post(
+            API_DATA_URL,
+            json=payload,
+            allow_redirects=False,
+        )
 
-        try:
-            _LOGGER.debug("Fetching data for assembly %s", id_assembly)
+        _LOGGER.debug("Response status: %s, URL: %s", response.status_code, response.url)
+
+        if response.status_code == 302 or response.status_code == 401:
+            # Session expired, re-authenticate
+            self._reauthenticate(generation)
+
+            # Retry the request
+            _LOGGER.debug("Retrying data fetch after re-authentication")
+            self._limiter.acquire()
             response = self.session.post(
                 API_DATA_URL,
                 json=payload,
                 allow_redirects=False,
             )
 
-            _LOGGER.debug("Response status: %s, URL: %s", response.status_code, response.url)
-
-            if response.status_code == 302 or response.status_code == 401:
-                # Session expired, re-authenticate
-                _LOGGER.info("Session expired, re-authenticating")
-                self._authenticated = False
-                if not self.authenticate():
-                    raise Exception("Re-authentication failed")
-
-                # Retry the request
-                _LOGGER.debug("Retrying data fetch after re-authentication")
-                response = self.session.post(
-                    API_DATA_URL,
-                    json=payload,
-                    allow_redirects=False,
-                )
-
-            response.raise_for_status()
-            data = response.json()
-
-            _LOGGER.debug("Received data successfully")
-
-            # Extract the relevant information
-            if data.get("hasData") and data.get("series"):
-                series = data["series"][0]
-                stats = data["seriesStats"][0] if data.get("seriesStats") else {}
-
-                # Extract the last data point value
-                last_value = 0.0
-                if series.get("data") and len(series["data"]) > 0:
-                    last_data_point = series["data"][-1]
-                    if len(last_data_point) >= 2:
-                        last_value = float(last_data_point[1])
-
-                return {
-                    "value": last_value,
-                    "total": self._parse_czech_number(stats.get("total", "0")),
-                    "min": self._parse_czech_number(stats.get("min", "0")),
-                    "max": self._parse_czech_number(stats.get("max", "0")),
-                    "name": series.get("name", ""),
-                    "unit": data.get("unitY", "kWh"),
-                    "date_from": stats.get("dateFrom", ""),
-                    "date_to": stats.get("dateTo", ""),
-                }
-
-            return {
-                "value": 0.0,
-                "total": 0.0,
-                "min": 0.0,
-                "max": 0.0,
-                "name": "",
-                "unit": "kWh",
-                "date_from": "",
-                "date_to": "",
-            }
-
-        except requests.RequestException as err:
-            _LOGGER.error(
-                "Network error fetching data for assembly %s: %s (type: %s)",
-                id_assembly,
-                err,
-                type(err).__name__,
-            )
-            raise
-        except Exception as err:
-            _LOGGER.error(
-                "Error fetching data for assembly %s: %s (type: %s)",
-                id_assembly,
-                err,
-                type(err).__name__,
-            )
-            raise
+        response.raise_for_status()
+        return response.json()
 
-    def _fetch_power_data(
+    def _fetch(
         self,
-        id_assembly: int,
+        measurement: MeasurementType,
+        parser: Callable[[dict[str, Any]], DailyResult | SeriesResult],
         interval_from: str,
         interval_to: str,
-    ) -> dict[str, Any]:
-        """Fetch 15-minute power data for a specific assembly ID."""
+        device_id: str,
+    ) -> DailyResult | SeriesResult:
+        """Fetch one interval of a measurement type and parse the response."""
+        import requests
+
         payload = {
             "format": "chart",
-            "idAssembly": id_assembly,
-            "idDeviceSet": self.device_id,
+            "idAssembly": measurement.id_assembly,
+            "idDeviceSet": device_id,
             "intervalFrom": interval_from,
             "intervalTo": interval_to,
-            "compareFrom": None,
+            "compareFrom": measurement.compare_from,
             "opmId": None,
             "electrometerId": None,
         }
 
         try:
-            _LOGGER.debug("Fetching power data for assembly %s", id_assembly)
-            response = self.session.post(
-                API_DATA_URL,
-                json=payload,
-                allow_redirects=False,
-            )
-
-            _LOGGER.debug("Response status: %s, URL: %s", response.status_code, response.url)
-
-            if response.status_code == 302 or response.status_code == 401:
-                # Session expired, re-authenticate
-                _LOGGER.info("Session expired, re-authenticating")
-                self._authenticated = False
-                if not self.authenticate():
-                    raise Exception("Re-authentication failed")
-
-                # Retry the request
-                _LOGGER.debug("Retrying power data fetch after re-authentication")
-                response = self.session.post(
-                    API_DATA_URL,
-                    json=payload,
-                    allow_redirects=False,
-                )
-
-            response.raise_for_status()
-            data = response.json()
-
-            _LOGGER.debug("Received power data successfully")
-
-            # Extract 15-minute interval data
-            if data.get("hasData") and data.get("series"):
-                series = data["series"][0]
-                stats = data["seriesStats"][0] if data.get("seriesStats") else {}
-                raw_data = series.get("data", [])
-
-                # Filter out invalid data points (status != "naměřená data OK")
-                valid_data = []
-                for point in raw_data:
-                    if len(point) >= 3 and point[2] == "naměřená data OK":
-                        valid_data.append({
-                            "timestamp": point[0],
-                            "value": float(point[1]),
-                        })
-
-                # Get the latest valid measurement
-                current_power = 0.0
-                latest_timestamp = ""
-                if valid_data:
-                    latest = valid_data[-1]
-                    current_power = latest["value"]
-                    latest_timestamp = latest["timestamp"]
-
-                return {
-                    "current": current_power,
-                    "latest_timestamp": latest_timestamp,
-                    "measurements": valid_data,
-                    "total": self._parse_czech_number(stats.get("total", "0")),
-                    "min": self._parse_czech_number(stats.get("min", "0")),
-                    "max": self._parse_czech_number(stats.get("max", "0")),
-                    "name": series.get("name", ""),
-                    "unit": data.get("unitY", "kW"),
-                    "date_from": stats.get("dateFrom", ""),
-                    "date_to": stats.get("dateTo", ""),
-                }
-
-            return {
-                "current": 0.0,
-                "latest_timestamp": "",
-                "measurements": [],
-                "total": 0.0,
-                "min": 0.0,
-                "max": 0.0,
-                "name": "",
-                "unit": "kW",
-                "date_from": "",
-                "date_to": "",
-            }
-
+            _LOGGER.debug("Fetching %s for assembly %s", measurement.key, measurement.id_assembly)
+            result = parser(self._post_data(payload))
         except requests.RequestException as err:
             _LOGGER.error(
-                "Network error fetching power data for assembly %s: %s (type: %s)",
-                id_assembly,
+                "Network error fetching %s for assembly %s: %s (type: %s)",
+                measurement.key,
+                measurement.id_assembly,
                 err,
                 type(err).__name__,
             )
             raise
         except Exception as err:
             _LOGGER.error(
-                "Error fetching power data for assembly %s: %s (type: %s)",
-                id_assembly,
+                "Error fetching %s for assembly %s: %s (type: %s)",
+                measurement.key,
+                measurement.id_assembly,
                 err,
                 type(err).__name__,
             )
             raise
 
-    @staticmethod
-    def _parse_czech_number(value: str) -> float:
-        """Parse Czech number format (comma as decimal separator)."""
-        if isinstance(value, (int, float)):
-            return float(value)
-        try:
-            # Replace comma with dot and remove spaces
-            cleaned = str(value).replace(",", ".").replace(" ", "")
-            return float(cleaned)
-        except (ValueError, AttributeError):
-            return 0.0
+        if isinstance(result, SeriesResult) and result.flagged:
+            _LOGGER.debug(
+                "Assembly %s has %d flagged points, first ending at %s",
+                measurement.id_assembly,
+                len(result.flagged),
+                result.flagged[0].end,
+            )
+        return result
 
     def close(self) -> None:
         """Close the requests session."""
         if self.session:
-            self.session.close()
+            if self._shared_adapter:
+                # Closing the session would tear down the pool other clients use
+                self.session.cookies.clear()
+            else:
+                self.session.close()
+            self._authenticated = False
             _LOGGER.debug("Closed requests session")
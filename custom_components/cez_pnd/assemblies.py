@@ -0,0 +1,214 @@
+"""Registry of the PND measurement types the integration reads.
+
+Each type declares its assembly, unit, resolution, how its responses are
+parsed, and what it feeds: a series of the local history and kWh sensors.
+Polls build their fetch plan from the enabled types, so reading another
+PND series takes an entry here rather than more fetch code, and its
+requests join the poll's one concurrent batch.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
+
+from .aggregation import RESOLUTION_DAY, RESOLUTION_SLOT, parse_slot_end
+from .const import (
+    ID_ASSEMBLY_CONSUMPTION,
+    ID_ASSEMBLY_CONSUMPTION_POWER,
+    ID_ASSEMBLY_PRODUCTION,
+    ID_ASSEMBLY_PRODUCTION_POWER,
+    PND_STATUS_OK,
+    STATUS_INVALID,
+)
+from .models import DailyResult, FlaggedPoint, Measurement, SeriesResult
+
+# Periods a daily sensor shows
+PERIOD_TODAY = "today"
+PERIOD_YESTERDAY = "yesterday"
+# The configured daily window, see CONF_DAILY_DAYS
+PERIOD_WINDOW = "window"
+
+
+def parse_czech_number(value: Any) -> float:
+    """Parse Czech number format (comma as decimal separator)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        # Replace comma with dot and remove spaces
+        cleaned = str(value).replace(",", ".").replace(" ", "")
+        return float(cleaned)
+    except (ValueError, AttributeError):
+        return 0.0
+
+
+def parse_czech_date(value: str) -> date | None:
+    """Parse a Czech "28.12.2025" date, ignoring a trailing time."""
+    try:
+        return datetime.strptime(str(value)[:10], "%d.%m.%Y").date()
+    except ValueError:
+        return None
+
+
+def parse_totals(data: dict[str, Any]) -> DailyResult:
+    """Parse the summary of a chart response: its total, min and max."""
+    if not (data.get("hasData") and data.get("series")):
+        return DailyResult()
+    series = data["series"][0]
+    stats = data["seriesStats"][0] if data.get("seriesStats") else {}
+
+    # Extract the last data point value
+    last_value = 0.0
+    if series.get("data") and len(series["data"][-1]) >= 2:
+        last_value = float(series["data"][-1][1])
+
+    return DailyResult(
+        value=last_value,
+        total=parse_czech_number(stats.get("total", "0")),
+        min=parse_czech_number(stats.get("min", "0")),
+        max=parse_czech_number(stats.get("max", "0")),
+        name=series.get("name", ""),
+        unit=data.get("unitY", "kWh"),
+        date_from=parse_czech_date(stats.get("dateFrom", "")),
+        date_to=parse_czech_date(stats.get("dateTo", "")),
+    )
+
+
+def parse_series(data: dict[str, Any]) -> SeriesResult:
+    """Parse the points of a chart response.
+
+    Valid points become measurements and the timestamps of the rest are
+    kept as flagged, so the gaps can be refetched later. Timestamps are
+    parsed once here, everything downstream uses the datetimes.
+    """
+    if not (data.get("hasData") and data.get("series")):
+        return SeriesResult()
+    series = data["series"][0]
+    stats = data["seriesStats"][0] if data.get("seriesStats") else {}
+
+    valid_data = []
+    flagged = []
+    seen: set[datetime] = set()
+    for point in series.get("data", []):
+        if not point:
+            continue
+        end = parse_slot_end(point[0])
+        if end in seen:
+            # Stamps of the hour repeated when clocks go back come twice
+            end = end.replace(fold=1)
+        seen.add(end)
+        if len(point) >= 3 and point[2] == PND_STATUS_OK:
+            valid_data.append(Measurement(end, float(point[1])))
+        else:
+            flagged.append(FlaggedPoint(end, STATUS_INVALID))
+
+    return SeriesResult(
+        measurements=tuple(valid_data),
+        flagged=tuple(flagged),
+        total=parse_czech_number(stats.get("total", "0")),
+        min=parse_czech_number(stats.get("min", "0")),
+        max=parse_czech_number(stats.get("max", "0")),
+        name=series.get("name", ""),
+        unit=data.get("unitY", "kW"),
+        date_from=parse_czech_date(stats.get("dateFrom", "")),
+        date_to=parse_czech_date(stats.get("dateTo", "")),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class DailySensor:
+    """A kWh sensor showing one period of a daily measurement type."""
+
+    key: str
+    name: str
+    period: str
+    icon: str | None = None
+    # Window sums aren't readings of a meter that resets, so they have no state class
+    total: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class MeasurementType:
+    """One series PND serves, and what the integration does with it.
+
+    A 15-minute type with ``series`` is polled into that series of the
+    local history. A daily type with ``series`` is what revisions of that
+    series are checked against, and its today and yesterday totals can be
+    derived from the 15-minute type of the same series.
+    """
+
+    key: str
+    id_assembly: int
+    unit: str
+    resolution: str
+    parser: Callable[[dict[str, Any]], SeriesResult] = parse_series
+    series: str | None = None
+    icon: str = "mdi:transmission-tower"
+    sensors: tuple[DailySensor, ...] = ()
+    enabled: bool = True
+    # compareFrom of the data request, as the PND portal sends it for the type
+    compare_from: str | None = None
+
+
+MEASUREMENT_TYPES: tuple[MeasurementType, ...] = (
+    MeasurementType(
+        "consumption_energy",
+        ID_ASSEMBLY_CONSUMPTION,
+        "kWh",
+        RESOLUTION_DAY,
+        compare_from="",
+        series="consumption",
+        sensors=(
+            DailySensor("consumption_today", "Consumption Today", PERIOD_TODAY),
+            DailySensor("consumption_yesterday", "Consumption Yesterday", PERIOD_YESTERDAY),
+            DailySensor(
+                "consumption_week", "Consumption Window", PERIOD_WINDOW, "mdi:chart-bar", total=False
+            ),
+        ),
+    ),
+    MeasurementType(
+        "production_energy",
+        ID_ASSEMBLY_PRODUCTION,
+        "kWh",
+        RESOLUTION_DAY,
+        compare_from="",
+        series="production",
+        icon="mdi:solar-power",
+        sensors=(
+            DailySensor("production_today", "Production Today", PERIOD_TODAY),
+            DailySensor("production_yesterday", "Production Yesterday", PERIOD_YESTERDAY),
+        ),
+    ),
+    MeasurementType(
+        "consumption_power",
+        ID_ASSEMBLY_CONSUMPTION_POWER,
+        "kW",
+        RESOLUTION_SLOT,
+        series="consumption",
+    ),
+    MeasurementType(
+        "production_power",
+        ID_ASSEMBLY_PRODUCTION_POWER,
+        "kW",
+        RESOLUTION_SLOT,
+        series="production",
+        icon="mdi:solar-power",
+    ),
+)
+
+ENABLED_TYPES = tuple(measurement for measurement in MEASUREMENT_TYPES if measurement.enabled)
+
+# 15-minute type of each history series
+SERIES_TYPES: dict[str, MeasurementType] = {
+    measurement.series: measurement
+    for measurement in ENABLED_TYPES
+    if measurement.resolution == RESOLUTION_SLOT and measurement.series
+}
+
+# Daily energy type of each history series, used to detect revisions
+DAILY_TYPES: dict[str, MeasurementType] = {
+    measurement.series: measurement
+    for measurement in ENABLED_TYPES
+    if measurement.resolution == RESOLUTION_DAY and measurement.series
+}
@@ -0,0 +1,230 @@
+"""Compact day-chunked column files for 15-minute series.
+
+Each column is one file: a fixed header followed by one chunk per day with
+one fixed-width integer per 15-minute slot. The slot grid is fixed, so
+timestamps are not stored at all: a value's time follows from the file's
+first day and its position. Chunks are contiguous, so any day range is a
+single slice of the memory-mapped file and is read without copying.
+
+Layout (little endian)::
+
+    magic "PNDC" | version u8 | typecode char | slots per day u16
+    | first day i32 (days since 1970-01-01) | day count u32
+    | missing value i32 | scale i32
+    day chunks: slots per day x item of ``typecode``
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator, Mapping, Sequence
+from datetime import date, timedelta
+import mmap
+import os
+import struct
+from typing import BinaryIO
+
+MAGIC = b"PNDC"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sBcHiIii")
+
+EPOCH = date(1970, 1, 1)
+
+SLOTS_PER_DAY = 96
+
+# Sentinels for slots without data
+MISSING_INT32 = -(2**31)
+MISSING_UINT8 = 255
+
+
+def day_number(day: date) -> int:
+    """Return the number of days since the epoch."""
+    return (day - EPOCH).days
+
+
+class ColumnFile:
+    """One memory-mapped column of day-aligned fixed-width slot values.
+
+    Memoryviews returned by the read methods point into the mapping and
+    must be released before the next write or ``close``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        typecode: str = "i",
+        missing: int = MISSING_INT32,
+        scale: int = 1,
+        slots_per_day: int = SLOTS_PER_DAY,
+    ) -> None:
+        """Open ``path``, creating an empty column if it doesn't exist."""
+        self.path = path
+        self.typecode = typecode
+        self.missing = missing
+        self.scale = scale
+        self.slots_per_day = slots_per_day
+        self.first_day = 0
+        self.day_count = 0
+        self._itemsize = array(typecode).itemsize
+        self._mmap: mmap.mmap | None = None
+
+        if os.path.exists(path):
+            self._read_header()
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(self._header())
+
+    @property
+    def chunk_size(self) -> int:
+        """Return the size of one day chunk in bytes."""
+        return self.slots_per_day * self._itemsize
+
+    @property
+    def start(self) -> date | None:
+        """Return the first stored day."""
+        return EPOCH + timedelta(days=self.first_day) if self.day_count else None
+
+    @property
+    def end(self) -> date | None:
+        """Return the day after the last stored day."""
+        return EPOCH + timedelta(days=self.first_day + self.day_count) if self.day_count else None
+
+    def _header(self) -> bytes:
+        """Return the encoded header."""
+        return _HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            self.typecode.encode(),
+            self.slots_per_day,
+            self.first_day,
+            self.day_count,
+            self.missing,
+            self.scale,
+        )
+
+    def _read_header(self) -> None:
+        """Load the header of an existing file."""
+        with open(self.path, "rb") as file:
+            raw = file.read(_HEADER.size)
+        magic, version, typecode, slots, first_day, day_count, missing, scale = _HEADER.unpack(raw)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} column file")
+        self.typecode = typecode.decode()
+        self.slots_per_day = slots
+        self.first_day = first_day
+        self.day_count = day_count
+        self.missing = missing
+        self.scale = scale
+        self._itemsize = array(self.typecode).itemsize
+
+    def _map(self) -> mmap.mmap | None:
+        """Return the read-only mapping of the file, if it has any chunks."""
+        if self._mmap is None and self.day_count:
+            with open(self.path, "rb") as file:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def close(self) -> None:
+        """Release the mapping."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def read_range(self, start: date, end: date) -> tuple[date, memoryview]:
+        """Return the slots of the stored days in [start, end).
+
+        Returns the first day actually covered and a zero-copy view of
+        ``days x slots_per_day`` items, clipped to the stored range.
+        """
+        first = max(day_number(start), self.first_day)
+        last = min(day_number(end), self.first_day + self.day_count)
+        mapping = self._map()
+        if mapping is None or last <= first:
+            return start, memoryview(b"").cast(self.typecode)
+
+        offset = _HEADER.size + (first - self.first_day) * self.chunk_size
+        with memoryview(mapping) as whole:
+            view = whole[offset:offset + (last - first) * self.chunk_size].cast(self.typecode)
+        return EPOCH + timedelta(days=first), view
+
+    def iter_days(self) -> Iterator[tuple[date, memoryview]]:
+        """Yield every stored day with a zero-copy view of its slots."""
+        if not self.day_count:
+            return
+        yield from self.iter_range(self.start, self.end)
+
+    def iter_range(self, start: date, end: date) -> Iterator[tuple[date, memoryview]]:
+        """Yield the stored days in [start, end) with zero-copy views of their slots.
+
+        A day's view is released when the next day is requested.
+        """
+        first, view = self.read_range(start, end)
+        try:
+            for index in range(len(view) // self.slots_per_day):
+                with view[index * self.slots_per_day:(index + 1) * self.slots_per_day] as day:
+                    yield first + timedelta(days=index), day
+        finally:
+            view.release()
+
+    def write_days(self, days: Mapping[date, Sequence[int]]) -> None:
+        """Write whole day chunks, growing the file as needed.
+
+        Days after the stored range are appended and days inside it are
+        overwritten in place; days before it require rewriting the file.
+        The chunks are synced before the header that makes appended days
+        visible, so a crash leaves the previous range readable; an
+        interrupted overwrite leaves each slot with its old or new item.
+        """
+        if not days:
+            return
+        self.close()
+
+        numbers = {day_number(day): values for day, values in days.items()}
+        first = min(numbers)
+        last = max(numbers) + 1
+        empty = array(self.typecode, [self.missing] * self.slots_per_day).tobytes()
+
+        if self.day_count and first < self.first_day:
+            self._prepend(self.first_day - first, empty)
+        elif not self.day_count:
+            self.first_day = first
+
+        with open(self.path, "r+b") as file:
+            if last > self.first_day + self.day_count:
+                # Fill the gap up to the new last day with empty chunks
+                file.seek(_HEADER.size + self.day_count * self.chunk_size)
+                file.write(empty * (last - self.first_day - self.day_count))
+                self.day_count = last - self.first_day
+
+            for number, values in sorted(numbers.items()):
+                if len(values) != self.slots_per_day:
+                    raise ValueError(f"Expected {self.slots_per_day} slots, got {len(values)}")
+                file.seek(_HEADER.size + (number - self.first_day) * self.chunk_size)
+                file.write(array(self.typecode, values).tobytes())
+            _sync(file)
+
+            file.seek(0)
+            file.write(self._header())
+            _sync(file)
+
+    def _prepend(self, count: int, empty: bytes) -> None:
+        """Rewrite the file with ``count`` empty days before the first day."""
+        with open(self.path, "rb") as file:
+            file.seek(_HEADER.size)
+            body = file.read()
+        self.first_day -= count
+        self.day_count += count
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(self._header())
+            file.write(empty * count)
+            file.write(body)
+            _sync(file)
+        os.replace(tmp_path, self.path)
+
+
+def _sync(file: BinaryIO) -> None:
+    """Flush a file's writes to disk."""
+    file.flush()
+    os.fsync(file.fileno())
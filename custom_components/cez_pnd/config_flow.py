@@ -1,6 +1,7 @@
 """Config flow for ČEZ Distribuce PND integration using requests."""
 from __future__ import annotations
 
+from collections.abc import Mapping
 import logging
 from typing import Any
 
@@ -8,12 +9,27 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
-from .api_requests import CezPndApi
-from .const import DEFAULT_DEVICE_ID, DOMAIN
+from .const import (
+    CONF_DAILY_DAYS,
+    CONF_MEMORY_DAYS,
+    CONF_NT_PRICE,
+    CONF_NT_WINDOWS,
+    CONF_NT_WINDOWS_WEEKEND,
+    CONF_POWER_DAYS,
+    CONF_VT_PRICE,
+    DEFAULT_DAILY_DAYS,
+    DEFAULT_MEMORY_DAYS,
+    DEFAULT_POWER_DAYS,
+    DOMAIN,
+    MAX_HISTORY_DAYS,
+    MIN_MEMORY_DAYS,
+)
+from .manager import async_get_manager
+from .tariff import parse_windows
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,14 +37,43 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_USERNAME): str,
         vol.Required(CONF_PASSWORD): str,
-        vol.Optional("device_id", default=DEFAULT_DEVICE_ID): str,
+        vol.Optional("device_id", default=""): str,
+    }
+)
+
+STEP_REAUTH_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_PASSWORD): str,
+    }
+)
+
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_DAILY_DAYS, default=DEFAULT_DAILY_DAYS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_HISTORY_DAYS)
+        ),
+        vol.Required(CONF_POWER_DAYS, default=DEFAULT_POWER_DAYS): vol.All(
+            vol.Coerce(int), vol.Range(min=DEFAULT_POWER_DAYS, max=MAX_HISTORY_DAYS)
+        ),
+        vol.Required(CONF_MEMORY_DAYS, default=DEFAULT_MEMORY_DAYS): vol.All(
+            vol.Coerce(int), vol.Range(min=MIN_MEMORY_DAYS, max=MAX_HISTORY_DAYS)
+        ),
+        vol.Optional(CONF_VT_PRICE): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_NT_PRICE): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_NT_WINDOWS, default=""): str,
+        vol.Optional(CONF_NT_WINDOWS_WEEKEND, default=""): str,
     }
 )
 
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the user input allows us to connect."""
-    api = CezPndApi(data[CONF_USERNAME], data[CONF_PASSWORD], data.get("device_id", DEFAULT_DEVICE_ID))
+    """Validate the user input allows us to connect.
+
+    The authenticated session is handed over to the manager, so the entry
+    setup that follows reuses it instead of logging in again.
+    """
+    manager = async_get_manager(hass)
+    api = manager.create_client(data[CONF_USERNAME], data[CONF_PASSWORD], data.get("device_id", ""))
 
     try:
         # Run synchronous authentication in executor
@@ -37,13 +82,14 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
             _LOGGER.error("Authentication failed: authenticate returned False")
             raise InvalidAuth("Authentication failed")
     except InvalidAuth:
+        await hass.async_add_executor_job(api.close)
         raise
     except Exception as err:
         _LOGGER.error("Authentication failed: %s", err)
-        raise InvalidAuth from err
-    finally:
-        # Close the session after validation
         await hass.async_add_executor_job(api.close)
+        raise InvalidAuth from err
+
+    manager.hand_over_client(api)
 
     return {"title": f"ČEZ PND ({data[CONF_USERNAME]})"}
 
@@ -53,6 +99,16 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    _entry: config_entries.ConfigEntry | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Return the options flow."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -73,6 +129,99 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Handle a rejected password."""
+        self._entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for the new password."""
+        assert self._entry is not None
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            data = {**self._entry.data, **user_input}
+            errors = await self._async_validate(data)
+            if not errors:
+                return await self._async_update_entry(data, "reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=STEP_REAUTH_DATA_SCHEMA,
+            description_placeholders={"username": self._entry.data[CONF_USERNAME]},
+            errors=errors,
+        )
+
+    async def async_step_reconfigure(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Change the credentials or device of an existing entry."""
+        if self._entry is None:
+            self._entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        assert self._entry is not None
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            errors = await self._async_validate(user_input)
+            if not errors:
+                return await self._async_update_entry(user_input, "reconfigure_successful")
+
+        return self.async_show_form(
+            step_id="reconfigure",
+            data_schema=self.add_suggested_values_to_schema(
+                STEP_USER_DATA_SCHEMA, user_input or self._entry.data
+            ),
+            errors=errors,
+        )
+
+    async def _async_validate(self, data: dict[str, Any]) -> dict[str, str]:
+        """Validate credentials and return form errors."""
+        try:
+            await validate_input(self.hass, data)
+        except InvalidAuth:
+            return {"base": "invalid_auth"}
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Unexpected exception")
+            return {"base": "unknown"}
+        return {}
+
+    async def _async_update_entry(self, data: dict[str, Any], reason: str) -> FlowResult:
+        """Store new entry data and reload, reusing the validated session."""
+        assert self._entry is not None
+        self.hass.config_entries.async_update_entry(self._entry, data=data)
+        await self.hass.config_entries.async_reload(self._entry.entry_id)
+        return self.async_abort(reason=reason)
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the history windows and tariff of an entry."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            for key in (CONF_NT_WINDOWS, CONF_NT_WINDOWS_WEEKEND):
+                try:
+                    parse_windows(user_input.get(key, ""))
+                except ValueError:
+                    errors[key] = "invalid_windows"
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA, user_input or self._entry.options
+            ),
+            errors=errors,
+        )
+
 
 class InvalidAuth(HomeAssistantError):
     """Error to indicate there is invalid auth."""
@@ -1,4 +1,5 @@
 """Constants for the ČEZ Distribuce PND integration."""
+from datetime import timedelta
 
 DOMAIN = "cez_pnd"
 
@@ -15,5 +16,101 @@ ID_ASSEMBLY_PRODUCTION = -1022
 ID_ASSEMBLY_CONSUMPTION_POWER = -1001
 ID_ASSEMBLY_PRODUCTION_POWER = -1002
 
-# Default values
-DEFAULT_DEVICE_ID = "86180"
+# Status PND reports for a valid 15-minute measurement
+PND_STATUS_OK = "naměřená data OK"
+
+# Per-slot measurement status, stored as one byte per 15-minute slot
+STATUS_OK = 0
+# Reported by PND with a status other than PND_STATUS_OK
+STATUS_INVALID = 1
+# Not reported at all within a fetched interval
+STATUS_ABSENT = 2
+
+# Gaps in the stored series are refetched in the background until filled,
+# giving up on them once they are older than GAP_MAX_AGE. A gap PND still
+# doesn't fill waits twice as long before each further attempt, and is given
+# up on after GAP_REFETCH_MAX_ATTEMPTS.
+GAP_REFETCH_INTERVAL = timedelta(hours=3)
+GAP_MAX_AGE = timedelta(days=30)
+GAP_REFETCH_MAX_INTERVALS = 8
+GAP_REFETCH_MAX_ATTEMPTS = 6
+
+# Recently closed days are checked for revisions on a slow schedule, and
+# only the days PND reports differently than stored are refetched
+REVISION_CHECK_INTERVAL = timedelta(hours=12)
+REVISION_LOOKBACK = timedelta(days=14)
+REVISION_REFETCH_MAX_DAYS = 7
+
+# History windows, configurable in the options: daily energy is kept in the
+# coordinator data, 15-minute power is backfilled into the local history
+CONF_DAILY_DAYS = "daily_days"
+CONF_POWER_DAYS = "power_days"
+DEFAULT_DAILY_DAYS = 7
+DEFAULT_POWER_DAYS = 2
+MAX_HISTORY_DAYS = 365
+
+# Days of 15-minute slots each series keeps in memory, configurable in the
+# options; older days are read from disk. The minimum covers the anomaly
+# warm-up, the forecast window and the month of the cost sensors.
+CONF_MEMORY_DAYS = "memory_days"
+DEFAULT_MEMORY_DAYS = 62
+MIN_MEMORY_DAYS = 35
+
+# Dual tariff, configurable in the options: kWh prices of the high (VT) and
+# low (NT) tariff and the HDO windows of the low tariff, as "22:00-06:00,
+# 13:00-15:00"; tariff costs are off until a VT price is set
+CONF_VT_PRICE = "vt_price"
+CONF_NT_PRICE = "nt_price"
+CONF_NT_WINDOWS = "nt_windows"
+CONF_NT_WINDOWS_WEEKEND = "nt_windows_weekend"
+
+# Windows are fetched in chunks of at most this many days
+DAILY_CHUNK_DAYS = 31
+POWER_CHUNK_DAYS = 7
+# 15-minute chunks backfilled per poll, so a long window fills over several polls
+BACKFILL_MAX_CHUNKS = 4
+# 15-minute chunks a range query fetches under the account lock; the rest
+# of a longer range is fetched by the next query
+RANGE_FILL_MAX_CHUNKS = 8
+
+# Streaming peak and anomaly detection on the consumption power series.
+# The short-term mean and variance follow new slots with a half-life of
+# ANOMALY_HALF_LIFE, quantiles cover the last ANOMALY_WINDOW, and each
+# weekday's slot of day has a baseline over the past weeks
+ANOMALY_HALF_LIFE = timedelta(hours=24)
+ANOMALY_WINDOW = timedelta(days=7)
+ANOMALY_BASELINE_ALPHA = 0.25
+# A peak is above the window's ANOMALY_QUANTILE and ANOMALY_Z standard
+# deviations above the mean; a run of ANOMALY_SUSTAINED_SLOTS slots that
+# many above the weekday baseline is a sustained anomaly
+ANOMALY_QUANTILE = 0.999
+ANOMALY_Z = 4.0
+ANOMALY_SUSTAINED_SLOTS = 8
+# Smaller excesses over the expected kW are never anomalies
+ANOMALY_MIN_EXCESS_KW = 0.5
+# Stored days replayed into the statistics when a detector starts
+ANOMALY_WARMUP = timedelta(days=28)
+EVENT_ANOMALY = f"{DOMAIN}_anomaly"
+
+# Consumption forecasts use a profile of the mean kW per weekday and slot of
+# day over the closed days of the last FORECAST_WEEKS weeks
+FORECAST_WEEKS = 4
+
+# HTTP transport
+FETCH_CONCURRENCY = 4
+
+# Polls running at the same time across all accounts
+MAX_CONCURRENT_POLLS = 2
+
+# Requests per second across all clients, and the burst allowed (one poll)
+RATE_LIMIT_PER_SECOND = 1.0
+RATE_LIMIT_BURST = 7
+
+# Maximum per-entry phase offset of the poll schedule
+POLL_JITTER = timedelta(minutes=10)
+
+# How long a session validated by the config flow waits for its entry setup
+PENDING_CLIENT_TIMEOUT = timedelta(minutes=5)
+
+# hass.data keys
+DATA_MANAGER = "manager"
@@ -0,0 +1,409 @@
+"""Data update coordinator for ČEZ Distribuce PND."""
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, time, timedelta
+import hashlib
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .aggregation import chunk_days
+from .api_requests import CezPndApi, CezPndAuthError
+from .assemblies import DAILY_TYPES, SERIES_TYPES
+from .const import (
+    BACKFILL_MAX_CHUNKS,
+    CONF_DAILY_DAYS,
+    CONF_POWER_DAYS,
+    DEFAULT_DAILY_DAYS,
+    DEFAULT_POWER_DAYS,
+    DOMAIN,
+    GAP_MAX_AGE,
+    GAP_REFETCH_INTERVAL,
+    GAP_REFETCH_MAX_ATTEMPTS,
+    GAP_REFETCH_MAX_INTERVALS,
+    MAX_HISTORY_DAYS,
+    POLL_JITTER,
+    POWER_CHUNK_DAYS,
+    RANGE_FILL_MAX_CHUNKS,
+    REVISION_LOOKBACK,
+    REVISION_REFETCH_MAX_DAYS,
+)
+from .history import HistoryStore
+from .manager import CezPndManager
+from .models import DeviceData
+from .revisions import revised_days
+
+_LOGGER = logging.getLogger(__name__)
+
+UPDATE_INTERVAL = timedelta(hours=1)
+
+# Snapshots store DeviceData.as_dict() per device set
+SNAPSHOT_STORAGE_VERSION = 1
+# Snapshot writes are batched off the update path
+SNAPSHOT_SAVE_DELAY = 10
+
+
+def snapshot_storage_key(entry_id: str) -> str:
+    """Return the storage key of an entry's snapshot."""
+    return f"{DOMAIN}.{entry_id}.snapshot"
+
+
+def poll_phase(entry_id: str) -> timedelta:
+    """Return a stable per-entry offset within POLL_JITTER.
+
+    Derived from the entry ID rather than drawn at random so each entry keeps
+    its slot across restarts and entries stay spread out.
+    """
+    digest = hashlib.sha256(entry_id.encode()).digest()
+    fraction = int.from_bytes(digest[:4], "big") / 2**32
+    return timedelta(seconds=round(POLL_JITTER.total_seconds() * fraction))
+
+
+class CezPndCoordinator(DataUpdateCoordinator[dict[str, DeviceData]]):
+    """Coordinator polling an entry's device sets through the shared manager.
+
+    Data is keyed by device set ID. An entry configured with a device ID polls
+    only that device set, otherwise every device set found on the account.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        manager: CezPndManager,
+        api: CezPndApi,
+        device_id: str,
+        history: HistoryStore,
+    ) -> None:
+        """Initialize the coordinator."""
+        # The first scheduled poll is delayed by the entry's phase so entries
+        # set up together (e.g. after a restart) don't keep polling in lockstep
+        self.phase = poll_phase(entry.entry_id)
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{entry.entry_id}",
+            update_interval=UPDATE_INTERVAL + self.phase,
+        )
+        self.entry = entry
+        self.manager = manager
+        self.api = api
+        self.device_id = device_id
+        self.history = history
+        self.device_ids: list[str] = [device_id] if device_id else []
+        self.daily_days: int = entry.options.get(CONF_DAILY_DAYS, DEFAULT_DAILY_DAYS)
+        self.power_days: int = entry.options.get(CONF_POWER_DAYS, DEFAULT_POWER_DAYS)
+        self._phase_applied = False
+        self._backfill_task: asyncio.Task[None] | None = None
+        # PND's daily kWh of each (device, series, day) last refetched for a
+        # revision, so days PND can't reconcile aren't refetched every time
+        self._revisions: dict[tuple[str, str, date], float] = {}
+        # Refetches of each (device, series, gap start) so far and when the
+        # next one is due, so gaps PND never fills don't starve the others
+        self._gap_attempts: dict[tuple[str, str, datetime], tuple[int, datetime]] = {}
+        self._snapshot_store: Store[dict[str, Any]] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, snapshot_storage_key(entry.entry_id)
+        )
+
+    async def async_restore_snapshot(self) -> bool:
+        """Publish the last saved data without touching the network.
+
+        Returns False if there is no usable snapshot, in which case the caller
+        has to run the first refresh itself.
+        """
+        snapshot = await self._snapshot_store.async_load()
+        if not snapshot or not snapshot.get("data"):
+            return False
+
+        data = {
+            device_id: DeviceData.from_dict(device_data)
+            for device_id, device_data in snapshot["data"].items()
+        }
+        if not self.device_ids:
+            self.device_ids = list(data)
+        self.async_set_updated_data(data)
+        _LOGGER.debug(
+            "Restored snapshot of %s from %s",
+            self.device_ids,
+            snapshot.get("saved_at"),
+        )
+        return True
+
+    def _snapshot(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "saved_at": dt_util.utcnow().isoformat(),
+            "data": {
+                device_id: device_data.as_dict()
+                for device_id, device_data in (self.data or {}).items()
+            },
+        }
+
+    async def _async_update_data(self) -> dict[str, DeviceData]:
+        """Fetch data from API running in executor."""
+        # The next poll is scheduled from the interval set after this update,
+        # so only the poll following the first refresh carries the phase
+        if self._phase_applied:
+            self.update_interval = UPDATE_INTERVAL
+        self._phase_applied = True
+
+        try:
+            if not self.device_ids:
+                self.device_ids = await self.manager.async_discover(self.api)
+                if not self.device_ids:
+                    raise UpdateFailed("No device sets found on the account")
+                _LOGGER.info("Polling discovered device sets: %s", self.device_ids)
+            data = await self.manager.async_fetch(
+                self.api, self.device_ids, self.daily_days
+            )
+        except UpdateFailed:
+            raise
+        except CezPndAuthError as err:
+            # Starts the reauth flow
+            raise ConfigEntryAuthFailed(str(err)) from err
+        except Exception as err:
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
+
+        changed = self.history.async_add_data(data)
+        _LOGGER.debug("Stored %d new or revised slots", changed)
+
+        # Polls cover yesterday and today, older days of the 15-minute window
+        # are filled into the history off the update path
+        if self.power_days > DEFAULT_POWER_DAYS and (
+            self._backfill_task is None or self._backfill_task.done()
+        ):
+            self._backfill_task = self.entry.async_create_background_task(
+                self.hass, self.async_backfill(), f"{DOMAIN} backfill"
+            )
+
+        # The snapshot is built when the delayed write runs, once self.data holds this update
+        self._snapshot_store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+        return data
+
+    async def async_backfill(self) -> None:
+        """Fetch days of the 15-minute window missing from the history.
+
+        Missing days are fetched in chunks of POWER_CHUNK_DAYS, at most
+        BACKFILL_MAX_CHUNKS per poll, so a long window fills over a few polls
+        while each poll stays bounded.
+        """
+        today = dt_util.start_of_local_day().replace(tzinfo=None).date()
+        days = [
+            today - timedelta(days=offset)
+            for offset in range(DEFAULT_POWER_DAYS, self.power_days)
+        ]
+        chunks = [
+            chunk
+            for device_id in self.device_ids
+            for name in SERIES_TYPES
+            for chunk in self._missing_chunks(device_id, name, days)
+        ]
+        if not chunks:
+            return
+
+        # Newest first, the most recent days are the most useful
+        chunks = sorted(chunks, key=lambda chunk: chunk[2], reverse=True)[:BACKFILL_MAX_CHUNKS]
+        try:
+            results = await self.manager.async_fetch_intervals(
+                self.api,
+                [
+                    (device_id, SERIES_TYPES[name], start, end)
+                    for device_id, name, start, end in chunks
+                ],
+            )
+        except Exception as err:
+            _LOGGER.debug("Backfilling history failed: %s", err)
+            return
+
+        changed = sum(
+            self.history.async_add_power_data(device_id, name, result)
+            for (device_id, name, _start, _end), result in zip(chunks, results)
+        )
+        _LOGGER.debug("Backfilled %d chunks, %d slots", len(chunks), changed)
+
+    async def async_fill_range(
+        self, device_id: str, name: str, start: datetime, end: datetime
+    ) -> tuple[int, datetime | None]:
+        """Fetch the closed days of [start, end) missing from a series' history.
+
+        Days older than MAX_HISTORY_DAYS are not fetched, and today comes with
+        every poll. At most RANGE_FILL_MAX_CHUNKS chunks are fetched, so a
+        long range doesn't hold the account lock for long. Returns the number
+        of slots added and the start of the first missing chunk left unfetched.
+        """
+        today = dt_util.start_of_local_day().replace(tzinfo=None)
+        first = max(start, today - timedelta(days=MAX_HISTORY_DAYS)).date()
+        last = min(end, today)
+        days = [
+            first + timedelta(days=offset)
+            for offset in range((last.date() - first).days + (last.time() != time.min))
+        ]
+        chunks = self._missing_chunks(device_id, name, days)
+        if not chunks:
+            return 0, None
+        unfetched = chunks[RANGE_FILL_MAX_CHUNKS:]
+        chunks = chunks[:RANGE_FILL_MAX_CHUNKS]
+
+        _LOGGER.debug(
+            "Fetching %d missing chunks of %s of %s, %d left for later",
+            len(chunks),
+            name,
+            device_id,
+            len(unfetched),
+        )
+        results = await self.manager.async_fetch_intervals(
+            self.api,
+            [
+                (device_id, SERIES_TYPES[name], chunk_start, chunk_end)
+                for device_id, name, chunk_start, chunk_end in chunks
+            ],
+        )
+        added = sum(
+            self.history.async_add_power_data(device_id, name, result)
+            for result in results
+        )
+        return added, unfetched[0][2] if unfetched else None
+
+    def _missing_chunks(
+        self, device_id: str, name: str, days: list[date]
+    ) -> list[tuple[str, str, datetime, datetime]]:
+        """Return (device, series, start, end) chunks of the days a series lacks."""
+        series = self.history.series(device_id, name)
+        return [
+            (
+                device_id,
+                name,
+                datetime.combine(first, time.min),
+                datetime.combine(end, time.min),
+            )
+            for first, end in chunk_days(
+                [day for day in days if not series.has_day(day)], POWER_CHUNK_DAYS
+            )
+        ]
+
+    async def async_refetch_gaps(self, _now: datetime | None = None) -> None:
+        """Refetch only the intervals of past days that still have gaps.
+
+        Yesterday and today are refetched by every poll anyway, and gaps older
+        than GAP_MAX_AGE are given up on. Gaps a refetch didn't fill back off
+        and are given up on after GAP_REFETCH_MAX_ATTEMPTS.
+        """
+        now = dt_util.utcnow()
+        today = dt_util.start_of_local_day().replace(tzinfo=None)
+        gaps = self.history.gaps(today - GAP_MAX_AGE, today - timedelta(days=1))
+        # Forget gaps that were filled or aged out
+        current = {gap[:3] for gap in gaps}
+        self._gap_attempts = {
+            key: attempt for key, attempt in self._gap_attempts.items() if key in current
+        }
+        gaps = [
+            gap
+            for gap in gaps
+            if (attempt := self._gap_attempts.get(gap[:3])) is None
+            or (attempt[0] < GAP_REFETCH_MAX_ATTEMPTS and attempt[1] <= now)
+        ]
+        if not gaps:
+            return
+
+        # Oldest first, so a long outage is worked through over several runs
+        gaps = sorted(gaps, key=lambda gap: gap[2])[:GAP_REFETCH_MAX_INTERVALS]
+        _LOGGER.debug("Refetching %d gap intervals: %s", len(gaps), gaps)
+        try:
+            results = await self.manager.async_fetch_intervals(
+                self.api,
+                [
+                    (device_id, SERIES_TYPES[name], start, end)
+                    for device_id, name, start, end in gaps
+                ],
+            )
+        except Exception as err:
+            # Retried on the next run; auth problems surface through the poll
+            _LOGGER.debug("Refetching gaps failed: %s", err)
+            return
+
+        changed = sum(
+            self.history.async_add_power_data(device_id, name, result)
+            for (device_id, name, _start, _end), result in zip(gaps, results)
+        )
+        _LOGGER.debug("Refetched gaps, %d slots changed", changed)
+        for gap in gaps:
+            count = self._gap_attempts.get(gap[:3], (0, now))[0] + 1
+            self._gap_attempts[gap[:3]] = (count, now + GAP_REFETCH_INTERVAL * 2**count)
+            if count == GAP_REFETCH_MAX_ATTEMPTS:
+                _LOGGER.debug("Giving up on the gap of %s of %s at %s", gap[1], gap[0], gap[2])
+
+    async def async_check_revisions(self, _now: datetime | None = None) -> None:
+        """Refetch recently closed days whose PND daily totals changed.
+
+        Costs one daily request per series when nothing was revised.
+        """
+        if not self.device_ids:
+            return
+        today = dt_util.start_of_local_day().replace(tzinfo=None)
+        start = today - REVISION_LOOKBACK
+        end = today - timedelta(days=1)
+        series_keys = [
+            (device_id, name) for device_id in self.device_ids for name in DAILY_TYPES
+        ]
+
+        try:
+            results = await self.manager.async_fetch_intervals(
+                self.api,
+                [
+                    (device_id, DAILY_TYPES[name], start, end)
+                    for device_id, name in series_keys
+                ],
+            )
+        except Exception as err:
+            _LOGGER.debug("Checking for revisions failed: %s", err)
+            return
+
+        revised: list[tuple[str, str, date, float]] = []
+        for (device_id, name), result in zip(series_keys, results):
+            days = revised_days(
+                self.history.series(device_id, name), result, start.date(), end.date()
+            )
+            revised.extend(
+                (device_id, name, day, value)
+                for day, value in sorted(days.items())
+                if self._revisions.get((device_id, name, day)) != value
+            )
+        # Forget days that left the window
+        self._revisions = {
+            key: value for key, value in self._revisions.items() if key[2] >= start.date()
+        }
+        if not revised:
+            return
+
+        revised = revised[:REVISION_REFETCH_MAX_DAYS]
+        _LOGGER.info(
+            "PND revised %s, refetching",
+            ", ".join(f"{name} of {device_id} on {day}" for device_id, name, day, _ in revised),
+        )
+        try:
+            results = await self.manager.async_fetch_intervals(
+                self.api,
+                [
+                    (
+                        device_id,
+                        SERIES_TYPES[name],
+                        datetime.combine(day, datetime.min.time()),
+                        datetime.combine(day + timedelta(days=1), datetime.min.time()),
+                    )
+                    for device_id, name, day, _ in revised
+                ],
+            )
+        except Exception as err:
+            _LOGGER.debug("Refetching revised days failed: %s", err)
+            return
+
+        for (device_id, name, day, value), result in zip(revised, results):
+            self.history.async_add_power_data(device_id, name, result)
+            self._revisions[(device_id, name, day)] = value
@@ -0,0 +1,47 @@
+"""Diagnostics support for ČEZ Distribuce PND."""
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .history import HistoryStore
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD}
+
+
+def _disk_usage(path: str) -> int:
+    """Return the bytes of the files in a history directory."""
+    if not os.path.isdir(path):
+        return 0
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics of an entry: its options, devices and memory use."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    history: HistoryStore = entry_data["history"]
+
+    series = [
+        {"device_id": device_id, "series": name, **stored.memory_usage()}
+        for device_id, name, stored in history.all_series()
+    ]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "device_ids": coordinator.device_ids,
+        "last_update_success": coordinator.last_update_success,
+        "history": {
+            "memory_days": history.memory_days,
+            "ring_bytes": sum(usage["ring_bytes"] for usage in series),
+            "disk_bytes": await hass.async_add_executor_job(_disk_usage, history.path),
+            "series": series,
+        },
+    }
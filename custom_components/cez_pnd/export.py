@@ -0,0 +1,396 @@
+"""Streaming export of the stored 15-minute series to CSV or Parquet.
+
+Exports read the column files of the history directly, one batch of days
+at a time, so memory use doesn't depend on the range. The same code backs
+the export service and the export_history.py command line tool.
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+import csv
+from datetime import date, datetime, timedelta
+import json
+import logging
+import os
+import shutil
+from typing import TYPE_CHECKING, Any
+import zlib
+
+from .aggregation import SLOT, SLOT_HOURS, repeated_hour, slot_exists
+from .columnar import MISSING_UINT8, ColumnFile
+from .const import STATUS_ABSENT, STATUS_INVALID, STATUS_OK
+from .series import REPEATED_SUFFIX, STATUS_SUFFIX, VALUES_SUFFIX
+
+# pyarrow is optional and only needed for Parquet
+if TYPE_CHECKING:
+    import pyarrow
+
+_LOGGER = logging.getLogger(__name__)
+
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+EXPORT_FORMATS = (FORMAT_CSV, FORMAT_PARQUET)
+
+COLUMNS = ("device_id", "series", "start", "end", "power_kw", "energy_kwh", "status")
+
+STATUS_NAMES = {STATUS_OK: "ok", STATUS_INVALID: "invalid", STATUS_ABSENT: "absent"}
+
+# Days converted and written at once, which bounds the memory of an export
+EXPORT_BATCH_DAYS = 31
+
+STATE_VERSION = 1
+# Incremental exports keep their state next to the output
+EXPORT_STATE_SUFFIX = ".state.json"
+
+# (device ID, series, slot start, slot end, kW, kWh, status); timestamps are
+# local time, like the history, so the hour repeated when clocks go back
+# has two runs of rows
+Row = tuple[str, str, datetime, datetime, float | None, float | None, str]
+
+
+class ExportError(Exception):
+    """Error to indicate an export could not be written."""
+
+
+def stored_series(paths: Iterable[str]) -> dict[tuple[str, str], str]:
+    """Return the values file of every (device ID, series) in history directories.
+
+    A series stored by several entries is taken from the first directory.
+    """
+    found: dict[tuple[str, str], str] = {}
+    for path in paths:
+        if not os.path.isdir(path):
+            continue
+        for filename in sorted(os.listdir(path)):
+            if filename.endswith(VALUES_SUFFIX):
+                device_id, name = filename[: -len(VALUES_SUFFIX)].rsplit("_", 1)
+                found.setdefault((device_id, name), os.path.join(path, filename))
+    return found
+
+
+def day_digest(
+    values: memoryview, statuses: memoryview | None, repeated: Sequence[int] | None = None
+) -> int:
+    """Return a checksum of one stored day, to tell if it changed since an export."""
+    digest = zlib.crc32(values)
+    if statuses is not None:
+        digest = zlib.crc32(statuses, digest)
+    return zlib.crc32(array("i", repeated), digest) if repeated is not None else digest
+
+
+def _repeated_days(path: str) -> dict[date, list[int]]:
+    """Return the stored second passes of repeated hours, by day."""
+    if not os.path.exists(path):
+        return {}
+    column = ColumnFile(path)
+    if not column.day_count:
+        column.close()
+        return {}
+    days = column.iter_range(column.start, column.end)
+    try:
+        return {
+            day: list(stored)
+            for day, stored in days
+            if any(item != column.missing for item in stored)
+        }
+    finally:
+        days.close()
+        column.close()
+
+
+def _iter_days(
+    values_path: str, start: date | None, end: date | None
+) -> Iterator[tuple[date, memoryview, memoryview | None, list[int] | None]]:
+    """Yield (day, values, statuses, repeated hour) of the stored days in [start, end)."""
+    values = ColumnFile(values_path)
+    status_path = values_path[: -len(VALUES_SUFFIX)] + STATUS_SUFFIX
+    statuses = ColumnFile(status_path) if os.path.exists(status_path) else None
+    repeated = _repeated_days(values_path[: -len(VALUES_SUFFIX)] + REPEATED_SUFFIX)
+    if not values.day_count:
+        values.close()
+        return
+    first = max(start or values.start, values.start)
+    last = min(end or values.end, values.end)
+    value_days = values.iter_range(first, last)
+    status_days = statuses.iter_range(first, last) if statuses else iter(())
+    try:
+        pending = next(status_days, None)
+        for day, day_values in value_days:
+            while pending is not None and pending[0] < day:
+                pending = next(status_days, None)
+            day_statuses = pending[1] if pending is not None and pending[0] == day else None
+            yield day, day_values, day_statuses, repeated.get(day)
+    finally:
+        # The views into the mappings have to be released before closing them
+        value_days.close()
+        values.close()
+        if statuses is not None:
+            status_days.close()
+            statuses.close()
+
+
+def _day_rows(
+    device_id: str,
+    name: str,
+    day: date,
+    values: memoryview,
+    statuses: memoryview | None,
+    repeated: Sequence[int] | None,
+    missing: int,
+    scale: int,
+) -> Iterator[Row]:
+    """Yield the rows of one day, leaving out slots nothing is known about.
+
+    Gaps stored for the hour skipped when clocks go forward are left out
+    too, those slots never existed. The second pass of the hour repeated
+    when clocks go back follows the first one.
+    """
+    slot_start = datetime.combine(day, datetime.min.time())
+    hour = repeated_hour(day) if repeated is not None else None
+    for index, value in enumerate(values):
+        if hour is not None and slot_start == hour + timedelta(hours=1):
+            yield from _repeated_rows(device_id, name, hour, repeated or (), missing, scale)
+        status = STATUS_OK if value != missing else (
+            statuses[index] if statuses is not None else MISSING_UINT8
+        )
+        if status != MISSING_UINT8 and (value != missing or slot_exists(slot_start)):
+            power = value / scale if value != missing else None
+            yield (
+                device_id,
+                name,
+                slot_start,
+                slot_start + SLOT,
+                power,
+                power * SLOT_HOURS if power is not None else None,
+                STATUS_NAMES.get(status, str(status)),
+            )
+        slot_start += SLOT
+
+
+def _repeated_rows(
+    device_id: str,
+    name: str,
+    hour: datetime,
+    repeated: Sequence[int],
+    missing: int,
+    scale: int,
+) -> Iterator[Row]:
+    """Yield the rows of the second pass of a repeated hour, starting at ``hour``."""
+    for index, value in enumerate(repeated):
+        if value != missing:
+            slot_start = (hour + index * SLOT).replace(fold=1)
+            power = value / scale
+            yield (
+                device_id,
+                name,
+                slot_start,
+                (slot_start + SLOT).replace(fold=1),
+                power,
+                power * SLOT_HOURS,
+                STATUS_NAMES[STATUS_OK],
+            )
+
+
+class ExportState:
+    """Checksums of the days an incremental export has written so far."""
+
+    def __init__(self, path: str, load: bool = True) -> None:
+        """Load the state saved at ``path``, if any and ``load`` is set."""
+        self.path = path
+        self._days: dict[str, dict[str, int]] = {}
+        if load and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                saved = json.load(file)
+            if saved.get("version") == STATE_VERSION:
+                self._days = saved["days"]
+
+    def changed(self, key: str, day: date, digest: int) -> bool:
+        """Return True if the day was not exported as it is now."""
+        return self._days.get(key, {}).get(day.isoformat()) != digest
+
+    def update(self, key: str, day: date, digest: int) -> None:
+        """Remember that the day was exported."""
+        self._days.setdefault(key, {})[day.isoformat()] = digest
+
+    def save(self) -> None:
+        """Write the state, replacing the previous one."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"version": STATE_VERSION, "days": self._days}, file)
+        os.replace(tmp_path, self.path)
+
+
+class _CsvWriter:
+    """Write row batches as CSV."""
+
+    def __init__(self, path: str, header: bool = True) -> None:
+        """Open ``path`` for writing, starting with the header row if ``header`` is set."""
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        if header:
+            self._writer.writerow(COLUMNS)
+
+    def write(self, rows: list[Row]) -> None:
+        """Write a batch of rows."""
+        self._writer.writerows(
+            (
+                device_id,
+                name,
+                start.isoformat(),
+                end.isoformat(),
+                "" if power is None else round(power, 3),
+                "" if energy is None else round(energy, 6),
+                status,
+            )
+            for device_id, name, start, end, power, energy, status in rows
+        )
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class _ParquetWriter:
+    """Write row batches as row groups of a Parquet file."""
+
+    def __init__(self, path: str) -> None:
+        """Open a Parquet writer on ``path``, raising ExportError without pyarrow."""
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as err:
+            raise ExportError("Parquet export requires the pyarrow package") from err
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema([
+            ("device_id", pyarrow.string()),
+            ("series", pyarrow.string()),
+            ("start", pyarrow.timestamp("s")),
+            ("end", pyarrow.timestamp("s")),
+            ("power_kw", pyarrow.float64()),
+            ("energy_kwh", pyarrow.float64()),
+            ("status", pyarrow.string()),
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+
+    def write(self, rows: list[Row]) -> None:
+        """Write a batch of rows as one row group."""
+        columns: list[Any] = [list(column) for column in zip(*rows)]
+        table: pyarrow.Table = self._pyarrow.table(columns, schema=self._schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        """Write the footer and close the file."""
+        self._writer.close()
+
+
+def export_history(
+    paths: Iterable[str],
+    output: str,
+    export_format: str = FORMAT_CSV,
+    device_ids: Iterable[str] | None = None,
+    series: Iterable[str] | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    state_path: str | None = None,
+) -> tuple[str, int, int]:
+    """Export stored series from history directories.
+
+    ``start`` and ``end`` limit the export to the days in [start, end). With
+    ``state_path``, the export is incremental: the first run, or one whose
+    ``output`` is missing, writes every day to ``output``, later runs only
+    the days added or revised since the run that saved the state. CSV
+    appends those rows to ``output``, Parquet writes them to a delta file
+    next to it (see delta_path); a revised day's rows supersede the ones
+    exported before. The state is updated once the output is complete.
+    Rows are written to a temporary file first and only reach the output
+    when complete.
+
+    Returns the file written, and the days and rows written to it.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format {export_format}")
+    wanted_devices = set(device_ids) if device_ids else None
+    wanted_series = set(series) if series else None
+    selected = {
+        key: path
+        for key, path in stored_series(paths).items()
+        if (wanted_devices is None or key[0] in wanted_devices)
+        and (wanted_series is None or key[1] in wanted_series)
+    }
+    # Later incremental runs add to the output of the first one; without
+    # that output the saved state is ignored and the run exports every day
+    delta = bool(state_path) and os.path.exists(state_path) and os.path.exists(output)
+    state = ExportState(state_path, load=delta) if state_path else None
+
+    tmp_output = f"{output}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    if export_format == FORMAT_CSV:
+        writer: _CsvWriter | _ParquetWriter = _CsvWriter(tmp_output, header=not delta)
+    else:
+        writer = _ParquetWriter(tmp_output)
+    days = rows = 0
+    try:
+        for (device_id, name), values_path in sorted(selected.items()):
+            key = f"{device_id}_{name}"
+            column = ColumnFile(values_path)
+            missing, scale = column.missing, column.scale
+            column.close()
+
+            batch: list[Row] = []
+            batch_days = 0
+            for day, day_values, day_statuses, repeated in _iter_days(values_path, start, end):
+                if state is not None:
+                    digest = day_digest(day_values, day_statuses, repeated)
+                    if not state.changed(key, day, digest):
+                        continue
+                    state.update(key, day, digest)
+                batch.extend(
+                    _day_rows(
+                        device_id, name, day, day_values, day_statuses, repeated, missing, scale
+                    )
+                )
+                batch_days += 1
+                if batch_days == EXPORT_BATCH_DAYS:
+                    writer.write(batch)
+                    days += batch_days
+                    rows += len(batch)
+                    batch, batch_days = [], 0
+            if batch:
+                writer.write(batch)
+                rows += len(batch)
+            days += batch_days
+    except BaseException:
+        writer.close()
+        os.remove(tmp_output)
+        raise
+    writer.close()
+    written = output
+    if not delta:
+        os.replace(tmp_output, output)
+    elif not rows:
+        os.remove(tmp_output)
+    elif export_format == FORMAT_CSV:
+        # A crash before the state is saved appends the rows again on the
+        # next run, which the later rows supersede
+        with open(tmp_output, "rb") as source, open(output, "ab") as target:
+            shutil.copyfileobj(source, target)
+        os.remove(tmp_output)
+    else:
+        written = delta_path(output)
+        os.replace(tmp_output, written)
+    if state is not None:
+        state.save()
+
+    _LOGGER.debug("Exported %d days, %d rows of %s to %s", days, rows, sorted(selected), written)
+    return written, days, rows
+
+
+def delta_path(output: str) -> str:
+    """Return a new file next to ``output`` for the rows of an incremental run.
+
+    "pnd.parquet" gets deltas like "pnd.20260105T120000.parquet", which sort
+    after each other in the order they were written.
+    """
+    root, extension = os.path.splitext(output)
+    return f"{root}.{datetime.now().strftime('%Y%m%dT%H%M%S')}{extension}"
@@ -0,0 +1,212 @@
+"""Consumption forecasts from a seasonal profile of the 15-minute history.
+
+The model is the mean kW of every weekday and slot of day over the closed
+days of the last FORECAST_WEEKS weeks, kept as running sums and counts. It is
+fitted once from the stored history, then rolled forward a day at a time by
+adding the day that closed and dropping the one that left the window.
+Revisions within the window adjust the sums as they arrive, so polls never
+refit it. A forecast takes the stored slots of today or this month and fills
+the rest with the profile.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import TYPE_CHECKING
+
+from .aggregation import SLOT, SLOT_HOURS, repeated_slot
+from .columnar import SLOTS_PER_DAY
+from .const import FORECAST_WEEKS
+
+if TYPE_CHECKING:
+    from .history import HistoryStore
+    from .series import SeriesHistory
+
+# Series forecast
+FORECAST_SERIES = "consumption"
+
+
+class SeasonalProfile:
+    """Mean kW per weekday and slot of day over a window of closed days.
+
+    Cells without data fall back to the mean of the same slot on any
+    weekday, so a few days of history already give a usable profile.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty profile."""
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget every day."""
+        self._sums = [0.0] * (7 * SLOTS_PER_DAY)
+        self._counts = [0] * (7 * SLOTS_PER_DAY)
+        self._slot_sums = [0.0] * SLOTS_PER_DAY
+        self._slot_counts = [0] * SLOTS_PER_DAY
+        # Expected kW of every slot per weekday, until the sums change
+        self._expected: dict[int, list[float | None]] = {}
+        # Days in the profile, [start, end)
+        self.start: date | None = None
+        self.end: date | None = None
+
+    def add_day(self, day: date, values: list[float | None], sign: int = 1) -> None:
+        """Add the slots of a day, or remove them with ``sign`` -1."""
+        offset = day.weekday() * SLOTS_PER_DAY
+        for index, power in enumerate(values):
+            if power is not None:
+                self._add(offset + index, sign * power, sign)
+
+    def _add(self, cell: int, power: float, count: int) -> None:
+        """Add kW and a count to a cell and its slot of day."""
+        self._expected.clear()
+        self._sums[cell] += power
+        self._counts[cell] += count
+        self._slot_sums[cell % SLOTS_PER_DAY] += power
+        self._slot_counts[cell % SLOTS_PER_DAY] += count
+
+    def slot_changed(self, start: datetime, previous: float | None, power: float) -> None:
+        """Adjust the sums if a slot of a day in the profile changed."""
+        if self.start is None or self.end is None or not self.start <= start.date() < self.end:
+            return
+        if repeated_slot(start):
+            # Days add only the first pass of the hour repeated when clocks go back
+            return
+        slot_of_day = (start - datetime.combine(start.date(), time.min)) // SLOT
+        self._add(
+            start.weekday() * SLOTS_PER_DAY + slot_of_day,
+            power - (previous or 0.0),
+            1 if previous is None else 0,
+        )
+
+    def day_profile(self, day: date) -> list[float | None]:
+        """Return the expected kW of every slot of a day, None without any data."""
+        weekday = day.weekday()
+        if weekday in self._expected:
+            return self._expected[weekday]
+        offset = weekday * SLOTS_PER_DAY
+        expected: list[float | None] = []
+        for index in range(SLOTS_PER_DAY):
+            if count := self._counts[offset + index]:
+                expected.append(self._sums[offset + index] / count)
+            elif count := self._slot_counts[index]:
+                expected.append(self._slot_sums[index] / count)
+            else:
+                expected.append(None)
+        self._expected[weekday] = expected
+        return expected
+
+    @property
+    def slots(self) -> int:
+        """Return the number of slots the profile was fitted on."""
+        return sum(self._counts)
+
+
+@dataclass(frozen=True, slots=True)
+class Forecast:
+    """Measured and forecast kWh of today and this month."""
+
+    today_actual: float
+    today_forecast: float
+    month_actual: float
+    month_forecast: float
+
+
+class Forecaster:
+    """Seasonal profile of one series, kept current, and its forecasts."""
+
+    def __init__(self, series: SeriesHistory) -> None:
+        """Initialize an unfitted forecaster of a series."""
+        self.series = series
+        self.profile = SeasonalProfile()
+        self.window = timedelta(weeks=FORECAST_WEEKS)
+        self._forecast: tuple[date, Forecast | None] | None = None
+
+    def slot_changed(self, start: datetime, previous: float | None, power: float) -> None:
+        """Update the profile with a changed slot and drop the cached forecast."""
+        self.profile.slot_changed(start, previous, power)
+        self._forecast = None
+
+    def update(self, today: date) -> None:
+        """Move the profile to the closed days before ``today``.
+
+        Days that closed since the last update are added and days that left
+        the window removed; only a first use or a long pause refits it.
+        """
+        profile = self.profile
+        start = today - self.window
+        if profile.end == today:
+            return
+        if profile.end is None or profile.start is None or profile.end <= start or profile.end > today:
+            profile.clear()
+            profile.start = profile.end = start
+        day = profile.end
+        while day < today:
+            profile.add_day(day, self.series.day_values(day))
+            day += timedelta(days=1)
+        day = profile.start
+        while day < start:
+            profile.add_day(day, self.series.day_values(day), -1)
+            day += timedelta(days=1)
+        profile.start, profile.end = start, today
+
+    def _day(self, day: date) -> tuple[float, float]:
+        """Return the stored kWh of a day and its forecast, missing slots from the profile."""
+        actual = predicted = 0.0
+        for power, expected in zip(self.series.day_values(day), self.profile.day_profile(day)):
+            if power is not None:
+                actual += power
+            elif expected is not None:
+                predicted += expected
+        return actual * SLOT_HOURS, (actual + predicted) * SLOT_HOURS
+
+    def forecast(self, today: date) -> Forecast | None:
+        """Return the forecasts of today and its month, None before any data.
+
+        The result is kept until the series changes or the day does.
+        """
+        if self._forecast is not None and self._forecast[0] == today:
+            return self._forecast[1]
+        self.update(today)
+        forecast = self._compute(today) if self.profile.slots else None
+        self._forecast = (today, forecast)
+        return forecast
+
+    def _compute(self, today: date) -> Forecast:
+        """Return the forecasts of today and its month."""
+        today_actual, today_forecast = self._day(today)
+        month_actual = month_forecast = 0.0
+        day = today.replace(day=1)
+        while day.month == today.month:
+            if day == today:
+                actual, forecast = today_actual, today_forecast
+            elif day < today:
+                actual, forecast = self._day(day)
+            else:
+                actual = 0.0
+                forecast = sum(filter(None, self.profile.day_profile(day))) * SLOT_HOURS
+            month_actual += actual
+            month_forecast += forecast
+            day += timedelta(days=1)
+        return Forecast(today_actual, today_forecast, month_actual, month_forecast)
+
+
+class ForecastEngine:
+    """Forecasters of the forecast series of an entry's device sets."""
+
+    def __init__(self, history: HistoryStore) -> None:
+        """Initialize the engine."""
+        self.history = history
+        self._forecasters: dict[str, Forecaster] = {}
+
+    def forecaster(self, device_id: str) -> Forecaster:
+        """Return the forecaster of a device set, creating it on first use.
+
+        The profile is fitted on the first forecast and then follows every
+        change of the series within its window.
+        """
+        if device_id not in self._forecasters:
+            series = self.history.series(device_id, FORECAST_SERIES)
+            forecaster = Forecaster(series)
+            series.add_observer(forecaster.slot_changed)
+            self._forecasters[device_id] = forecaster
+        return self._forecasters[device_id]
@@ -0,0 +1,177 @@
+"""Per-entry local history of 15-minute series, persisted in column files."""
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta
+import logging
+import shutil
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .aggregation import SLOT
+from .assemblies import SERIES_TYPES
+from .const import DEFAULT_MEMORY_DAYS, DOMAIN
+from .models import DeviceData, SeriesResult
+from .series import (
+    SeriesHistory,
+    encode_dirty_days,
+    read_series_file,
+    read_series_files,
+    series_key,
+    write_series_files,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_SAVE_DELAY = 30
+
+# Series kept for every device set, fed from the coordinator data key
+SERIES_SOURCES = {name: measurement.key for name, measurement in SERIES_TYPES.items()}
+
+
+class HistoryStore:
+    """Per-entry store of every series of every device set.
+
+    Series keep their last ``memory_days`` days in memory for queries and
+    are persisted as one column file of values and one of slot statuses per
+    series (see columnar.py); only days that changed are rewritten.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry_id: str, memory_days: int = DEFAULT_MEMORY_DAYS
+    ) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.path = hass.config.path(STORAGE_DIR, DOMAIN, entry_id)
+        self.memory_days = memory_days
+        self._series: dict[str, SeriesHistory] = {}
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._listeners: list[Callable[[], None]] = []
+
+    def series(self, device_id: str, name: str) -> SeriesHistory:
+        """Return a device's series, creating it if needed."""
+        key = series_key(device_id, name)
+        if key not in self._series:
+            self._series[key] = SeriesHistory(self.memory_days)
+        return self._series[key]
+
+    async def async_read_series(
+        self, device_id: str, name: str, start: datetime, end: datetime
+    ) -> SeriesHistory:
+        """Return a series holding every stored slot of [start, end).
+
+        That's the series in memory if it covers the range, otherwise the
+        range's days are read from disk once the pending changes are written.
+        """
+        series = self.series(device_id, name)
+        if series.covers(start):
+            return series
+        await self.async_flush()
+        first = start.date()
+        last = (end - SLOT).date() + timedelta(days=1)
+        return await self.hass.async_add_executor_job(
+            read_series_file,
+            self.path,
+            series_key(device_id, name),
+            first,
+            last,
+            max(1, (last - first).days),
+        )
+
+    def all_series(self) -> list[tuple[str, str, SeriesHistory]]:
+        """Return (device ID, series name, series) of every stored series."""
+        return [
+            (*key.rsplit("_", 1), series) for key, series in self._series.items()
+        ]
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call ``update_callback`` whenever slots were added or revised."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    async def async_load(self) -> None:
+        """Load the stored series."""
+        self._series = await self.hass.async_add_executor_job(
+            read_series_files, self.path, self.memory_days
+        )
+
+        _LOGGER.debug(
+            "Loaded history: %s",
+            {key: len(series) for key, series in self._series.items()},
+        )
+
+    def async_add_data(self, data: Mapping[str, DeviceData]) -> int:
+        """Store the 15-minute series of a coordinator update.
+
+        Returns the number of slots added or revised.
+        """
+        return sum(
+            self.async_add_power_data(device_id, name, power_data)
+            for device_id, device_data in data.items()
+            for name, source in SERIES_SOURCES.items()
+            if isinstance(power_data := device_data.get(source), SeriesResult)
+        )
+
+    def async_add_power_data(
+        self, device_id: str, name: str, power_data: SeriesResult
+    ) -> int:
+        """Store one fetched power series and return the number of changed slots."""
+        changed = self.series(device_id, name).add_measurements(
+            power_data.measurements, power_data.flagged
+        )
+        if not changed:
+            return 0
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self.hass, HISTORY_SAVE_DELAY, self._async_scheduled_flush
+            )
+        for update_callback in list(self._listeners):
+            update_callback()
+        return changed
+
+    def gaps(
+        self, start: datetime, end: datetime
+    ) -> list[tuple[str, str, datetime, datetime]]:
+        """Return (device ID, series name, start, end) of every gap in the range."""
+        gaps = []
+        for device_id, name, series in self.all_series():
+            gaps.extend(
+                (device_id, name, gap_start, gap_end)
+                for gap_start, gap_end in series.gaps(start, end)
+            )
+        return gaps
+
+    async def _async_scheduled_flush(self, _now: datetime) -> None:
+        """Write changes once the save delay has passed."""
+        self._unsub_flush = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Write the days changed since the last flush."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+        # Collect in the event loop so the series don't change while writing
+        pending = {
+            key: encode_dirty_days(series)
+            for key, series in self._series.items()
+            if series.dirty_days
+        }
+        if pending:
+            await self.hass.async_add_executor_job(write_series_files, self.path, pending)
+
+    async def async_remove(self) -> None:
+        """Delete the stored history."""
+        await self.hass.async_add_executor_job(
+            shutil.rmtree, self.path, True
+        )
+
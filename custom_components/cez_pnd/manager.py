@@ -0,0 +1,180 @@
+"""Integration-wide manager for ČEZ Distribuce PND API clients."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_call_later
+
+from .api_requests import CezPndApi
+from .assemblies import MeasurementType
+from .const import (
+    DATA_MANAGER,
+    DOMAIN,
+    FETCH_CONCURRENCY,
+    MAX_CONCURRENT_POLLS,
+    PENDING_CLIENT_TIMEOUT,
+)
+from .models import DeviceData, SeriesResult
+from .transport import TransportConfig, create_adapter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _Account:
+    """One authenticated client shared by every entry of the same account."""
+
+    api: CezPndApi
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    entry_ids: set[str] = field(default_factory=set)
+
+
+class CezPndManager:
+    """Own every account's client, share one connection pool and bound polls."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the manager."""
+        self.hass = hass
+        # Every concurrent poll may run FETCH_CONCURRENCY requests at once
+        self._transport = TransportConfig(
+            pool_maxsize=MAX_CONCURRENT_POLLS * FETCH_CONCURRENCY,
+        )
+        self._adapter = create_adapter(self._transport)
+        # Taken inside an account's lock, so a poll waiting for its account
+        # doesn't hold a slot other accounts could use
+        self._poll_semaphore = asyncio.Semaphore(MAX_CONCURRENT_POLLS)
+        self._accounts: dict[str, _Account] = {}
+        # Clients authenticated by a config flow, waiting for their entry setup
+        self._pending: dict[str, CezPndApi] = {}
+
+    @staticmethod
+    def _account_key(username: str) -> str:
+        """Return the key identifying an account."""
+        return username.strip().lower()
+
+    def create_client(self, username: str, password: str, device_id: str) -> CezPndApi:
+        """Create a client on the shared pool that no entry owns yet."""
+        return CezPndApi(
+            username,
+            password,
+            device_id,
+            transport=self._transport,
+            adapter=self._adapter,
+        )
+
+    def hand_over_client(self, api: CezPndApi) -> None:
+        """Keep an authenticated client for the next setup of its account.
+
+        Unclaimed clients are dropped after PENDING_CLIENT_TIMEOUT.
+        """
+        key = self._account_key(api.username)
+        if (previous := self._pending.pop(key, None)) is not None:
+            previous.close()
+        self._pending[key] = api
+        async_call_later(
+            self.hass,
+            PENDING_CLIENT_TIMEOUT,
+            partial(self._async_expire_pending, key, api),
+        )
+
+    async def _async_expire_pending(
+        self, key: str, api: CezPndApi, _now: datetime
+    ) -> None:
+        """Drop a handed-over client no entry setup claimed."""
+        if self._pending.get(key) is api:
+            del self._pending[key]
+            await self.hass.async_add_executor_job(api.close)
+            _LOGGER.debug("Dropped unclaimed session for account %s", api.username)
+
+    def acquire_client(
+        self,
+        entry_id: str,
+        username: str,
+        password: str,
+        device_id: str,
+    ) -> CezPndApi:
+        """Return the client for an account, creating it on first use."""
+        key = self._account_key(username)
+        account = self._accounts.get(key)
+        if account is None:
+            api = self.create_client(username, password, device_id)
+            account = self._accounts[key] = _Account(api)
+            _LOGGER.debug("Created client for account %s", username)
+        elif account.api.password != password:
+            # Credentials were updated, the old session is no longer valid
+            account.api.password = password
+            account.api.close()
+
+        pending = self._pending.pop(key, None)
+        if pending is not None and pending.password == password:
+            # Reuse the login the config flow just made
+            account.api.adopt_session(pending)
+            _LOGGER.debug("Reusing validated session for account %s", username)
+        if pending is not None:
+            pending.close()
+
+        account.entry_ids.add(entry_id)
+        return account.api
+
+    async def async_release_client(self, entry_id: str, username: str) -> None:
+        """Release an entry's claim on a client, closing it when unused."""
+        key = self._account_key(username)
+        account = self._accounts.get(key)
+        if account is None:
+            return
+
+        account.entry_ids.discard(entry_id)
+        if not account.entry_ids:
+            del self._accounts[key]
+            await self.hass.async_add_executor_job(account.api.close)
+            _LOGGER.debug("Closed client for account %s", username)
+
+    async def async_discover(self, api: CezPndApi) -> list[str]:
+        """Return the device sets available on an account."""
+        account = self._accounts[self._account_key(api.username)]
+        async with account.lock, self._poll_semaphore:
+            return await self.hass.async_add_executor_job(api.discover_device_sets)
+
+    async def async_fetch(
+        self, api: CezPndApi, device_ids: list[str], daily_days: int
+    ) -> dict[str, DeviceData]:
+        """Run one poll, bounded across accounts and serialized per account."""
+        account = self._accounts[self._account_key(api.username)]
+        async with account.lock, self._poll_semaphore:
+            return await self.hass.async_add_executor_job(
+                api.get_devices_data, device_ids, daily_days
+            )
+
+    async def async_fetch_intervals(
+        self,
+        api: CezPndApi,
+        intervals: list[tuple[str, MeasurementType, datetime, datetime]],
+    ) -> list[SeriesResult]:
+        """Fetch series data for specific intervals, bounded like a poll."""
+        account = self._accounts[self._account_key(api.username)]
+        async with account.lock, self._poll_semaphore:
+            return await self.hass.async_add_executor_job(
+                api.get_power_intervals, intervals
+            )
+
+    @property
+    def is_idle(self) -> bool:
+        """Return True if no entry holds or awaits a client."""
+        return not self._accounts and not self._pending
+
+    def close(self) -> None:
+        """Close the shared connection pool."""
+        self._adapter.close()
+
+
+def async_get_manager(hass: HomeAssistant) -> CezPndManager:
+    """Return the integration's manager, creating it if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_MANAGER not in domain_data:
+        domain_data[DATA_MANAGER] = CezPndManager(hass)
+    return domain_data[DATA_MANAGER]
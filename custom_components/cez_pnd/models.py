@@ -0,0 +1,201 @@
+"""Typed results of PND requests, from the parser through to the sensors.
+
+The results are immutable and slotted: a poll creates a few hundred
+measurements per device, and the sensors read them on every update.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any
+
+from .aggregation import PND_TIME_ZONE
+
+
+@dataclass(frozen=True, slots=True)
+class Measurement:
+    """One value of a PND series.
+
+    ``end`` is the parsed PND timestamp, which marks the end of the 15-minute
+    slot or the day the value covers.
+    """
+
+    end: datetime
+    value: float
+
+
+@dataclass(frozen=True, slots=True)
+class FlaggedPoint:
+    """A point PND reported without a valid value, keyed like ``Measurement``."""
+
+    end: datetime
+    status: int
+
+
+@dataclass(frozen=True, slots=True)
+class DailyResult:
+    """Energy of one day, as reported by PND or derived from 15-minute data."""
+
+    value: float = 0.0
+    total: float = 0.0
+    min: float = 0.0
+    max: float = 0.0
+    name: str = ""
+    unit: str = "kWh"
+    date_from: date | None = None
+    date_to: date | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class SeriesResult:
+    """A series of 15-minute power or daily energy values."""
+
+    measurements: tuple[Measurement, ...] = ()
+    flagged: tuple[FlaggedPoint, ...] = ()
+    total: float = 0.0
+    min: float = 0.0
+    max: float = 0.0
+    name: str = ""
+    unit: str = "kW"
+    date_from: date | None = None
+    date_to: date | None = None
+
+    @property
+    def value(self) -> float:
+        """Return the latest valid value."""
+        return self.measurements[-1].value if self.measurements else 0.0
+
+    @property
+    def latest(self) -> datetime | None:
+        """Return the end of the latest valid value."""
+        return self.measurements[-1].end if self.measurements else None
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceData:
+    """Everything one poll returns for a device set.
+
+    Results are keyed by the measurement type of a 15-minute series, like
+    "consumption_power", or by the daily sensor they feed, like
+    "consumption_today" (see assemblies.py).
+    """
+
+    results: Mapping[str, DailyResult | SeriesResult]
+    last_update: datetime = field(default_factory=datetime.now)
+
+    def get(self, key: str) -> DailyResult | SeriesResult | None:
+        """Return the result stored under ``key``, if the poll fetched it."""
+        return self.results.get(key)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable copy, for the snapshot store."""
+        return {
+            "results": {
+                key: _series_as_dict(result) if isinstance(result, SeriesResult)
+                else _daily_as_dict(result)
+                for key, result in self.results.items()
+            },
+            "last_update": self.last_update.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> DeviceData:
+        """Rebuild device data saved with ``as_dict``."""
+        return cls(
+            results={
+                key: _series_from_dict(result) if "measurements" in result
+                else _daily_from_dict(result)
+                for key, result in data["results"].items()
+            },
+            last_update=datetime.fromisoformat(data["last_update"]),
+        )
+
+
+def _date_as_str(value: date | None) -> str | None:
+    """Return an ISO date, or None."""
+    return value.isoformat() if value else None
+
+
+def _date_from_str(value: str | None) -> date | None:
+    """Parse an ISO date, or return None."""
+    return date.fromisoformat(value) if value else None
+
+
+def _end_as_str(end: datetime) -> str:
+    """Return an ISO timestamp, with its offset for the second pass of a repeated hour."""
+    return end.replace(tzinfo=PND_TIME_ZONE).isoformat() if end.fold else end.isoformat()
+
+
+def _end_from_str(value: str) -> datetime:
+    """Parse a timestamp saved with ``_end_as_str``."""
+    end = datetime.fromisoformat(value)
+    if end.tzinfo is None:
+        return end
+    return end.astimezone(PND_TIME_ZONE).replace(tzinfo=None)
+
+
+def _daily_as_dict(result: DailyResult) -> dict[str, Any]:
+    """Return a JSON-serializable copy of a daily result."""
+    return {
+        "value": result.value,
+        "total": result.total,
+        "min": result.min,
+        "max": result.max,
+        "name": result.name,
+        "unit": result.unit,
+        "date_from": _date_as_str(result.date_from),
+        "date_to": _date_as_str(result.date_to),
+    }
+
+
+def _daily_from_dict(data: dict[str, Any]) -> DailyResult:
+    """Rebuild a daily result."""
+    return DailyResult(
+        value=data["value"],
+        total=data["total"],
+        min=data["min"],
+        max=data["max"],
+        name=data["name"],
+        unit=data["unit"],
+        date_from=_date_from_str(data["date_from"]),
+        date_to=_date_from_str(data["date_to"]),
+    )
+
+
+def _series_as_dict(result: SeriesResult) -> dict[str, Any]:
+    """Return a JSON-serializable copy of a series, points as compact pairs."""
+    return {
+        "measurements": [
+            [_end_as_str(point.end), point.value] for point in result.measurements
+        ],
+        "flagged": [[_end_as_str(point.end), point.status] for point in result.flagged],
+        "total": result.total,
+        "min": result.min,
+        "max": result.max,
+        "name": result.name,
+        "unit": result.unit,
+        "date_from": _date_as_str(result.date_from),
+        "date_to": _date_as_str(result.date_to),
+    }
+
+
+def _series_from_dict(data: dict[str, Any]) -> SeriesResult:
+    """Rebuild a series."""
+    return SeriesResult(
+        measurements=tuple(
+            Measurement(_end_from_str(end), value)
+            for end, value in data["measurements"]
+        ),
+        flagged=tuple(
+            FlaggedPoint(_end_from_str(end), status)
+            for end, status in data["flagged"]
+        ),
+        total=data["total"],
+        min=data["min"],
+        max=data["max"],
+        name=data["name"],
+        unit=data["unit"],
+        date_from=_date_from_str(data["date_from"]),
+        date_to=_date_from_str(data["date_to"]),
+    )
@@ -0,0 +1,53 @@
+"""Process-wide request rate limiting for ČEZ Distribuce PND."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from .const import RATE_LIMIT_BURST, RATE_LIMIT_PER_SECOND
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    API calls run in executor threads, so ``acquire`` blocks the calling
+    thread until a token is available instead of yielding to the event loop.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Initialize a full bucket refilling at ``rate`` tokens per second."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last refill."""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Take ``tokens`` from the bucket, waiting if needed.
+
+        Returns the number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    if waited:
+                        _LOGGER.debug("Rate limited for %.2f s", waited)
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+# Shared by every CezPndApi instance in the process
+GLOBAL_LIMITER = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
@@ -0,0 +1,66 @@
+"""Detection of PND revisions to days already stored in the history."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+
+from .aggregation import point_day, totals_match
+from .models import SeriesResult
+from .series import SeriesHistory
+
+# (total, min, max) of daily kWh values, as in PND's seriesStats
+Fingerprint = tuple[float, float, float]
+
+
+def fingerprint(values: Iterable[float]) -> Fingerprint | None:
+    """Return the fingerprint of daily values, None if there are none."""
+    values = list(values)
+    if not values:
+        return None
+    return sum(values), min(values), max(values)
+
+
+def fingerprints_match(local: Fingerprint | None, reported: Fingerprint | None) -> bool:
+    """Return True if two fingerprints agree within the derived-total tolerance."""
+    if local is None or reported is None:
+        return local is reported
+    return all(totals_match(ours, theirs) for ours, theirs in zip(local, reported))
+
+
+def reported_days(daily_data: SeriesResult) -> dict[date, float]:
+    """Return kWh per day of a daily assembly response."""
+    return {point_day(point.end): point.value for point in daily_data.measurements}
+
+
+def revised_days(
+    series: SeriesHistory, daily_data: SeriesResult, start: date, end: date
+) -> dict[date, float]:
+    """Return the days in [start, end) PND reports differently than stored.
+
+    The whole window is compared first, using the seriesStats PND already
+    sends along, so the common case of no revision costs one comparison.
+    Values are PND's daily kWh, used to remember which revision was fetched.
+    """
+    reported = {
+        day: value for day, value in reported_days(daily_data).items() if start <= day < end
+    }
+    local = {day: _day_energy(series, day) for day in reported}
+
+    window = (daily_data.total, daily_data.min, daily_data.max)
+    if (
+        len(reported) == len(daily_data.measurements)
+        and fingerprints_match(fingerprint(local.values()), window)
+    ):
+        return {}
+
+    return {
+        day: value
+        for day, value in reported.items()
+        if not totals_match(local[day], value)
+    }
+
+
+def _day_energy(series: SeriesHistory, day: date) -> float:
+    """Return the stored kWh of one day."""
+    day_start = datetime.combine(day, datetime.min.time())
+    return series.energy(day_start, day_start + timedelta(days=1))
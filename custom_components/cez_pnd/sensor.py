@@ -1,18 +1,20 @@
 """Sensor platform for ČEZ Distribuce PND integration."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import logging
 from typing import Any
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfEnergy, UnitOfPower
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform, UnitOfEnergy, UnitOfPower
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
@@ -20,20 +22,59 @@ from homeassistant.helpers.update_coordinator import (
 )
 from homeassistant.util import dt as dt_util
 
+from .aggregation import SLOT, SLOT_HOURS
+from .anomaly import PEAK_QUANTILE, AnomalyDetector, SlotScore
+from .assemblies import ENABLED_TYPES, SERIES_TYPES
 from .const import DOMAIN
+from .forecast import Forecaster
+from .history import HistoryStore
+from .models import DailyResult, SeriesResult
+from .tariff import CostTotals, TariffEngine
 
 _LOGGER = logging.getLogger(__name__)
 
-try:
-    from homeassistant_historical_sensor import (
-        HistoricalSensor,
-        HistoricalState,
-        PollUpdateMixin,
-    )
-    HISTORICAL_SENSOR_AVAILABLE = True
-except ImportError:
-    HISTORICAL_SENSOR_AVAILABLE = False
-    _LOGGER.warning("homeassistant-historical-sensor not available, historical sensors disabled")
+
+# Start of the first and the last slot a lifetime meter covers
+ATTR_COUNTED_FROM = "counted_from"
+ATTR_COUNTED_UNTIL = "counted_until"
+
+# Periods of the tariff cost sensors
+COST_TODAY = "today"
+COST_YESTERDAY = "yesterday"
+COST_MONTH = "month"
+COST_PERIODS = {
+    COST_TODAY: "Cost Today",
+    COST_YESTERDAY: "Cost Yesterday",
+    COST_MONTH: "Cost This Month",
+}
+
+# Periods of the consumption forecast sensors
+FORECAST_TODAY = "today"
+FORECAST_MONTH = "month"
+FORECAST_PERIODS = {
+    FORECAST_TODAY: "Consumption Forecast Today",
+    FORECAST_MONTH: "Consumption Forecast This Month",
+}
+
+# Sensor types of the historical sensors replaced by long-term statistics
+HISTORICAL_SENSOR_TYPES = ("consumption_power", "production_power", "consumption_week")
+
+
+@callback
+def _async_remove_historical_entities(
+    hass: HomeAssistant, config_entry: ConfigEntry, device_ids: list[str]
+) -> None:
+    """Remove registry entries of the historical sensors."""
+    registry = er.async_get(hass)
+    for device_id in device_ids:
+        for sensor_type in HISTORICAL_SENSOR_TYPES:
+            unique_id, _name = _entity_ids(config_entry, device_id, sensor_type, "")
+            entity_id = registry.async_get_entity_id(
+                Platform.SENSOR, DOMAIN, f"{unique_id}_historical"
+            )
+            if entity_id is not None:
+                registry.async_remove(entity_id)
+                _LOGGER.info("Removed %s, its data is in long-term statistics now", entity_id)
 
 
 async def async_setup_entry(
@@ -44,67 +85,80 @@ async def async_setup_entry(
     """Set up ČEZ Distribuce PND sensors."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
 
+    # kWh sensors declared by the enabled measurement types
     sensors = [
         CezPndEnergySensor(
             coordinator,
             config_entry,
-            "consumption_today",
-            "Consumption Today",
-            "mdi:transmission-tower",
-        ),
-        CezPndEnergySensor(
-            coordinator,
-            config_entry,
-            "consumption_yesterday",
-            "Consumption Yesterday",
-            "mdi:transmission-tower",
-        ),
-        CezPndEnergySensor(
-            coordinator,
-            config_entry,
-            "production_today",
-            "Production Today",
-            "mdi:solar-power",
-        ),
-        CezPndEnergySensor(
-            coordinator,
-            config_entry,
-            "production_yesterday",
-            "Production Yesterday",
-            "mdi:solar-power",
-        ),
+            device_id,
+            sensor.key,
+            sensor.name,
+            sensor.icon or measurement.icon,
+            state_class=SensorStateClass.TOTAL if sensor.total else None,
+        )
+        for device_id in coordinator.device_ids
+        for measurement in ENABLED_TYPES
+        for sensor in measurement.sensors
     ]
 
-    # Add historical sensors if module is available
-    if HISTORICAL_SENSOR_AVAILABLE:
+    # Lifetime meters kept from the local history, for the Energy dashboard
+    history = hass.data[DOMAIN][config_entry.entry_id]["history"]
+    for device_id in coordinator.device_ids:
+        sensors.extend(
+            CezPndMeterSensor(history, config_entry, device_id, name, measurement.icon)
+            for name, measurement in SERIES_TYPES.items()
+        )
+
+    # Dual tariff costs of the consumption, kept current by the tariff engine
+    tariff = hass.data[DOMAIN][config_entry.entry_id]["tariff"]
+    if tariff is not None:
+        currency = hass.config.currency
+        sensors.extend(
+            CezPndCostSensor(history, tariff, config_entry, device_id, period, currency)
+            for device_id in coordinator.device_ids
+            for period in COST_PERIODS
+        )
+
+    # Rolling peak and anomaly statistics of the consumption
+    anomaly = hass.data[DOMAIN][config_entry.entry_id]["anomaly"]
+    for device_id in coordinator.device_ids:
+        detector = anomaly.detector(device_id)
         sensors.extend([
-            CezPndHistoricalPowerSensor(
-                coordinator,
-                config_entry,
-                "consumption_power",
-                "Consumption Power History",
-                "mdi:chart-line",
-            ),
-            CezPndHistoricalPowerSensor(
-                coordinator,
-                config_entry,
-                "production_power",
-                "Production Power History",
-                "mdi:chart-line",
-            ),
-            CezPndHistoricalEnergySensor(
-                coordinator,
-                config_entry,
-                "consumption_week",
-                "Consumption Week History",
-                "mdi:chart-bar",
-            ),
+            CezPndPeakSensor(history, detector, config_entry, device_id),
+            CezPndAnomalySensor(history, detector, config_entry, device_id),
         ])
-        _LOGGER.info("Historical sensors enabled for 15-minute power data and 7-day consumption")
+
+    # End-of-day and end-of-month forecasts of the consumption
+    forecast = hass.data[DOMAIN][config_entry.entry_id]["forecast"]
+    sensors.extend(
+        CezPndForecastSensor(history, forecast.forecaster(device_id), config_entry, device_id, period)
+        for device_id in coordinator.device_ids
+        for period in FORECAST_PERIODS
+    )
+
+    # 15-minute data goes to long-term statistics now (see statistics.py),
+    # drop the entities of the historical sensors that used to carry it
+    _async_remove_historical_entities(hass, config_entry, coordinator.device_ids)
 
     async_add_entities(sensors)
 
 
+def _entity_ids(
+    config_entry: ConfigEntry, device_id: str, sensor_type: str, name: str
+) -> tuple[str, str]:
+    """Return the unique ID and name of a sensor for one device set.
+
+    The device set the entry was configured with keeps the unique IDs and
+    names used before multi-device support, so existing entities survive.
+    """
+    if device_id == config_entry.data.get("device_id"):
+        return f"{config_entry.entry_id}_{sensor_type}", f"ČEZ PND {name}"
+    return (
+        f"{config_entry.entry_id}_{device_id}_{sensor_type}",
+        f"ČEZ PND {device_id} {name}",
+    )
+
+
 class CezPndEnergySensor(CoordinatorEntity, SensorEntity):
     """Representation of a ČEZ PND energy sensor (kWh)."""
 
@@ -112,299 +166,449 @@ class CezPndEnergySensor(CoordinatorEntity, SensorEntity):
         self,
         coordinator: DataUpdateCoordinator,
         config_entry: ConfigEntry,
+        device_id: str,
         sensor_type: str,
         name: str,
         icon: str,
+        state_class: SensorStateClass | None = SensorStateClass.TOTAL,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
+        self._device_id = device_id
         self._sensor_type = sensor_type
-        self._attr_name = f"ČEZ PND {name}"
-        self._attr_unique_id = f"{config_entry.entry_id}_{sensor_type}"
+        self._attr_unique_id, self._attr_name = _entity_ids(
+            config_entry, device_id, sensor_type, name
+        )
         self._attr_icon = icon
         self._attr_device_class = SensorDeviceClass.ENERGY
-        self._attr_state_class = SensorStateClass.TOTAL
+        self._attr_state_class = state_class
         self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
         self._attr_suggested_display_precision = 2  # Show 2 decimal places (e.g., 14.39)
+        self._attr_available = False
+        self._attr_last_reset = None
+        # Results are immutable, the one last written tells if anything changed
+        self._state_key: tuple[bool, DailyResult | SeriesResult | None] | None = None
+        self._update_from_data()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Recompute the state once per update and write it only if it changed."""
+        if self._update_from_data():
+            self.async_write_ha_state()
+
+    def _update_from_data(self) -> bool:
+        """Compute value, attributes and reset time from the coordinator data.
+
+        Returns True if any of them changed.
+        """
+        device_data = (self.coordinator.data or {}).get(self._device_id)
+        data: DailyResult | SeriesResult | None = (
+            device_data.get(self._sensor_type) if device_data else None
+        )
+        available = self.coordinator.last_update_success and data is not None
+        state_key = (available, data)
+        if state_key == self._state_key:
+            return False
+
+        if data is None and self.coordinator.data is not None:
+            _LOGGER.debug(
+                "Sensor %s: no data for device set %s",
+                self._sensor_type,
+                self._device_id,
+            )
+
+        previous = self._state_key[1] if self._state_key else None
+        self._state_key = state_key
+        self._attr_available = available
+        if data is None:
+            self._attr_native_value = 0.0
+            self._attr_extra_state_attributes = {}
+            self._attr_last_reset = None
+            return True
+
+        self._attr_native_value = data.total
+        self._attr_extra_state_attributes = {
+            "last_value": data.value,
+            "min": data.min,
+            "max": data.max,
+            "meter_name": data.name,
+            "date_from": _format_date(data.date_from),
+            "date_to": _format_date(data.date_to),
+            "last_update": device_data.last_update.isoformat(),
+        }
+        if previous is None or data.date_from != previous.date_from:
+            self._attr_last_reset = self._last_reset(data.date_from)
+        return True
 
     @property
-    def native_value(self) -> float | None:
-        """Return the state of the sensor."""
-        if self.coordinator.data is None:
-            _LOGGER.warning(f"Sensor {self._sensor_type}: coordinator.data is None")
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self._attr_available
+
+    def _last_reset(self, date_from: date | None) -> datetime | None:
+        """Return the start of the measurement period."""
+        if date_from is None or self._attr_state_class != SensorStateClass.TOTAL:
             return None
+        return dt_util.start_of_local_day(date_from)
 
-        data = self.coordinator.data.get(self._sensor_type, {})
-        if not data:
-            _LOGGER.warning(f"Sensor {self._sensor_type}: No data in coordinator for this sensor type. Available keys: {list(self.coordinator.data.keys())}")
 
-        total = data.get("total", 0.0)
-        _LOGGER.debug(f"Sensor {self._sensor_type}: native_value = {total}")
-        return total
+def _format_date(value: date | None) -> str:
+    """Return a date as PND shows it, e.g. "28.12.2025"."""
+    return value.strftime("%d.%m.%Y") if value else ""
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return additional attributes."""
-        if self.coordinator.data is None:
-            return {}
-
-        data = self.coordinator.data.get(self._sensor_type, {})
-        return {
-            "last_value": data.get("value", 0.0),
-            "min": data.get("min", 0.0),
-            "max": data.get("max", 0.0),
-            "meter_name": data.get("name", ""),
-            "date_from": data.get("date_from", ""),
-            "date_to": data.get("date_to", ""),
-            "last_update": self.coordinator.data.get("last_update", ""),
+
+class CezPndMeterSensor(RestoreSensor):
+    """Lifetime energy of one series, counted from the local 15-minute history.
+
+    The meter advances by the energy of slots after the last one it
+    counted, and of slots since it was created that are filled in later,
+    like refetched gaps. Backfilled days before its creation and revisions
+    don't make it jump or fall; those corrections reach the imported
+    statistics instead. The value and the slots covered survive restarts.
+    """
+
+    _attr_should_poll = False
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_suggested_display_precision = 2
+
+    def __init__(
+        self,
+        history: HistoryStore,
+        config_entry: ConfigEntry,
+        device_id: str,
+        name: str,
+        icon: str,
+    ) -> None:
+        """Initialize the sensor."""
+        self._series = history.series(device_id, name)
+        self._history = history
+        self._attr_unique_id, self._attr_name = _entity_ids(
+            config_entry, device_id, f"{name}_total", f"{name.capitalize()} Total"
+        )
+        self._attr_icon = icon
+        # Starts of the first and the last slot covered
+        self._counted_from: datetime | None = None
+        self._counted_until: datetime | None = None
+        self._total = 0.0
+
+    async def async_added_to_hass(self) -> None:
+        """Continue from the restored meter and follow changes of the history."""
+        if (last_data := await self.async_get_last_sensor_data()) is not None and isinstance(
+            last_data.native_value, (int, float)
+        ):
+            self._total = float(last_data.native_value)
+            self._attr_native_value = round(self._total, 3)
+            last_state = await self.async_get_last_state()
+            attributes = last_state.attributes if last_state else {}
+            # Meters from before the counted slot was kept continue from now
+            self._counted_until = (
+                _local(attributes[ATTR_COUNTED_UNTIL])
+                if attributes.get(ATTR_COUNTED_UNTIL)
+                else self._series.last_slot
+            )
+            # Meters from before their first slot was kept only count late
+            # slots from now on
+            if attributes.get(ATTR_COUNTED_FROM):
+                self._counted_from = _local(attributes[ATTR_COUNTED_FROM])
+            elif self._counted_until is not None:
+                self._counted_from = self._counted_until + SLOT
+        self._advance()
+        self.async_on_remove(self._series.add_observer(self._slot_changed))
+        self.async_on_remove(self._history.async_add_listener(self._handle_history_update))
+
+    def _slot_changed(self, start: datetime, previous: float | None, power: float) -> None:
+        """Count a covered slot that was empty and is filled in later.
+
+        Revised slots are left out, the meter never decreases.
+        """
+        if (
+            previous is None
+            and power > 0
+            and self._counted_from is not None
+            and self._counted_until is not None
+            and self._counted_from <= start <= self._counted_until
+        ):
+            self._total += power * SLOT_HOURS
+
+    def _advance(self) -> bool:
+        """Count the slots after the last counted one, return True if the state changed.
+
+        Slots filled in before the last counted one were added as they arrived.
+        """
+        last_slot = self._series.last_slot
+        if last_slot is None:
+            return False
+        if self._counted_until is None:
+            # A new meter starts at zero with the data already stored
+            self._counted_from = last_slot + SLOT
+            self._counted_until = last_slot
+        elif last_slot > self._counted_until:
+            self._total += self._series.energy(self._counted_until + SLOT, last_slot + SLOT)
+            self._counted_until = last_slot
+        value = round(self._total, 3)
+        attributes = {
+            ATTR_COUNTED_FROM: _aware(self._counted_from),
+            ATTR_COUNTED_UNTIL: _aware(self._counted_until),
         }
+        # A restored meter has its value but not yet the attributes
+        if value == self._attr_native_value and attributes == getattr(
+            self, "_attr_extra_state_attributes", None
+        ):
+            return False
+        self._attr_native_value = value
+        self._attr_extra_state_attributes = attributes
+        return True
+
+    @callback
+    def _handle_history_update(self) -> None:
+        """Write the new total if it advanced."""
+        if self._advance():
+            self.async_write_ha_state()
+
+
+class CezPndCostSensor(SensorEntity):
+    """Dual tariff cost of the consumption over today, yesterday or this month.
+
+    The tariff engine keeps daily and monthly aggregates current as slots
+    arrive, so an update is a lookup.
+    """
+
+    _attr_should_poll = False
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_suggested_display_precision = 2
+    _attr_icon = "mdi:cash"
 
-    @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        return (
-            self.coordinator.last_update_success
-            and self.coordinator.data is not None
-            and self._sensor_type in self.coordinator.data
+    def __init__(
+        self,
+        history: HistoryStore,
+        tariff: TariffEngine,
+        config_entry: ConfigEntry,
+        device_id: str,
+        period: str,
+        currency: str,
+    ) -> None:
+        """Initialize the sensor."""
+        self._history = history
+        self._costs = tariff.costs(device_id)
+        self._period = period
+        self._attr_unique_id, self._attr_name = _entity_ids(
+            config_entry, device_id, f"cost_{period}", COST_PERIODS[period]
         )
+        self._attr_native_unit_of_measurement = currency
+        self._totals: CostTotals | None = None
+        self._update_totals()
+
+    def _update_totals(self) -> bool:
+        """Look up the totals of the current period, return True if they changed."""
+        today = dt_util.now().date()
+        if self._period == COST_MONTH:
+            start = today.replace(day=1)
+            totals = self._costs.month(start)
+        else:
+            start = today if self._period == COST_TODAY else today - timedelta(days=1)
+            totals = self._costs.day(start)
+        last_reset = dt_util.start_of_local_day(start)
+        if totals == self._totals and last_reset == self._attr_last_reset:
+            return False
+
+        calendar = self._costs.calendar
+        self._totals = totals
+        self._attr_native_value = round(totals.cost, 2)
+        self._attr_last_reset = last_reset
+        self._attr_extra_state_attributes = {
+            "nt_kwh": round(totals.nt_kwh, 3),
+            "vt_kwh": round(totals.vt_kwh, 3),
+            "nt_price": calendar.nt_price,
+            "vt_price": calendar.vt_price,
+        }
+        return True
 
-    @property
-    def last_reset(self) -> datetime | None:
-        """Return the time when the sensor was last reset (start of measurement period)."""
-        if self.coordinator.data is None:
-            return None
+    async def async_added_to_hass(self) -> None:
+        """Follow changes of the history."""
+        self.async_on_remove(self._history.async_add_listener(self._handle_history_update))
 
-        data = self.coordinator.data.get(self._sensor_type, {})
-        date_from_str = data.get("date_from", "")
+    @callback
+    def _handle_history_update(self) -> None:
+        """Write the new cost if it changed."""
+        if self._update_totals():
+            self.async_write_ha_state()
 
-        if not date_from_str:
-            return None
 
-        try:
-            # Parse the date_from string (format: "28.12.2025")
-            date_obj = datetime.strptime(date_from_str, "%d.%m.%Y")
-            # Convert to timezone-aware datetime at midnight
-            return dt_util.start_of_local_day(dt_util.as_local(date_obj))
-        except (ValueError, TypeError) as err:
-            _LOGGER.warning(
-                "Failed to parse date_from '%s' for sensor %s: %s",
-                date_from_str,
-                self._sensor_type,
-                err,
-            )
-            return None
+class CezPndPeakSensor(SensorEntity):
+    """Peak 15-minute power of the consumption over the last week.
+
+    The state is the PEAK_QUANTILE of the week's slots, so a single spike
+    doesn't hold it up for a week; the median and the maximum are attributes.
+    """
+
+    _attr_should_poll = False
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfPower.KILO_WATT
+    _attr_suggested_display_precision = 2
+    _attr_icon = "mdi:chart-bell-curve-cumulative"
+
+    def __init__(
+        self,
+        history: HistoryStore,
+        detector: AnomalyDetector,
+        config_entry: ConfigEntry,
+        device_id: str,
+    ) -> None:
+        """Initialize the sensor."""
+        self._history = history
+        self._detector = detector
+        self._attr_unique_id, self._attr_name = _entity_ids(
+            config_entry, device_id, "consumption_peak", "Consumption Peak Power"
+        )
+        self._attr_native_value, self._attr_extra_state_attributes = self._current_state()
+
+    def _current_state(self) -> tuple[float | None, dict[str, Any]]:
+        """Return the window's peak and its attributes."""
+        quantiles = self._detector.quantiles
+        if not len(quantiles):
+            return None, {}
+        return round(quantiles.quantile(PEAK_QUANTILE), 3), {
+            "median": round(quantiles.quantile(0.5), 3),
+            "max": round(quantiles.quantile(1.0), 3),
+            "slots": len(quantiles),
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Follow changes of the history."""
+        self.async_on_remove(self._history.async_add_listener(self._handle_history_update))
+
+    @callback
+    def _handle_history_update(self) -> None:
+        """Write the new peak if it changed."""
+        state = self._current_state()
+        if state != (self._attr_native_value, self._attr_extra_state_attributes):
+            self._attr_native_value, self._attr_extra_state_attributes = state
+            self.async_write_ha_state()
+
+
+class CezPndAnomalySensor(SensorEntity):
+    """How unusual the latest 15-minute consumption slot was.
+
+    The state is the number of standard deviations the slot was above the
+    recent mean or its weekday baseline, whichever is more; the last
+    anomaly reported as an event is kept in the attributes.
+    """
+
+    _attr_should_poll = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 1
+    _attr_icon = "mdi:alert-decagram-outline"
+
+    def __init__(
+        self,
+        history: HistoryStore,
+        detector: AnomalyDetector,
+        config_entry: ConfigEntry,
+        device_id: str,
+    ) -> None:
+        """Initialize the sensor."""
+        self._history = history
+        self._detector = detector
+        self._attr_unique_id, self._attr_name = _entity_ids(
+            config_entry, device_id, "consumption_anomaly", "Consumption Anomaly Score"
+        )
+        self._latest: SlotScore | None = None
+        self._update_from_detector()
+
+    def _update_from_detector(self) -> None:
+        """Read the latest slot's score and the last anomaly."""
+        latest = self._latest = self._detector.latest
+        anomaly = self._detector.last_anomaly
+        self._attr_native_value = round(latest.score, 2) if latest else None
+        self._attr_extra_state_attributes = {
+            "slot_start": _aware(latest.start) if latest else None,
+            "power": round(latest.power, 3) if latest else None,
+            "mean": round(latest.mean, 3) if latest else None,
+            "baseline": round(latest.baseline, 3) if latest and latest.baseline is not None else None,
+            "last_anomaly": anomaly.kind if anomaly else None,
+            "last_anomaly_start": _aware(anomaly.start) if anomaly else None,
+            "last_anomaly_power": round(anomaly.power, 3) if anomaly else None,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Follow changes of the history."""
+        self.async_on_remove(self._history.async_add_listener(self._handle_history_update))
+
+    @callback
+    def _handle_history_update(self) -> None:
+        """Write the new score if a slot was added."""
+        if self._detector.latest is not self._latest:
+            self._update_from_detector()
+            self.async_write_ha_state()
+
+
+class CezPndForecastSensor(SensorEntity):
+    """Forecast kWh of the consumption by the end of today or this month.
+
+    Stored slots count as measured and the rest of the period comes from
+    the seasonal profile of the last weeks; the measured part and the
+    forecast remainder are attributes.
+    """
+
+    _attr_should_poll = False
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_suggested_display_precision = 1
+    _attr_icon = "mdi:chart-timeline-variant-shimmer"
+
+    def __init__(
+        self,
+        history: HistoryStore,
+        forecaster: Forecaster,
+        config_entry: ConfigEntry,
+        device_id: str,
+        period: str,
+    ) -> None:
+        """Initialize the sensor."""
+        self._history = history
+        self._forecaster = forecaster
+        self._period = period
+        self._attr_unique_id, self._attr_name = _entity_ids(
+            config_entry, device_id, f"consumption_forecast_{period}", FORECAST_PERIODS[period]
+        )
+        self._attr_native_value, self._attr_extra_state_attributes = self._current_state()
+
+    def _current_state(self) -> tuple[float | None, dict[str, Any]]:
+        """Return the period's forecast and its attributes."""
+        forecast = self._forecaster.forecast(dt_util.now().date())
+        if forecast is None:
+            return None, {}
+        if self._period == FORECAST_MONTH:
+            actual, total = forecast.month_actual, forecast.month_forecast
+        else:
+            actual, total = forecast.today_actual, forecast.today_forecast
+        return round(total, 3), {
+            "measured": round(actual, 3),
+            "remaining": round(total - actual, 3),
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Follow changes of the history."""
+        self.async_on_remove(self._history.async_add_listener(self._handle_history_update))
+
+    @callback
+    def _handle_history_update(self) -> None:
+        """Write the new forecast if it changed."""
+        state = self._current_state()
+        if state != (self._attr_native_value, self._attr_extra_state_attributes):
+            self._attr_native_value, self._attr_extra_state_attributes = state
+            self.async_write_ha_state()
+
 
+def _aware(moment: datetime) -> str:
+    """Return a local naive history time as an ISO string with the time zone."""
+    return moment.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE).isoformat()
 
-# Historical sensor implementation (requires homeassistant-historical-sensor)
-if HISTORICAL_SENSOR_AVAILABLE:
-    class CezPndHistoricalPowerSensor(PollUpdateMixin, HistoricalSensor, CoordinatorEntity, SensorEntity):
-        """Historical power sensor showing all 15-minute measurements in regular history graph."""
-
-        def __init__(
-            self,
-            coordinator: DataUpdateCoordinator,
-            config_entry: ConfigEntry,
-            sensor_type: str,
-            name: str,
-            icon: str,
-        ) -> None:
-            """Initialize the historical sensor."""
-            CoordinatorEntity.__init__(self, coordinator)
-            self._sensor_type = sensor_type
-            self._attr_name = f"ČEZ PND {name}"
-            self._attr_unique_id = f"{config_entry.entry_id}_{sensor_type}_historical"
-            self._attr_icon = icon
-            self._attr_device_class = SensorDeviceClass.POWER
-            # Note: No state_class - historical sensors dont use automatic statistics
-            self._attr_native_unit_of_measurement = UnitOfPower.KILO_WATT
-            self._attr_suggested_display_precision = 3
-            self._attr_historical_states = []
-
-        async def async_update_historical(self) -> None:
-            """Update historical states from coordinator data."""
-            if self.coordinator.data is None:
-                _LOGGER.debug(f"Historical sensor {self._sensor_type}: No coordinator data")
-                return
-
-            data = self.coordinator.data.get(self._sensor_type, {})
-            measurements = data.get("measurements", [])
-
-            if not measurements:
-                _LOGGER.debug(f"Historical sensor {self._sensor_type}: No measurements")
-                return
-
-            _LOGGER.info(f"📊 Historical sensor {self._sensor_type}: Processing {len(measurements)} measurements")
-
-            # Convert measurements to HistoricalState objects
-            historical_states = []
-            for measurement in measurements:
-                timestamp_str = measurement.get("timestamp", "")
-                value = measurement.get("value", 0.0)
-
-                if not timestamp_str:
-                    continue
-
-                try:
-                    # Parse timestamp (format: "29.12.2025 04:30" or "27.12.2025 24:00")
-                    # 24:00 on day X represents end of day X (23:59)
-                    ts = timestamp_str
-                    if " 24:00" in ts:
-                        # Replace 24:00 with 23:59 to keep the value on the correct day
-                        ts = ts.replace(" 24:00", " 23:59")
-                        dt = datetime.strptime(ts, "%d.%m.%Y %H:%M")
-                    else:
-                        dt = datetime.strptime(ts, "%d.%m.%Y %H:%M")
-
-                    # Make timezone aware
-                    dt = dt_util.as_local(dt)
-
-                    # Create historical state
-                    hist_state = HistoricalState(
-                        state=value,
-                        dt=dt,
-                    )
-                    historical_states.append(hist_state)
-
-                except (ValueError, TypeError) as err:
-                    _LOGGER.warning(f"Failed to parse timestamp '{timestamp_str}': {err}")
-                    continue
-
-            self._attr_historical_states = historical_states
-
-            if historical_states:
-                first_ts = measurements[0].get("timestamp", "")
-                last_ts = measurements[-1].get("timestamp", "")
-                _LOGGER.info(
-                    f"✅ Historical sensor {self._sensor_type}: Prepared {len(historical_states)} states "
-                    f"from {first_ts} to {last_ts}"
-                )
-
-        @property
-        def extra_state_attributes(self) -> dict[str, Any]:
-            """Return additional attributes."""
-            if self.coordinator.data is None:
-                return {}
-
-            data = self.coordinator.data.get(self._sensor_type, {})
-            measurements = data.get("measurements", [])
-
-            return {
-                "measurement_count": len(measurements),
-                "date_from": data.get("date_from", ""),
-                "date_to": data.get("date_to", ""),
-                "meter_name": data.get("name", ""),
-                "unit": data.get("unit", "kW"),
-                "last_update": self.coordinator.data.get("last_update", ""),
-            }
-
-    class CezPndHistoricalEnergySensor(PollUpdateMixin, HistoricalSensor, CoordinatorEntity, SensorEntity):
-        """Historical energy sensor showing hourly consumption data over 7 days."""
-
-        def __init__(
-            self,
-            coordinator: DataUpdateCoordinator,
-            config_entry: ConfigEntry,
-            sensor_type: str,
-            name: str,
-            icon: str,
-        ) -> None:
-            """Initialize the historical energy sensor."""
-            CoordinatorEntity.__init__(self, coordinator)
-            self._sensor_type = sensor_type
-            self._attr_name = f"ČEZ PND {name}"
-            self._attr_unique_id = f"{config_entry.entry_id}_{sensor_type}_historical"
-            self._attr_icon = icon
-            self._attr_device_class = SensorDeviceClass.ENERGY
-            # Note: No state_class - historical sensors dont use automatic statistics
-            self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-            self._attr_suggested_display_precision = 3
-            self._attr_historical_states = []
-
-        async def async_update_historical(self) -> None:
-            """Update historical states from coordinator data."""
-            if self.coordinator.data is None:
-                _LOGGER.debug(f"Historical energy sensor {self._sensor_type}: No coordinator data")
-                return
-
-            data = self.coordinator.data.get(self._sensor_type, {})
-            measurements = data.get("measurements", [])
-
-            if not measurements:
-                _LOGGER.debug(f"Historical energy sensor {self._sensor_type}: No measurements")
-                return
-
-            _LOGGER.info(f"📊 Historical energy sensor {self._sensor_type}: Processing {len(measurements)} measurements")
-
-            # Convert measurements to HistoricalState objects
-            # For each day, create two data points: start of day (0) and end of day (total)
-            historical_states = []
-            for measurement in measurements:
-                timestamp_str = measurement.get("timestamp", "")
-                value = measurement.get("value", 0.0)
-
-                if not timestamp_str:
-                    continue
-
-                try:
-                    # Parse timestamp (format: "29.12.2025 04:30" or "27.12.2025 24:00")
-                    # For energy data: 24:00 means end of day, keep it on the same day
-                    ts = timestamp_str
-                    if " 24:00" in ts:
-                        # Replace 24:00 with 23:59 to keep the value on the correct day
-                        ts = ts.replace(" 24:00", " 23:59")
-                        dt_end = datetime.strptime(ts, "%d.%m.%Y %H:%M")
-                    else:
-                        dt_end = datetime.strptime(ts, "%d.%m.%Y %H:%M")
-
-                    # Make timezone aware
-                    dt_end = dt_util.as_local(dt_end)
-
-                    # Create start of day timestamp (00:00)
-                    dt_start = dt_end.replace(hour=0, minute=0, second=0, microsecond=0)
-
-                    # Add state at start of day (0 kWh) - day begins with no consumption
-                    hist_state_start = HistoricalState(
-                        state=0.0,
-                        dt=dt_start,
-                    )
-                    historical_states.append(hist_state_start)
-
-                    # Add state at end of day (total kWh for that day)
-                    hist_state_end = HistoricalState(
-                        state=value,
-                        dt=dt_end,
-                    )
-                    historical_states.append(hist_state_end)
-
-                except (ValueError, TypeError) as err:
-                    _LOGGER.warning(f"Failed to parse timestamp '{timestamp_str}': {err}")
-                    continue
-
-            self._attr_historical_states = historical_states
-
-            if historical_states:
-                first_ts = measurements[0].get("timestamp", "")
-                last_ts = measurements[-1].get("timestamp", "")
-                _LOGGER.info(
-                    f"✅ Historical energy sensor {self._sensor_type}: Prepared {len(historical_states)} states "
-                    f"from {first_ts} to {last_ts}"
-                )
-
-        @property
-        def extra_state_attributes(self) -> dict[str, Any]:
-            """Return additional attributes."""
-            if self.coordinator.data is None:
-                return {}
-
-            data = self.coordinator.data.get(self._sensor_type, {})
-            measurements = data.get("measurements", [])
-
-            return {
-                "measurement_count": len(measurements),
-                "date_from": data.get("date_from", ""),
-                "date_to": data.get("date_to", ""),
-                "meter_name": data.get("name", ""),
-                "unit": data.get("unit", "kWh"),
-                "last_update": self.coordinator.data.get("last_update", ""),
-            }
 
+def _local(moment: str) -> datetime:
+    """Return an ISO string written by ``_aware`` as local naive history time."""
+    return dt_util.as_local(dt_util.parse_datetime(moment)).replace(tzinfo=None)
@@ -0,0 +1,697 @@
+"""15-minute series with rollups, and their column files.
+
+Free of Home Assistant imports, so the command line tools can read and
+write the integration's history without it.
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from datetime import date, datetime, timedelta
+import logging
+import math
+import os
+from typing import Any
+
+from .aggregation import (
+    RESOLUTION_DAY,
+    RESOLUTION_HOUR,
+    RESOLUTION_MONTH,
+    RESOLUTION_SLOT,
+    SLOT,
+    SLOT_HOURS,
+    bucket_end,
+    bucket_start,
+    repeated_hour,
+    repeated_slot,
+    slot_exists,
+    slot_starts,
+)
+from .columnar import (
+    EPOCH,
+    MISSING_INT32,
+    MISSING_UINT8,
+    SLOTS_PER_DAY,
+    ColumnFile,
+    day_number,
+)
+from .const import DEFAULT_MEMORY_DAYS, STATUS_ABSENT, STATUS_OK
+from .models import FlaggedPoint, Measurement
+
+_LOGGER = logging.getLogger(__name__)
+
+# kW values are stored as integer watts
+VALUE_SCALE = 1000
+VALUES_SUFFIX = ".values"
+STATUS_SUFFIX = ".status"
+# The second pass of the hour repeated when clocks go back, on those days
+REPEATED_SUFFIX = ".repeated"
+
+# Rollups from finest to coarsest
+ROLLUP_RESOLUTIONS = (RESOLUTION_HOUR, RESOLUTION_DAY, RESOLUTION_MONTH)
+
+# Day number of a free ring row
+_NO_DAY = -(2**31)
+_SLOT_MINUTES = int(SLOT.total_seconds() // 60)
+REPEATED_SLOTS = 60 // _SLOT_MINUTES
+
+
+def _slot_index(start: datetime) -> int:
+    """Return the position of a slot within its day."""
+    return (start.hour * 60 + start.minute) // _SLOT_MINUTES
+
+
+class SlotRing:
+    """Fixed-capacity ring of the 15-minute kW slots of the latest days.
+
+    Day ``n`` (days since the epoch) takes row ``n % capacity``, so a new
+    day replaces the one ``capacity`` days before it and the memory used
+    stays the same however long the history grows. Missing slots are NaN.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Allocate an empty ring of ``capacity`` days."""
+        self.capacity = capacity
+        self._values = array("d", [math.nan]) * (capacity * SLOTS_PER_DAY)
+        self._days = array("i", [_NO_DAY]) * capacity
+        self._newest = _NO_DAY
+        # Slots with a value
+        self.count = 0
+
+    def row(self, day: date) -> int | None:
+        """Return the row holding a day, None if it isn't in memory."""
+        number = day_number(day)
+        row = number % self.capacity
+        return row if self._days[row] == number else None
+
+    def place(self, day: date) -> tuple[int | None, date | None, list[float | None]]:
+        """Return the row for a day, taking it over from an older day if needed.
+
+        Returns None as the row if the row holds a newer day, i.e. the day is
+        too old for the ring, and the day and values evicted from the row.
+        """
+        number = day_number(day)
+        row = number % self.capacity
+        held = self._days[row]
+        if held == number:
+            return row, None, []
+        if held > number:
+            return None, None, []
+        evicted: date | None = None
+        values: list[float | None] = []
+        if held != _NO_DAY:
+            evicted = EPOCH + timedelta(days=held)
+            values = self.row_values(row)
+            self.count -= sum(value is not None for value in values)
+            offset = row * SLOTS_PER_DAY
+            self._values[offset:offset + SLOTS_PER_DAY] = array("d", [math.nan]) * SLOTS_PER_DAY
+        self._days[row] = number
+        self._newest = max(self._newest, number)
+        return row, evicted, values
+
+    def get(self, row: int, index: int) -> float | None:
+        """Return slot ``index`` of a row, None if it has no value."""
+        value = self._values[row * SLOTS_PER_DAY + index]
+        return None if math.isnan(value) else value
+
+    def set(self, row: int, index: int, value: float) -> None:
+        """Store a slot of a row."""
+        position = row * SLOTS_PER_DAY + index
+        if math.isnan(self._values[position]):
+            self.count += 1
+        self._values[position] = value
+
+    def row_values(self, row: int) -> list[float | None]:
+        """Return the slots of a row, None where there is no value."""
+        offset = row * SLOTS_PER_DAY
+        return [
+            None if math.isnan(value) else value
+            for value in self._values[offset:offset + SLOTS_PER_DAY]
+        ]
+
+    def days(self) -> list[date]:
+        """Return the days held, in order."""
+        return sorted(EPOCH + timedelta(days=number) for number in self._days if number != _NO_DAY)
+
+    @property
+    def window_start(self) -> date | None:
+        """Return the first day of the ``capacity`` days up to the newest one held."""
+        if self._newest == _NO_DAY:
+            return None
+        return EPOCH + timedelta(days=self._newest - self.capacity + 1)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the size of the buffers in bytes."""
+        return (
+            len(self._values) * self._values.itemsize + len(self._days) * self._days.itemsize
+        )
+
+
+class SeriesHistory:
+    """15-minute kW slots of one series, with hourly, daily and monthly kWh rollups.
+
+    Only the slots of the last ``memory_days`` days are kept in memory, in a
+    ring; older days live in the column files. Rollups and the gap index
+    cover the whole history, and rollups are adjusted by the difference
+    whenever a slot is added or revised, so they never have to be
+    recomputed from the raw slots. Slots PND flagged or left out are kept
+    with their status as the gap index until a valid value arrives.
+
+    Slots written to days older than the ring are held as pending days
+    until they are written to disk, where they are merged into the stored
+    day. Such days are only fetched when the history lacks them or has
+    gaps there, so their slots count as new.
+
+    The day clocks go back has 100 slots: the second pass of the repeated
+    hour, whose starts carry ``fold=1``, is kept apart from the day's 96
+    and shares the rollups of the first pass. It has no gap index.
+    """
+
+    def __init__(self, memory_days: int = DEFAULT_MEMORY_DAYS) -> None:
+        """Initialize an empty series."""
+        self._ring = SlotRing(memory_days)
+        # Changed days outside the ring, until they are written to disk
+        self._pending: dict[date, list[float | None]] = {}
+        # Second pass of the repeated hour, by day
+        self._repeated: dict[date, list[float | None]] = {}
+        # Status of every slot without a valid value, i.e. the gaps
+        self._gaps: dict[datetime, int] = {}
+        self._rollups: dict[str, dict[datetime, float]] = {
+            resolution: {} for resolution in ROLLUP_RESOLUTIONS
+        }
+        # Days with slots changed since the last write to disk
+        self.dirty_days: set[date] = set()
+        # Earliest slot changed since the last statistics import
+        self.changed_since: datetime | None = None
+        self._first: datetime | None = None
+        self._last: datetime | None = None
+        # Called with (slot start, previous kW, new kW) whenever a slot changes
+        self._observers: list[Callable[[datetime, float | None, float], None]] = []
+
+    def __len__(self) -> int:
+        """Return the number of slots in memory."""
+        return self._ring.count + sum(
+            value is not None
+            for stored in (self._pending, self._repeated)
+            for values in stored.values()
+            for value in values
+        )
+
+    @property
+    def first_slot(self) -> datetime | None:
+        """Return the start of the earliest stored slot."""
+        return self._first
+
+    @property
+    def last_slot(self) -> datetime | None:
+        """Return the start of the latest stored slot."""
+        return self._last
+
+    def set_slot(self, start: datetime, power: float) -> bool:
+        """Store the kW average of the slot starting at ``start``.
+
+        Returns True if the stored value changed.
+        """
+        day = start.date()
+        if repeated_slot(start):
+            repeated = self._repeated.setdefault(day, [None] * REPEATED_SLOTS)
+            index = start.minute // _SLOT_MINUTES
+            previous = repeated[index]
+            if previous == power:
+                return False
+            repeated[index] = power
+        else:
+            index = _slot_index(start)
+            row, evicted, evicted_values = self._ring.place(day)
+            if evicted is not None and evicted in self.dirty_days:
+                # Not written yet, keep it until the next write
+                self._pending[evicted] = evicted_values
+            if row is None:
+                pending = self._pending.get(day)
+                previous = pending[index] if pending else None
+            else:
+                previous = self._ring.get(row, index)
+            if previous == power:
+                return False
+
+            if row is None:
+                self._pending.setdefault(day, [None] * SLOTS_PER_DAY)[index] = power
+            else:
+                self._ring.set(row, index, power)
+            self._gaps.pop(start, None)
+        self.dirty_days.add(day)
+        if self.changed_since is None or start < self.changed_since:
+            self.changed_since = start.replace(fold=0)
+        delta = (power - (previous or 0.0)) * SLOT_HOURS
+        for resolution, rollup in self._rollups.items():
+            key = bucket_start(start, resolution)
+            rollup[key] = rollup.get(key, 0.0) + delta
+        for observer in self._observers:
+            observer(start, previous, power)
+        if self._first is None or start < self._first:
+            self._first = start
+        if self._last is None or start > self._last:
+            self._last = start
+        return True
+
+    def add_observer(
+        self, observer: Callable[[datetime, float | None, float], None]
+    ) -> Callable[[], None]:
+        """Call ``observer`` with the slot start, previous and new kW of every change.
+
+        Returns a function that removes the observer again.
+        """
+        self._observers.append(observer)
+        return lambda: self._observers.remove(observer)
+
+    def mark_written(self) -> None:
+        """Forget the changed days once they are written, with the pending ones."""
+        self.dirty_days.clear()
+        self._pending.clear()
+        for day in [day for day in self._repeated if self._ring.row(day) is None]:
+            del self._repeated[day]
+
+    def set_gap(self, start: datetime, status: int) -> bool:
+        """Record that the slot starting at ``start`` has no valid value.
+
+        Slots that already have a value keep it, and slots of the hour
+        skipped when clocks go forward never existed. Returns True if the
+        stored status changed.
+        """
+        if (
+            repeated_slot(start)
+            or self._get(start) is not None
+            or self._gaps.get(start) == status
+            or not slot_exists(start)
+        ):
+            return False
+        self._gaps[start] = status
+        self.dirty_days.add(start.date())
+        return True
+
+    def add_measurements(
+        self,
+        measurements: Iterable[Measurement],
+        flagged: Iterable[FlaggedPoint] = (),
+    ) -> int:
+        """Store PND measurements and flagged points, return how many slots changed.
+
+        Slots missing between the first and last reported point are recorded
+        as absent.
+        """
+        measurements = list(measurements)
+        flagged = list(flagged)
+        valid = slot_starts(measurements)
+        invalid = slot_starts(flagged)
+
+        changed = sum(
+            self.set_slot(start, point.value)
+            for start, point in zip(valid, measurements)
+        )
+        changed += sum(
+            self.set_gap(start, point.status)
+            for start, point in zip(invalid, flagged)
+        )
+
+        reported = set(valid) | set(invalid)
+        if reported:
+            current, last = min(reported), max(reported)
+            while current < last:
+                if current not in reported:
+                    changed += self.set_gap(current, STATUS_ABSENT)
+                current += SLOT
+        return changed
+
+    def _get(self, start: datetime) -> float | None:
+        """Return the kW of a slot in memory, None if it has no value or isn't in memory."""
+        day = start.date()
+        if repeated_slot(start):
+            repeated = self._repeated.get(day)
+            return repeated[start.minute // _SLOT_MINUTES] if repeated else None
+        row = self._ring.row(day)
+        if row is not None:
+            return self._ring.get(row, _slot_index(start))
+        if pending := self._pending.get(day):
+            return pending[_slot_index(start)]
+        return None
+
+    def days(self) -> list[date]:
+        """Return the days with stored values, in order, in memory or not."""
+        return sorted(day.date() for day in self._rollups[RESOLUTION_DAY])
+
+    def memory_days(self) -> list[date]:
+        """Return the days whose slots are in memory, in order."""
+        return sorted({*self._ring.days(), *self._pending})
+
+    def covers(self, start: datetime) -> bool:
+        """Return True if every slot from ``start`` on is in memory."""
+        window_start = self._ring.window_start
+        return window_start is None or start.date() >= window_start
+
+    def memory_usage(self) -> dict[str, Any]:
+        """Return what the series keeps in memory, for diagnostics."""
+        return {
+            "memory_days": self._ring.capacity,
+            "days_in_memory": len(self._ring.days()),
+            "slots_in_memory": len(self),
+            "pending_days": len(self._pending),
+            "ring_bytes": self._ring.nbytes,
+            "rollup_buckets": sum(len(rollup) for rollup in self._rollups.values()),
+            "gaps": len(self._gaps),
+            "first_slot": self._first.isoformat() if self._first else None,
+            "last_slot": self._last.isoformat() if self._last else None,
+        }
+
+    def has_day(self, day: date) -> bool:
+        """Return True if anything is known about the day, values or gaps."""
+        day_start = datetime.combine(day, datetime.min.time())
+        return day_start in self._rollups[RESOLUTION_DAY] or any(
+            slot.date() == day for slot in self._gaps
+        )
+
+    def gaps(self, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+        """Return the [start, end) intervals of consecutive gap slots in the range."""
+        intervals: list[tuple[datetime, datetime]] = []
+        for slot in sorted(slot for slot in self._gaps if start <= slot < end):
+            if intervals and intervals[-1][1] == slot:
+                intervals[-1] = (intervals[-1][0], slot + SLOT)
+            else:
+                intervals.append((slot, slot + SLOT))
+        return intervals
+
+    @property
+    def gap_count(self) -> int:
+        """Return the number of slots without a valid value."""
+        return len(self._gaps)
+
+    def energy(self, start: datetime, end: datetime) -> float:
+        """Return kWh between ``start`` and ``end``.
+
+        The range is covered greedily by the coarsest aligned buckets that fit,
+        so the cost is proportional to the number of buckets, not slots.
+        """
+        total = 0.0
+        current = bucket_start(start, RESOLUTION_SLOT)
+        while current < end:
+            for resolution in reversed(ROLLUP_RESOLUTIONS):
+                if bucket_start(current, resolution) != current:
+                    continue
+                following = bucket_end(current, resolution)
+                if following <= end:
+                    total += self._rollups[resolution].get(current, 0.0)
+                    current = following
+                    break
+            else:
+                power = self._get(current) or 0.0
+                repeated = current.replace(fold=1)
+                if current.date() in self._repeated and repeated_slot(repeated):
+                    power += self._get(repeated) or 0.0
+                total += power * SLOT_HOURS
+                current += SLOT
+        return total
+
+    def series(
+        self, start: datetime, end: datetime, resolution: str
+    ) -> list[tuple[datetime, float]]:
+        """Return (bucket start, value) pairs between ``start`` and ``end``.
+
+        Values are kWh per bucket, or kW averages for 15-minute resolution.
+        Buckets without data are left out.
+        """
+        return list(self.iter_series(start, end, resolution))
+
+    def iter_series(
+        self, start: datetime, end: datetime, resolution: str
+    ) -> Iterator[tuple[datetime, float]]:
+        """Yield the pairs of ``series`` in order, without building a list.
+
+        Only the part of the range between the first and last stored slot
+        is walked, bucket by bucket. Slots come from memory only, see
+        HistoryStore.async_read_series for older ones.
+        """
+        if self._first is None or self._last is None:
+            return
+        stop = min(end, self._last + SLOT)
+
+        if resolution == RESOLUTION_SLOT:
+            current = bucket_start(max(start, self._first), RESOLUTION_SLOT)
+            if current < start:
+                current += SLOT
+            while current < stop:
+                if (power := self._get(current)) is not None:
+                    yield current, power
+                if current.minute == 60 - _SLOT_MINUTES and current.date() in self._repeated:
+                    # The second pass follows the last slot of the repeated hour
+                    for start, power in self.repeated_slots(current.date()):
+                        if start.hour == current.hour:
+                            yield start, power
+                current += SLOT
+            return
+
+        rollup = self._rollups[resolution]
+        current = bucket_start(max(start, self._first), resolution)
+        while current < stop:
+            following = bucket_end(current, resolution)
+            if current in rollup:
+                if current < start or following > end:
+                    # Partial bucket at the edge of the range
+                    yield current, self.energy(max(current, start), min(following, end))
+                else:
+                    yield current, rollup[current]
+            current = following
+
+    def hour_stats(
+        self, start: datetime, end: datetime
+    ) -> list[tuple[datetime, float, float, float, float]]:
+        """Return (hour, kWh, mean kW, min kW, max kW) of the hours with data."""
+        stats = []
+        hourly = self._rollups[RESOLUTION_HOUR]
+        current = bucket_start(start, RESOLUTION_HOUR)
+        while current < end:
+            following = bucket_end(current, RESOLUTION_HOUR)
+            if current in hourly:
+                powers = [
+                    power
+                    for power in (self._get(current + index * SLOT) for index in range(4))
+                    if power is not None
+                ]
+                powers += [
+                    power
+                    for start, power in self.repeated_slots(current.date())
+                    if start.hour == current.hour
+                ]
+                if powers:
+                    stats.append((
+                        current,
+                        hourly[current],
+                        sum(powers) / len(powers),
+                        min(powers),
+                        max(powers),
+                    ))
+            current = following
+        return stats
+
+    def day_values(self, day: date) -> list[float | None]:
+        """Return the slots of one day, None where there is no data in memory."""
+        row = self._ring.row(day)
+        if row is not None:
+            return self._ring.row_values(row)
+        return list(self._pending.get(day) or [None] * SLOTS_PER_DAY)
+
+    def repeated_values(self, day: date) -> list[float | None]:
+        """Return the second pass of the hour repeated on a day, None where there is no data."""
+        return list(self._repeated.get(day) or [None] * REPEATED_SLOTS)
+
+    def repeated_slots(self, day: date) -> list[tuple[datetime, float]]:
+        """Return (start, kW) of the second pass of the hour repeated on a day."""
+        repeated = self._repeated.get(day)
+        hour = repeated_hour(day) if repeated else None
+        if hour is None:
+            return []
+        return [
+            ((hour + index * SLOT).replace(fold=1), power)
+            for index, power in enumerate(repeated)
+            if power is not None
+        ]
+
+    def day_statuses(self, day: date) -> list[int]:
+        """Return the status of each slot of one day, MISSING_UINT8 where unknown."""
+        day_start = datetime.combine(day, datetime.min.time())
+        return [
+            STATUS_OK if power is not None else self._gaps.get(day_start + index * SLOT, MISSING_UINT8)
+            for index, power in enumerate(self.day_values(day))
+        ]
+
+    def load_day(self, day: date, values: Sequence[int], missing: int, scale: int) -> None:
+        """Add a stored day of scaled integer slots without marking it changed."""
+        day_start = datetime.combine(day, datetime.min.time())
+        changed_since = self.changed_since
+        for index, value in enumerate(values):
+            if value != missing:
+                self.set_slot(day_start + index * SLOT, value / scale)
+        self.dirty_days.discard(day)
+        # Days older than the ring only add to the rollups
+        self._pending.pop(day, None)
+        self.changed_since = changed_since
+
+    def load_repeated(self, day: date, values: Sequence[int], missing: int, scale: int) -> None:
+        """Add the stored second pass of the hour repeated on a day, like ``load_day``."""
+        if (hour := repeated_hour(day)) is None:
+            return
+        changed_since = self.changed_since
+        for index, value in enumerate(values):
+            if value != missing:
+                self.set_slot((hour + index * SLOT).replace(fold=1), value / scale)
+        self.dirty_days.discard(day)
+        if self._ring.row(day) is None:
+            self._repeated.pop(day, None)
+        self.changed_since = changed_since
+
+    def load_statuses(self, day: date, statuses: Sequence[int], missing: int) -> None:
+        """Add a stored day of slot statuses without marking it dirty."""
+        day_start = datetime.combine(day, datetime.min.time())
+        for index, status in enumerate(statuses):
+            if status not in (missing, STATUS_OK):
+                self.set_gap(day_start + index * SLOT, status)
+        self.dirty_days.discard(day)
+
+
+def series_key(device_id: str, name: str) -> str:
+    """Return the key of a device's series, the name of its column files."""
+    return f"{device_id}_{name}"
+
+
+def column_path(path: str, key: str, suffix: str = VALUES_SUFFIX) -> str:
+    """Return a column file of a series in a history directory."""
+    return os.path.join(path, f"{key}{suffix}")
+
+
+def read_series_files(
+    path: str, memory_days: int = DEFAULT_MEMORY_DAYS
+) -> dict[str, SeriesHistory]:
+    """Read every series stored in a history directory."""
+    if not os.path.isdir(path):
+        return {}
+    return {
+        filename[: -len(VALUES_SUFFIX)]: read_series_file(
+            path, filename[: -len(VALUES_SUFFIX)], memory_days=memory_days
+        )
+        for filename in os.listdir(path)
+        if filename.endswith(VALUES_SUFFIX)
+    }
+
+
+def read_series_file(
+    path: str,
+    key: str,
+    start: date | None = None,
+    end: date | None = None,
+    memory_days: int = DEFAULT_MEMORY_DAYS,
+) -> SeriesHistory:
+    """Read one stored series, or only its days in [start, end).
+
+    The slots of the last ``memory_days`` days read stay in memory, older
+    days only add to the rollups.
+    """
+    history = SeriesHistory(memory_days)
+    if not os.path.exists(column_path(path, key)):
+        return history
+    # Status and repeated hour columns are only written along with values
+    for suffix in (VALUES_SUFFIX, STATUS_SUFFIX, REPEATED_SUFFIX):
+        if not os.path.exists(column_path(path, key, suffix)):
+            continue
+        column = ColumnFile(column_path(path, key, suffix))
+        try:
+            if not column.day_count:
+                continue
+            for day, stored in column.iter_range(start or column.start, end or column.end):
+                if suffix == VALUES_SUFFIX:
+                    history.load_day(day, stored, column.missing, column.scale)
+                elif suffix == REPEATED_SUFFIX:
+                    history.load_repeated(day, stored, column.missing, column.scale)
+                else:
+                    history.load_statuses(day, stored, column.missing)
+        finally:
+            column.close()
+    return history
+
+
+def encode_dirty_days(
+    series: SeriesHistory,
+) -> dict[date, tuple[list[int], list[int], list[int] | None]]:
+    """Return the column chunks of the days changed since the last write.
+
+    Slots without a value or status are left missing, so the stored ones
+    are kept when writing. Only days clocks go back have a chunk of the
+    repeated hour. The days are no longer dirty afterwards.
+    """
+    days = {
+        day: (
+            _encode_values(series.day_values(day)),
+            series.day_statuses(day),
+            _encode_values(series.repeated_values(day)) if series.repeated_slots(day) else None,
+        )
+        for day in series.dirty_days
+    }
+    series.mark_written()
+    return days
+
+
+def _encode_values(powers: list[float | None]) -> list[int]:
+    """Return kW slots as scaled integers, missing where there is no value."""
+    return [
+        MISSING_INT32 if power is None else round(power * VALUE_SCALE) for power in powers
+    ]
+
+
+def write_series_files(
+    path: str,
+    pending: Mapping[str, Mapping[date, tuple[list[int], list[int], list[int] | None]]],
+) -> None:
+    """Write day chunks of values, statuses and repeated hours to the column files of a directory.
+
+    Slots a chunk leaves missing keep their stored value.
+    """
+    for key, days in pending.items():
+        values = ColumnFile(column_path(path, key), scale=VALUE_SCALE)
+        statuses = ColumnFile(
+            column_path(path, key, STATUS_SUFFIX), typecode="B", missing=MISSING_UINT8
+        )
+        try:
+            values.write_days(_merge_stored(values, {day: chunk[0] for day, chunk in days.items()}))
+            statuses.write_days(_merge_stored(statuses, {day: chunk[1] for day, chunk in days.items()}))
+            repeated_days = {day: chunk[2] for day, chunk in days.items() if chunk[2] is not None}
+            if repeated_days:
+                repeated = ColumnFile(
+                    column_path(path, key, REPEATED_SUFFIX),
+                    scale=VALUE_SCALE,
+                    slots_per_day=REPEATED_SLOTS,
+                )
+                try:
+                    repeated.write_days(_merge_stored(repeated, repeated_days))
+                finally:
+                    repeated.close()
+        finally:
+            values.close()
+            statuses.close()
+    _LOGGER.debug(
+        "Wrote %d days of history",
+        sum(len(days) for days in pending.values()),
+    )
+
+
+def _merge_stored(column: ColumnFile, days: Mapping[date, list[int]]) -> dict[date, list[int]]:
+    """Return day chunks with the stored item in every slot they leave missing."""
+    merged = {}
+    for day, chunk in days.items():
+        if column.missing in chunk:
+            _first, stored = column.read_range(day, day + timedelta(days=1))
+            with stored:
+                if len(stored):
+                    chunk = [
+                        stored_item if item == column.missing else item
+                        for item, stored_item in zip(chunk, stored)
+                    ]
+        merged[day] = chunk
+    return merged
@@ -0,0 +1,268 @@
+"""Services of the ČEZ Distribuce PND integration."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import datetime
+from functools import partial
+import logging
+import os
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .aggregation import (
+    RESOLUTION_DAY,
+    RESOLUTION_HOUR,
+    RESOLUTION_MONTH,
+    RESOLUTION_SLOT,
+    SLOT,
+)
+from .api_requests import CezPndAuthError
+from .const import DOMAIN
+from .coordinator import CezPndCoordinator
+from .export import (
+    EXPORT_FORMATS,
+    EXPORT_STATE_SUFFIX,
+    FORMAT_CSV,
+    ExportError,
+    export_history,
+)
+from .history import SERIES_SOURCES
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_GET_RANGE = "get_range"
+SERVICE_EXPORT = "export"
+
+ATTR_DEVICE_ID = "device_id"
+ATTR_SERIES = "series"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_RESOLUTION = "resolution"
+ATTR_FETCH_MISSING = "fetch_missing"
+ATTR_PATH = "path"
+ATTR_FORMAT = "format"
+ATTR_INCREMENTAL = "incremental"
+
+# Points per response; longer ranges are read page by page via next_start
+RANGE_MAX_POINTS = 2000
+
+GET_RANGE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DEVICE_ID): cv.string,
+        vol.Optional(ATTR_SERIES, default="consumption"): vol.In(list(SERIES_SOURCES)),
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_RESOLUTION, default=RESOLUTION_HOUR): vol.In(
+            [RESOLUTION_SLOT, RESOLUTION_HOUR, RESOLUTION_DAY, RESOLUTION_MONTH]
+        ),
+        vol.Optional(ATTR_FETCH_MISSING, default=True): cv.boolean,
+    }
+)
+
+EXPORT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_FORMAT, default=FORMAT_CSV): vol.In(EXPORT_FORMATS),
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_SERIES): vol.All(cv.ensure_list, [vol.In(list(SERIES_SOURCES))]),
+        vol.Optional(ATTR_START): cv.date,
+        vol.Optional(ATTR_END): cv.date,
+        vol.Optional(ATTR_INCREMENTAL, default=False): cv.boolean,
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services, once for all entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_GET_RANGE):
+        return
+
+    async def _async_get_range(call: ServiceCall) -> ServiceResponse:
+        return await async_get_range(hass, call.data)
+
+    async def _async_export(call: ServiceCall) -> ServiceResponse:
+        return await async_export(hass, call.data)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_RANGE,
+        _async_get_range,
+        schema=GET_RANGE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT,
+        _async_export,
+        schema=EXPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+@callback
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the services once the last entry is unloaded."""
+    hass.services.async_remove(DOMAIN, SERVICE_GET_RANGE)
+    hass.services.async_remove(DOMAIN, SERVICE_EXPORT)
+
+
+async def async_get_range(hass: HomeAssistant, data: dict[str, Any]) -> ServiceResponse:
+    """Answer a range query from the local history.
+
+    Closed days the history lacks are fetched from PND first, unless
+    ``fetch_missing`` is off; ``unfetched_start`` is where missing days were
+    left for the next call. At most RANGE_MAX_POINTS buckets are returned;
+    if the range holds more, ``next_start`` is where the next call continues.
+    Rollups cover the whole history, 15-minute pages older than the slots
+    in memory are read from disk.
+    """
+    coordinator, device_id = _find_device(hass, data.get(ATTR_DEVICE_ID))
+    name = data[ATTR_SERIES]
+    resolution = data[ATTR_RESOLUTION]
+    start = _local(data[ATTR_START])
+    end = _local(data.get(ATTR_END) or dt_util.now())
+    if end <= start:
+        raise ServiceValidationError("The end of the range must be after its start")
+
+    unfetched_start: datetime | None = None
+    if data[ATTR_FETCH_MISSING]:
+        try:
+            added, unfetched_start = await coordinator.async_fill_range(
+                device_id, name, start, end
+            )
+        except CezPndAuthError as err:
+            raise HomeAssistantError(f"PND rejected the credentials: {err}") from err
+        except Exception as err:
+            raise HomeAssistantError(f"Fetching missing data from PND failed: {err}") from err
+        if added:
+            _LOGGER.debug("Fetched %d slots of %s of %s for a range query", added, name, device_id)
+
+    series = coordinator.history.series(device_id, name)
+    points: list[dict[str, Any]] = []
+    next_start: datetime | None = None
+    query_end = end
+    if resolution == RESOLUTION_SLOT:
+        # A page spans at most RANGE_MAX_POINTS slots, so one read covers it
+        query_end = min(end, start + RANGE_MAX_POINTS * SLOT)
+        series = await coordinator.history.async_read_series(device_id, name, start, query_end)
+    for bucket, value in series.iter_series(start, query_end, resolution):
+        if len(points) == RANGE_MAX_POINTS:
+            next_start = bucket
+            break
+        points.append({"start": _aware(bucket).isoformat(), "value": round(value, 3)})
+    if next_start is None and query_end < end:
+        next_start = query_end
+
+    page_end = next_start or end
+    return {
+        "device_id": device_id,
+        "series": name,
+        "resolution": resolution,
+        "unit": "kW" if resolution == RESOLUTION_SLOT else "kWh",
+        "start": _aware(start).isoformat(),
+        "end": _aware(page_end).isoformat(),
+        "energy": round(series.energy(start, page_end), 3),
+        "points": points,
+        "gaps": [
+            [_aware(gap_start).isoformat(), _aware(gap_end).isoformat()]
+            for gap_start, gap_end in series.gaps(start, page_end)
+        ],
+        "next_start": _aware(next_start).isoformat() if next_start else None,
+        "unfetched_start": _aware(unfetched_start).isoformat() if unfetched_start else None,
+    }
+
+
+async def async_export(hass: HomeAssistant, data: dict[str, Any]) -> ServiceResponse:
+    """Export the stored series of every entry to a CSV or Parquet file.
+
+    Relative paths are taken from the configuration directory, and the path
+    must be allowed by ``allowlist_external_dirs``. Incremental exports only
+    write the days added or revised since the previous incremental export
+    to the same path, appended to a CSV or in a new Parquet delta file.
+    """
+    path = data[ATTR_PATH]
+    if not os.path.isabs(path):
+        path = hass.config.path(path)
+    if not hass.config.is_allowed_path(path):
+        raise ServiceValidationError(f"Writing to {path} is not allowed")
+
+    histories = [entry_data["history"] for entry_data in _entries(hass)]
+    # Exports read the column files, so pending changes are written first
+    for history in histories:
+        await history.async_flush()
+
+    try:
+        written, days, rows = await hass.async_add_executor_job(
+            partial(
+                export_history,
+                [history.path for history in histories],
+                path,
+                data[ATTR_FORMAT],
+                device_ids=data.get(ATTR_DEVICE_ID),
+                series=data.get(ATTR_SERIES),
+                start=data.get(ATTR_START),
+                end=data.get(ATTR_END),
+                state_path=f"{path}{EXPORT_STATE_SUFFIX}" if data[ATTR_INCREMENTAL] else None,
+            )
+        )
+    except (ExportError, OSError) as err:
+        raise HomeAssistantError(f"Exporting to {path} failed: {err}") from err
+    _LOGGER.info("Exported %d days, %d rows to %s", days, rows, written)
+    return {"path": written, "days": days, "rows": rows}
+
+
+def _entries(hass: HomeAssistant) -> Iterator[dict[str, Any]]:
+    """Yield the data of every loaded entry."""
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        if isinstance(entry_data, dict) and "coordinator" in entry_data:
+            yield entry_data
+
+
+def _find_device(
+    hass: HomeAssistant, device_id: str | None
+) -> tuple[CezPndCoordinator, str]:
+    """Return the coordinator polling a device set, and the device set ID.
+
+    Without a device ID, the only configured device set is used.
+    """
+    devices = {
+        polled: entry_data["coordinator"]
+        for entry_data in _entries(hass)
+        for polled in entry_data["coordinator"].device_ids
+    }
+    if not devices:
+        raise ServiceValidationError("No device sets are configured")
+    if device_id is None:
+        if len(devices) != 1:
+            raise ServiceValidationError(
+                f"Several device sets are configured, choose one of {sorted(devices)}"
+            )
+        device_id = next(iter(devices))
+    if device_id not in devices:
+        raise ServiceValidationError(f"Device set {device_id} is not configured")
+    return devices[device_id], device_id
+
+
+def _local(moment: datetime) -> datetime:
+    """Return a service datetime as local naive time, like the history keys."""
+    if moment.tzinfo is None:
+        return moment
+    return dt_util.as_local(moment).replace(tzinfo=None)
+
+
+def _aware(moment: datetime) -> datetime:
+    """Return a local naive history time with the local time zone."""
+    return moment.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
@@ -0,0 +1,186 @@
+"""Hourly long-term statistics imported from the local history."""
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.const import UnitOfEnergy, UnitOfPower
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .aggregation import RESOLUTION_HOUR, bucket_end, bucket_start
+from .const import DOMAIN
+from .history import HistoryStore
+from .series import SeriesHistory
+
+# The recorder is only imported once it is known to be running, it is too
+# heavy to load with the integration
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+
+_LOGGER = logging.getLogger(__name__)
+
+# Changes are collected for a while so one import covers a whole poll
+STATISTICS_IMPORT_DELAY = 60
+
+STATISTIC_ENERGY = "energy"
+STATISTIC_POWER = "power"
+
+
+def statistic_id(device_id: str, name: str, kind: str) -> str:
+    """Return the external statistic ID of a series."""
+    return f"{DOMAIN}:{device_id}_{name}_{kind}"
+
+
+def _utc(hour: datetime) -> datetime:
+    """Return a local naive hour from the history as aware UTC."""
+    return dt_util.as_utc(hour.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE))
+
+
+class HistoryStatistics:
+    """Keep recorder external statistics in step with the local history.
+
+    Every series gets an hourly energy statistic with a running sum, for the
+    Energy dashboard, and an hourly power statistic with mean, min and max.
+    Rows are imported from the earliest hour changed since the last import,
+    so a revision only rewrites the hours from it on. Imports are upserts
+    keyed by statistic and hour, so repeating one is harmless.
+    """
+
+    def __init__(self, hass: HomeAssistant, history: HistoryStore) -> None:
+        """Initialize the importer."""
+        self.hass = hass
+        self.history = history
+        # Series whose last imported hour was looked up in the recorder
+        self._known: set[tuple[str, str]] = set()
+        self._unsub_import: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Import now and after every history change, return a stop callback."""
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.debug("Recorder not loaded, not importing statistics")
+            return lambda: None
+
+        remove_listener = self.history.async_add_listener(self._async_schedule)
+        self._async_schedule()
+
+        @callback
+        def stop() -> None:
+            remove_listener()
+            if self._unsub_import is not None:
+                self._unsub_import()
+                self._unsub_import = None
+
+        return stop
+
+    @callback
+    def _async_schedule(self) -> None:
+        """Import once the current batch of changes is complete."""
+        if self._unsub_import is None:
+            self._unsub_import = async_call_later(
+                self.hass, STATISTICS_IMPORT_DELAY, self._async_scheduled_import
+            )
+
+    async def _async_scheduled_import(self, _now: datetime) -> None:
+        """Import after the delay."""
+        self._unsub_import = None
+        await self.async_import()
+
+    async def async_import(self) -> None:
+        """Import the hours of every series changed since the last import."""
+        for device_id, name, series in self.history.all_series():
+            if (device_id, name) not in self._known:
+                # After a restart, continue from the last hour in the recorder
+                last = await self._async_last_imported(device_id, name)
+                if last is not None and (
+                    series.changed_since is None or last < series.changed_since
+                ):
+                    series.changed_since = last
+                elif last is None:
+                    series.changed_since = series.first_slot
+                self._known.add((device_id, name))
+
+            if series.changed_since is None:
+                continue
+            start = bucket_start(series.changed_since, RESOLUTION_HOUR)
+            series.changed_since = None
+            await self._async_import_series(device_id, name, series, start)
+
+    async def _async_last_imported(self, device_id: str, name: str) -> datetime | None:
+        """Return the local start of the last imported hour of a series."""
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.statistics import get_last_statistics
+
+        last = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics,
+            self.hass,
+            1,
+            statistic_id(device_id, name, STATISTIC_ENERGY),
+            True,
+            {"sum"},
+        )
+        rows = last.get(statistic_id(device_id, name, STATISTIC_ENERGY))
+        if not rows:
+            return None
+        return dt_util.as_local(dt_util.utc_from_timestamp(rows[0]["start"])).replace(
+            tzinfo=None
+        )
+
+    async def _async_import_series(
+        self, device_id: str, name: str, series: SeriesHistory, start: datetime
+    ) -> None:
+        """Queue the hourly rows of a series from ``start`` on, one call per statistic.
+
+        Hours older than the slots in memory are read from disk.
+        """
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        last_slot = series.last_slot
+        first_slot = series.first_slot
+        if last_slot is None or first_slot is None:
+            return
+        end = bucket_end(bucket_start(last_slot, RESOLUTION_HOUR), RESOLUTION_HOUR)
+
+        # The running sum continues from the energy before the first changed hour
+        total = series.energy(bucket_start(first_slot, RESOLUTION_HOUR), start)
+        stored = await self.history.async_read_series(device_id, name, start, end)
+        energy: list[StatisticData] = []
+        power: list[StatisticData] = []
+        for hour, kwh, mean, low, high in stored.hour_stats(start, end):
+            total += kwh
+            energy.append({"start": _utc(hour), "state": kwh, "sum": total})
+            power.append({"start": _utc(hour), "mean": mean, "min": low, "max": high})
+        if not energy:
+            return
+
+        label = f"ČEZ PND {device_id} {name.capitalize()}"
+        energy_metadata: StatisticMetaData = {
+            "has_mean": False,
+            "has_sum": True,
+            "name": f"{label} Energy",
+            "source": DOMAIN,
+            "statistic_id": statistic_id(device_id, name, STATISTIC_ENERGY),
+            "unit_of_measurement": UnitOfEnergy.KILO_WATT_HOUR,
+        }
+        power_metadata: StatisticMetaData = {
+            "has_mean": True,
+            "has_sum": False,
+            "name": f"{label} Power",
+            "source": DOMAIN,
+            "statistic_id": statistic_id(device_id, name, STATISTIC_POWER),
+            "unit_of_measurement": UnitOfPower.KILO_WATT,
+        }
+        async_add_external_statistics(self.hass, energy_metadata, energy)
+        async_add_external_statistics(self.hass, power_metadata, power)
+        _LOGGER.debug(
+            "Imported %d hours of %s statistics of %s from %s",
+            len(energy),
+            name,
+            device_id,
+            start,
+        )
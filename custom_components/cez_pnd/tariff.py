@@ -0,0 +1,208 @@
+"""Time-of-use tariff costs of the 15-minute history.
+
+Czech dual tariffs bill energy at the low rate (NT) while the distributor's
+HDO signal is on and at the high rate (VT) otherwise. A tariff calendar
+turns into one band per 15-minute slot of a day, so costing a stored day is
+a single pass over its slots against that band vector. After that, daily and
+monthly aggregates are adjusted by the difference whenever a slot is added
+or revised, like the history's rollups, so costs never rescan the history.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+import re
+from typing import TYPE_CHECKING, Any
+
+from .aggregation import SLOT, SLOT_HOURS
+from .columnar import SLOTS_PER_DAY
+from .const import (
+    CONF_NT_PRICE,
+    CONF_NT_WINDOWS,
+    CONF_NT_WINDOWS_WEEKEND,
+    CONF_VT_PRICE,
+)
+
+if TYPE_CHECKING:
+    from .history import HistoryStore
+    from .series import SeriesHistory
+
+BAND_NT = 0
+BAND_VT = 1
+
+# Series whose energy is billed by the tariff
+COST_SERIES = "consumption"
+
+_WINDOW_RE = re.compile(r"^(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})$")
+_SLOT_MINUTES = int(SLOT.total_seconds() // 60)
+
+# (first slot, end slot) of each NT window, end exclusive, within one day
+Windows = tuple[tuple[int, int], ...]
+
+
+def parse_windows(text: str) -> Windows:
+    """Parse NT windows like "22:00-06:00, 13:00-15:00" into slot ranges.
+
+    Windows must start and end on a 15-minute boundary. A window ending
+    before it starts runs over midnight and is split at it. Raises
+    ValueError for anything else.
+    """
+    windows: list[tuple[int, int]] = []
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        match = _WINDOW_RE.match(part)
+        if match is None:
+            raise ValueError(f"Expected HH:MM-HH:MM, got {part!r}")
+        start_hour, start_minute, end_hour, end_minute = map(int, match.groups())
+        start = start_hour * 60 + start_minute
+        end = end_hour * 60 + end_minute
+        if start >= 24 * 60 or end > 24 * 60 or start_minute >= 60 or end_minute >= 60:
+            raise ValueError(f"{part!r} is not within a day")
+        if start % _SLOT_MINUTES or end % _SLOT_MINUTES:
+            raise ValueError(f"{part!r} does not fall on 15-minute boundaries")
+        first, last = start // _SLOT_MINUTES, end // _SLOT_MINUTES
+        if first < last:
+            windows.append((first, last))
+        elif first > last:
+            windows.append((first, SLOTS_PER_DAY))
+            if last:
+                windows.append((0, last))
+    return tuple(windows)
+
+
+@lru_cache(maxsize=8)
+def _bands(windows: Windows) -> tuple[int, ...]:
+    """Return the band of every slot of a day with the given NT windows."""
+    bands = [BAND_VT] * SLOTS_PER_DAY
+    for first, last in windows:
+        bands[first:last] = [BAND_NT] * (last - first)
+    return tuple(bands)
+
+
+@dataclass(frozen=True, slots=True)
+class TariffCalendar:
+    """NT windows and kWh prices of a dual tariff.
+
+    Weekends use their own windows if the distributor switches HDO
+    differently then.
+    """
+
+    vt_price: float
+    nt_price: float
+    nt_windows: Windows = ()
+    nt_windows_weekend: Windows | None = None
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> TariffCalendar | None:
+        """Return the calendar configured in an entry's options, None without prices."""
+        if options.get(CONF_VT_PRICE) is None:
+            return None
+        weekend = options.get(CONF_NT_WINDOWS_WEEKEND, "")
+        return cls(
+            vt_price=options[CONF_VT_PRICE],
+            nt_price=options.get(CONF_NT_PRICE, options[CONF_VT_PRICE]),
+            nt_windows=parse_windows(options.get(CONF_NT_WINDOWS, "")),
+            nt_windows_weekend=parse_windows(weekend) if weekend.strip() else None,
+        )
+
+    def bands(self, day: date) -> tuple[int, ...]:
+        """Return the band of every slot of a day."""
+        if day.weekday() >= 5 and self.nt_windows_weekend is not None:
+            return _bands(self.nt_windows_weekend)
+        return _bands(self.nt_windows)
+
+    def band(self, start: datetime) -> int:
+        """Return the band of the slot starting at ``start``."""
+        return self.bands(start.date())[(start.hour * 60 + start.minute) // _SLOT_MINUTES]
+
+    def cost(self, nt_kwh: float, vt_kwh: float) -> float:
+        """Return the price of energy used in each band."""
+        return nt_kwh * self.nt_price + vt_kwh * self.vt_price
+
+
+@dataclass(frozen=True, slots=True)
+class CostTotals:
+    """Energy per band and its cost over a day or month."""
+
+    nt_kwh: float = 0.0
+    vt_kwh: float = 0.0
+    cost: float = 0.0
+
+
+class TariffCosts:
+    """NT and VT energy of one series per day and per month, kept current."""
+
+    def __init__(self, calendar: TariffCalendar) -> None:
+        """Initialize empty aggregates."""
+        self.calendar = calendar
+        # [NT kWh, VT kWh] per day and per first day of the month
+        self._days: dict[date, list[float]] = {}
+        self._months: dict[date, list[float]] = {}
+
+    def rebuild(self, series: SeriesHistory) -> None:
+        """Compute the aggregates of every day of a series in memory."""
+        self._days.clear()
+        self._months.clear()
+        for day in series.memory_days():
+            energy = [0.0, 0.0]
+            for power, band in zip(series.day_values(day), self.calendar.bands(day)):
+                if power is not None:
+                    energy[band] += power
+            for start, power in series.repeated_slots(day):
+                energy[self.calendar.band(start)] += power
+            self._add(day, energy[BAND_NT] * SLOT_HOURS, energy[BAND_VT] * SLOT_HOURS)
+
+    def slot_changed(self, start: datetime, previous: float | None, power: float) -> None:
+        """Adjust the aggregates by the kWh a slot gained or lost."""
+        kwh = (power - (previous or 0.0)) * SLOT_HOURS
+        if self.calendar.band(start) == BAND_NT:
+            self._add(start.date(), kwh, 0.0)
+        else:
+            self._add(start.date(), 0.0, kwh)
+
+    def _add(self, day: date, nt_kwh: float, vt_kwh: float) -> None:
+        """Add energy to a day and its month."""
+        for key, aggregates in ((day, self._days), (day.replace(day=1), self._months)):
+            energy = aggregates.setdefault(key, [0.0, 0.0])
+            energy[BAND_NT] += nt_kwh
+            energy[BAND_VT] += vt_kwh
+
+    def day(self, day: date) -> CostTotals:
+        """Return the totals of one day."""
+        return self._totals(self._days.get(day))
+
+    def month(self, day: date) -> CostTotals:
+        """Return the totals of the month ``day`` falls in."""
+        return self._totals(self._months.get(day.replace(day=1)))
+
+    def _totals(self, energy: list[float] | None) -> CostTotals:
+        """Return stored band energy with its cost."""
+        if energy is None:
+            return CostTotals()
+        return CostTotals(
+            energy[BAND_NT], energy[BAND_VT], self.calendar.cost(energy[BAND_NT], energy[BAND_VT])
+        )
+
+
+class TariffEngine:
+    """Tariff costs of the billed series of an entry's device sets."""
+
+    def __init__(self, history: HistoryStore, calendar: TariffCalendar) -> None:
+        """Initialize the engine."""
+        self.history = history
+        self.calendar = calendar
+        self._costs: dict[str, TariffCosts] = {}
+
+    def costs(self, device_id: str) -> TariffCosts:
+        """Return the costs of a device set, computing them on first use.
+
+        Once computed, the costs follow every change of the series.
+        """
+        if device_id not in self._costs:
+            series = self.history.series(device_id, COST_SERIES)
+            costs = TariffCosts(self.calendar)
+            costs.rebuild(series)
+            series.add_observer(costs.slot_changed)
+            self._costs[device_id] = costs
+        return self._costs[device_id]
@@ -0,0 +1,69 @@
+"""HTTP transport for the ČEZ Distribuce PND API client."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+from typing import TYPE_CHECKING
+
+from .const import FETCH_CONCURRENCY
+
+if TYPE_CHECKING:
+    import requests
+    from requests.adapters import HTTPAdapter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TransportConfig:
+    """Connection pool settings for the PND session."""
+
+    # Distinct hosts kept in the pool manager (PND portal + CAS login)
+    pool_connections: int = 2
+    # Persistent connections per host, sized to the fetch concurrency
+    pool_maxsize: int = FETCH_CONCURRENCY
+    max_redirects: int = 10
+
+
+DEFAULT_TRANSPORT = TransportConfig()
+
+
+def create_adapter(config: TransportConfig = DEFAULT_TRANSPORT) -> HTTPAdapter:
+    """Create a pooled HTTP adapter.
+
+    The adapter owns the urllib3 pool manager, so the same instance can be
+    mounted on several sessions to share open (and already TLS-negotiated)
+    connections between them.
+    """
+    from requests.adapters import HTTPAdapter
+
+    return HTTPAdapter(
+        pool_connections=config.pool_connections,
+        pool_maxsize=config.pool_maxsize,
+    )
+
+
+def create_session(
+    config: TransportConfig = DEFAULT_TRANSPORT,
+    adapter: HTTPAdapter | None = None,
+) -> requests.Session:
+    """Create a requests session on a connection pool sized to the fetches.
+
+    requests already keeps connections alive and negotiates compression, so
+    only the pool differs from a plain session.
+    """
+    import requests
+
+    session = requests.Session()
+    session.max_redirects = config.max_redirects
+
+    if adapter is None:
+        adapter = create_adapter(config)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    _LOGGER.debug(
+        "Created session (pool_maxsize=%d)",
+        config.pool_maxsize,
+    )
+    return session
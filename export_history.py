@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Export the 15-minute history stored by the integration to CSV or Parquet.
+
+Reads the history files of a Home Assistant configuration directory, or a
+copy of them, without Home Assistant running:
+
+    python3 export_history.py /config exports/pnd.csv
+    python3 export_history.py /config exports/pnd.parquet --format parquet \\
+        --device 86180 --series consumption --start 2025-01-01 --end 2026-01-01
+    python3 export_history.py /config exports/pnd.csv --incremental
+
+Incremental exports write every day on the first run, then only the days
+added or revised since, tracked in <output>.state.json: appended to a CSV
+output, or to a new <output>.<time>.parquet file next to a Parquet one.
+Parquet needs the pyarrow package.
+"""
+import argparse
+import glob
+import os
+import sys
+import types
+from datetime import date
+
+# Load the integration's modules without running its package __init__,
+# which needs Home Assistant
+PACKAGE = types.ModuleType("cez_pnd")
+PACKAGE.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), 'custom_components', 'cez_pnd')]
+sys.modules.setdefault("cez_pnd", PACKAGE)
+
+from cez_pnd.const import DOMAIN  # noqa: E402
+from cez_pnd.export import (  # noqa: E402
+    EXPORT_FORMATS,
+    EXPORT_STATE_SUFFIX,
+    ExportError,
+    export_history,
+)
+
+
+def history_paths(config_dir):
+    """Return the history directory of every config entry."""
+    return sorted(glob.glob(os.path.join(config_dir, ".storage", DOMAIN, "*", "")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("config_dir", help="Home Assistant configuration directory")
+    parser.add_argument("output", help="File to write")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="Output format, from the extension by default")
+    parser.add_argument("--device", action="append", help="Device set ID to export, repeatable")
+    parser.add_argument("--series", action="append", choices=("consumption", "production"))
+    parser.add_argument("--start", type=date.fromisoformat, help="First day, YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat, help="Day after the last day, YYYY-MM-DD")
+    parser.add_argument("--incremental", action="store_true", help="Only days added or revised since the last run")
+    args = parser.parse_args()
+
+    paths = history_paths(args.config_dir)
+    if not paths:
+        parser.error(f"No {DOMAIN} history found in {args.config_dir}")
+    export_format = args.format or ("parquet" if args.output.endswith(".parquet") else "csv")
+
+    try:
+        written, days, rows = export_history(
+            paths,
+            args.output,
+            export_format,
+            device_ids=args.device,
+            series=args.series,
+            start=args.start,
+            end=args.end,
+            state_path=f"{args.output}{EXPORT_STATE_SUFFIX}" if args.incremental else None,
+        )
+    except ExportError as err:
+        print(f"❌ {err}")
+        return 1
+    print(f"✅ Exported {days} days, {rows} rows to {written}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Test script to verify the hour repeated when clocks go back keeps both passes."""
+from datetime import date, datetime, timedelta
+import os
+import sys
+import tempfile
+
+# Add custom_components to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'custom_components'))
+
+from cez_pnd.aggregation import RESOLUTION_DAY, RESOLUTION_HOUR, RESOLUTION_SLOT, SLOT_HOURS
+from cez_pnd.assemblies import parse_series
+from cez_pnd.const import PND_STATUS_OK
+from cez_pnd.export import FORMAT_CSV, export_history
+from cez_pnd.models import DeviceData
+from cez_pnd.series import (
+    SeriesHistory,
+    encode_dirty_days,
+    read_series_file,
+    series_key,
+    write_series_files,
+)
+
+# Clocks went back from 03:00 CEST to 02:00 CET on this day
+FALL_BACK_DAY = date(2024, 10, 27)
+
+
+def fall_back_response():
+    """Return a PND chart response of the 25-hour day, slot n at n/100 kW.
+
+    PND stamps the end of each slot in local time, so the stamps 02:00 to
+    02:45 come twice.
+    """
+    step = timedelta(minutes=15)
+    first_pass = [datetime(2024, 10, 27, 0, 15) + index * step for index in range(11)]
+    rest = [datetime(2024, 10, 27, 2) + index * step for index in range(89)]
+    stamps = first_pass + rest
+
+    def stamp(moment):
+        if moment == datetime(2024, 10, 28):
+            return "27.10.2024 24:00"
+        return moment.strftime("%d.%m.%Y %H:%M")
+
+    return {
+        "hasData": True,
+        "series": [{
+            "name": "+A",
+            "data": [
+                [stamp(end), f"{index / 100}", PND_STATUS_OK] for index, end in enumerate(stamps)
+            ],
+        }],
+        "seriesStats": [{"total": "0", "min": "0", "max": "0"}],
+        "unitY": "kW",
+    }
+
+
+def test_repeated_hour():
+    """Test that all 100 slots of the day clocks go back are stored and exported."""
+    result = parse_series(fall_back_response())
+    assert len(result.measurements) == 100
+    expected_kwh = sum(range(100)) / 100 * SLOT_HOURS
+
+    series = SeriesHistory()
+    assert series.add_measurements(result.measurements) == 100
+    day_start = datetime(2024, 10, 27)
+    day_end = datetime(2024, 10, 28)
+    assert abs(series.energy(day_start, day_end) - expected_kwh) < 1e-9
+    assert series.gap_count == 0
+
+    slots = series.series(day_start, day_end, RESOLUTION_SLOT)
+    assert [power for _start, power in slots] == [index / 100 for index in range(100)]
+    assert [start.fold for start, _power in slots].count(1) == 4
+    hours = dict(series.series(day_start, day_end, RESOLUTION_HOUR))
+    # 01:45-02:00 is slot 7, the two passes of 02:00-03:00 are slots 8-15
+    assert abs(hours[datetime(2024, 10, 27, 2)] - sum(range(8, 16)) / 100 * SLOT_HOURS) < 1e-9
+    assert len(hours) == 24
+
+    # Both passes survive the column files and a snapshot
+    with tempfile.TemporaryDirectory() as path:
+        key = series_key("device", "consumption")
+        write_series_files(path, {key: encode_dirty_days(series)})
+        stored = read_series_file(path, key)
+        assert stored.series(day_start, day_end, RESOLUTION_SLOT) == slots
+        assert stored.series(day_start, day_end, RESOLUTION_DAY) == series.series(
+            day_start, day_end, RESOLUTION_DAY
+        )
+
+        output = os.path.join(path, "export.csv")
+        _written, days, rows = export_history([path], output, FORMAT_CSV)
+        assert (days, rows) == (1, 100)
+
+    data = DeviceData(results={"consumption_power": result}, last_update=day_end)
+    restored = DeviceData.from_dict(data.as_dict()).results["consumption_power"]
+    assert [point.end.fold for point in restored.measurements] == [
+        point.end.fold for point in result.measurements
+    ]
+
+
+if __name__ == "__main__":
+    test_repeated_hour()
+    print("✅ The repeated hour keeps both passes")
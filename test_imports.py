@@ -1,11 +1,89 @@
 #!/usr/bin/env python3
-"""Test script to verify all imports work correctly."""
-import sys
+"""Test script to verify all imports work correctly and stay cheap."""
+import json
 import os
+import subprocess
+import sys
 
 # Add custom_components to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'custom_components'))
 
+# Cold import budget per module, as a fraction of the time the same
+# interpreter took to import the Home Assistant modules in HA_PRELOAD, so
+# the budgets hold on slow and fast machines alike. Importing a submodule
+# includes the package __init__ it lives in. The modules took 0.04 to 0.07
+# of the preload when these were set; raise a budget only for a reason.
+IMPORT_BUDGET = {
+    "cez_pnd": 0.09,
+    "cez_pnd.const": 0.09,
+    "cez_pnd.api_requests": 0.09,
+    "cez_pnd.sensor": 0.10,
+    "cez_pnd.config_flow": 0.10,
+}
+
+# Dependencies the integration must only load on first use, not on import
+# (not reported if Home Assistant already loaded them itself)
+DEFERRED_MODULES = ("requests", "bs4", "pyarrow", "homeassistant.components.recorder")
+
+# Home Assistant modules the integration builds on, preloaded so the
+# measurement covers only the integration and what it pulls in itself
+HA_PRELOAD = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.components.sensor",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+)
+
+# Runs in a fresh interpreter for every module, so each import is cold
+MEASURE_SCRIPT = """
+import importlib, json, sys, time
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+for name in {preload!r}:
+    importlib.import_module(name)
+preload = time.perf_counter() - start
+preloaded = set(sys.modules)
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "ms": elapsed * 1000,
+    "ratio": elapsed / preload,
+    "loaded": [
+        name for name in {deferred!r}
+        if name in sys.modules and name not in preloaded
+    ],
+}}))
+"""
+
+ROUNDS = 3
+
+# Modules the command line tools build on, which must import without Home
+# Assistant and without running the package __init__
+STANDALONE_MODULES = (
+    "cez_pnd.aggregation",
+    "cez_pnd.api_requests",
+    "cez_pnd.columnar",
+    "cez_pnd.const",
+    "cez_pnd.export",
+    "cez_pnd.ratelimit",
+    "cez_pnd.series",
+)
+STANDALONE_SCRIPTS = ("bulk_download", "export_history")
+
+# The scripts register the package without its __init__; None in
+# sys.modules makes every import of Home Assistant fail
+STANDALONE_SCRIPT = """
+import importlib, sys
+sys.modules["homeassistant"] = None
+sys.path.insert(0, {root!r})
+for name in {names!r}:
+    importlib.import_module(name)
+"""
+
+
 def test_imports():
     """Test that all modules can be imported without errors."""
     errors = []
@@ -47,6 +125,87 @@ def test_imports():
         print("\n✅ All modules imported successfully!")
         return True
 
+
+def measure_import(module):
+    """Return the best cold import time of a module, in ms and relative to the
+    preload, and the deferred modules it loaded."""
+    script = MEASURE_SCRIPT.format(
+        path=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'custom_components'),
+        preload=HA_PRELOAD,
+        module=module,
+        deferred=DEFERRED_MODULES,
+    )
+    best = None
+    loaded = []
+    # The ratio of the round with the fastest module import
+    for _ in range(ROUNDS):
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        if best is None or sample["ms"] < best["ms"]:
+            best = sample
+        loaded = sample["loaded"]
+    return best["ms"], best["ratio"], loaded
+
+
+def test_import_time():
+    """Benchmark cold import cost per module and fail on regressions."""
+    errors = []
+
+    print(f"\nCold import time (best of {ROUNDS}, Home Assistant preloaded):")
+    for module, budget in IMPORT_BUDGET.items():
+        try:
+            elapsed, ratio, loaded = measure_import(module)
+        except subprocess.CalledProcessError as e:
+            errors.append(f"❌ {module}: import failed\n{e.stderr}")
+            continue
+
+        status = "✅" if ratio <= budget and not loaded else "❌"
+        print(
+            f"  {status} {module:<24} {elapsed:7.2f} ms, "
+            f"{ratio:.3f} of preload (budget {budget:.2f})"
+        )
+        if ratio > budget:
+            errors.append(
+                f"❌ {module}: {ratio:.3f} of the preload exceeds budget of {budget:.2f}"
+            )
+        if loaded:
+            errors.append(f"❌ {module}: loads {', '.join(loaded)} on import")
+
+    if errors:
+        print("\n❌ IMPORT REGRESSIONS FOUND:")
+        for error in errors:
+            print(f"  {error}")
+        return False
+    else:
+        print("\n✅ All modules import within budget!")
+        return True
+
+
+def test_standalone_imports():
+    """Test that the command line tools import with Home Assistant blocked."""
+    script = STANDALONE_SCRIPT.format(
+        root=os.path.dirname(os.path.abspath(__file__)),
+        names=STANDALONE_SCRIPTS + STANDALONE_MODULES,
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        print(f"\n❌ Command line tools need Home Assistant:\n{result.stderr}")
+        return False
+    print("\n✅ Command line tools import without Home Assistant!")
+    return True
+
+
 if __name__ == "__main__":
     success = test_imports()
+    success = test_import_time() and success
+    success = test_standalone_imports() and success
     sys.exit(0 if success else 1)